@@ -0,0 +1,5 @@
+'''
+Benchmarks for MaterialX JSON conversion. Run modules from the repository root, e.g.:
+
+    python -m benchmarks.run
+'''
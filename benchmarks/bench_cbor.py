@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+'''
+Benchmark comparing the CBOR encoding of the MaterialX JSON representation with JSON text.
+
+Reports the encoded size, with and without zlib compression, and the best encode and
+decode times for the bundled MaterialsVariantsShoe.gltf_converted.mtlx document and
+for synthetic documents. Codec times exclude the conversion to and from MaterialX.
+'''
+import MaterialX as mx
+from materialxjson import core, cbor
+
+from benchmarks import generator
+
+import argparse, json, os, sys, time, zlib
+
+def timeCall(func, repeat: int) -> float:
+    '''
+    @brief Return the best wall time of a number of calls to a function
+    '''
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def runBenchmark(label: str, doc: mx.Document, repeat: int):
+    '''
+    @brief Time JSON and CBOR encoding and decoding of a document and print the results
+    '''
+    mtlxjson = core.MaterialXJson()
+    writeOptions = core.JsonWriteOptions()
+    writeOptions.indent = None
+    writeOptions.separators = (',', ':')
+    readOptions = core.JsonReadOptions()
+
+    jsonObject = mtlxjson.documentToJSON(doc, writeOptions)
+    cborObject = dict(jsonObject)
+    cborObject[core.JSON_MIMETYPE_KEY] = core.CBOR_MIMETYPE
+    jsonString = mtlxjson.documentToJSONString(doc, writeOptions)
+    jsonData = jsonString.encode('utf-8')
+    cborData = mtlxjson.documentToCBOR(doc, writeOptions)
+    plainCborData = cbor.encode(cborObject, stringReferences=False)
+    if cbor.decode(cborData) != cborObject or cbor.decode(plainCborData) != cborObject:
+        print('%s: CBOR round trip differs' % label)
+        return
+
+    formats = [
+        ('json', jsonData,
+         lambda: json.dumps(jsonObject, indent=None, separators=(',', ':')), lambda: json.loads(jsonString),
+         lambda: mtlxjson.documentToJSONString(doc, writeOptions),
+         lambda: mtlxjson.documentFromJSONString(jsonString, mx.createDocument(), readOptions)),
+        ('cbor', cborData,
+         lambda: cbor.encode(cborObject), lambda: cbor.decode(cborData),
+         lambda: mtlxjson.documentToCBOR(doc, writeOptions),
+         lambda: mtlxjson.documentFromCBOR(cborData, mx.createDocument(), readOptions)),
+        ('cbor (no string refs)', plainCborData,
+         lambda: cbor.encode(cborObject, stringReferences=False), lambda: cbor.decode(plainCborData),
+         None, None),
+    ]
+
+    print('%s: %d elements' % (label, generator.countElements(doc)))
+    print('  %-22s %10s %10s %10s %10s %10s %10s' % ('format', 'bytes', 'zlib', 'encode s', 'decode s', 'toDoc s', 'fromDoc s'))
+    for name, data, encode, decode, toDocument, fromDocument in formats:
+        print('  %-22s %10d %10d %10.4f %10.4f %10s %10s' % (
+            name, len(data), len(zlib.compress(data)), timeCall(encode, repeat), timeCall(decode, repeat),
+            '%.4f' % timeCall(toDocument, repeat) if toDocument else '-',
+            '%.4f' % timeCall(fromDocument, repeat) if fromDocument else '-'))
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark CBOR against JSON encoding of MaterialX documents')
+    parser.add_argument('--sizes', dest='sizes', type=int, nargs='+', default=[10, 1000], help='Material counts of synthetic documents. Default is 10 1000.')
+    parser.add_argument('--repeat', dest='repeat', type=int, default=5, help='Number of timed repetitions. Default is 5.')
+    opts = parser.parse_args()
+
+    dataPath = os.path.join(os.path.dirname(core.__file__), 'data', 'MaterialsVariantsShoe.gltf_converted.mtlx')
+    doc = mx.createDocument()
+    mx.readFromXmlFile(doc, dataPath)
+    runBenchmark(os.path.basename(dataPath), doc, opts.repeat)
+
+    options = generator.GeneratorOptions()
+    for size in opts.sizes:
+        options.materialCount = size
+        runBenchmark('synthetic %d materials' % size, generator.createDocument(options), opts.repeat)
+
+if __name__ == '__main__':
+    sys.exit(main())
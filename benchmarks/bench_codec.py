@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+'''
+Benchmark comparing the installed JSON codecs.
+
+For each codec, reports the best encode time for indented and compact JSON text and the best
+decode time for the bundled MaterialsVariantsShoe.gltf_converted.mtlx document and for synthetic
+documents, with string and typed values. Before timing, the output of each codec is checked
+to be identical to the stdlib json module, for the documents and for edge cases such as
+non-ASCII strings and floats written with an exponent.
+'''
+import MaterialX as mx
+from materialxjson import core, jsoncodec
+
+from benchmarks import generator
+
+import argparse, json, math, os, sys, time
+
+# Formats timed for encoding, as (label, indent, separators)
+FORMATS = [
+    ('indent 2', 2, (',', ': ')),
+    ('compact', None, (',', ':')),
+]
+
+# JSON documents which codecs may encode or decode differently
+EDGE_CASES = [
+    { 'name': 'café   \U0001f600', 'control': '\x00\x1f\x7f', 'escape': '"\\/' },
+    { 'floats': [0.0, -0.0, 1.0, 0.1, 1e-4, 1e-5, 1.5e-7, 5e-324, 1e15, 1e16, 1.2345678901234568e+16, 1e300] },
+    { 'special': [math.inf, -math.inf], 'integers': [0, -1, 2 ** 63, -2 ** 64, 10 ** 30] },
+    { 'empty': [[], {}, ''], 'nested': [[[{}]]], 'booleans': [True, False, None] },
+]
+
+def timeCall(func, repeat: int) -> float:
+    '''
+    @brief Return the best wall time of a number of calls to a function
+    '''
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def checkCodec(codec: jsoncodec.JsonCodec, jsonObjects: list) -> list:
+    '''
+    @brief Check that a codec encodes and decodes JSON documents identically to the stdlib json module
+    @return A list of error messages, empty if the output is identical
+    '''
+    errors = []
+    for index, jsonObject in enumerate(jsonObjects):
+        for label, indent, separators in FORMATS + [('default', None, None)]:
+            expected = json.dumps(jsonObject, indent=indent, separators=separators)
+            text = codec.encode(jsonObject, indent, separators)
+            if text != expected:
+                errors.append('document %d: %s encoding differs' % (index, label))
+                continue
+            # Compare the text as NaN does not compare equal to itself
+            for data in (text, text.encode('utf-8')):
+                if json.dumps(codec.decode(data)) != json.dumps(json.loads(data)):
+                    errors.append('document %d: decoding of %s %s differs' % (index, label, type(data).__name__))
+    return errors
+
+def runBenchmark(label: str, doc: mx.Document, codecs: list, repeat: int):
+    '''
+    @brief Time encoding and decoding of a document with each codec and print the results
+    '''
+    mtlxjson = core.MaterialXJson()
+    print('%s: %d elements' % (label, generator.countElements(doc)))
+    print('  %-16s %-8s %12s %12s %12s' % ('values', 'codec', 'indent 2 s', 'compact s', 'decode s'))
+    for typedValues in (False, True):
+        writeOptions = core.JsonWriteOptions()
+        writeOptions.typedValues = typedValues
+        jsonObject = mtlxjson.documentToJSON(doc, writeOptions)
+        jsonData = json.dumps(jsonObject, indent=2).encode('utf-8')
+
+        errors = []
+        for codec in codecs:
+            errors += ['%s: %s' % (codec.name, error) for error in checkCodec(codec, [jsonObject])]
+        if errors:
+            print('  Output differs from the json module: %s' % '; '.join(errors))
+            continue
+
+        for codec in codecs:
+            times = [timeCall(lambda: codec.encode(jsonObject, indent, separators), repeat) for _, indent, separators in FORMATS]
+            times.append(timeCall(lambda: codec.decode(jsonData), repeat))
+            print('  %-16s %-8s %12.4f %12.4f %12.4f' % ('typed' if typedValues else 'string', codec.name, *times))
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the installed JSON codecs on MaterialX documents')
+    parser.add_argument('--sizes', dest='sizes', type=int, nargs='+', default=[10, 1000], help='Material counts of synthetic documents. Default is 10 1000.')
+    parser.add_argument('--repeat', dest='repeat', type=int, default=5, help='Number of timed repetitions. Default is 5.')
+    opts = parser.parse_args()
+
+    codecs = [jsoncodec.getCodec(name) for name in reversed(jsoncodec.getCodecNames())]
+    print('Codecs: %s. Default: %s' % (', '.join(codec.name for codec in codecs), jsoncodec.getCodec().name))
+    for codec in codecs:
+        errors = checkCodec(codec, EDGE_CASES)
+        print('- %s edge cases: %s' % (codec.name, '; '.join(errors) if errors else 'identical'))
+
+    dataPath = os.path.join(os.path.dirname(core.__file__), 'data', 'MaterialsVariantsShoe.gltf_converted.mtlx')
+    doc = mx.createDocument()
+    mx.readFromXmlFile(doc, dataPath)
+    runBenchmark(os.path.basename(dataPath), doc, codecs, opts.repeat)
+
+    options = generator.GeneratorOptions()
+    for size in opts.sizes:
+        options.materialCount = size
+        runBenchmark('synthetic %d materials' % size, generator.createDocument(options), codecs, opts.repeat)
+
+if __name__ == '__main__':
+    sys.exit(main())
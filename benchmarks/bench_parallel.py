@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+'''
+Benchmark for reading large JSON documents on multiple cores with the parallel module.
+
+Times reading a synthetic document on a single core and with a pool of worker processes,
+and times the steps of the parallel read separately in one process: the partitions are
+pickled and their XML is parsed into the document by the main process, which the workers
+cannot speed up, while building the elements and writing them as XML is split across the
+workers. The bound is the speedup with an unlimited number of cores given this serial share.
+
+Results on a single CPU Linux machine with Python 3.11, 2 jobs, best of 3 runs of 2:
+
+    Materials  Elements  Single core  2 jobs   Pickle   Build    Write XML  Parse XML  Bound
+    1000       35556     0.21 s       0.36 s   0.03 s   0.14 s   0.02 s     0.08 s     1.7-2.0x
+    4000       142222    0.88 s       1.70 s   0.15 s   0.62 s   0.07 s     0.32 s     1.7-1.9x
+
+Before the partitions were parsed directly into the document, each was parsed into its own
+document and imported, and the bound was 0.83x and 0.89x: the main process alone took longer
+than a single core read.
+
+No result from a multi-core machine is recorded yet. The parallel read is therefore only used
+when requested with at least 2 jobs on a machine with at least 2 CPUs, and the speedup is below
+2x on any number of cores.
+'''
+import MaterialX as mx
+from materialxjson import core, parallel
+
+from benchmarks import generator
+
+import argparse, concurrent.futures, os, pickle, sys, time
+
+def timeCall(func, repeat: int) -> float:
+    '''
+    @brief Return the best wall time of a number of calls to a function
+    '''
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def readSerial(nodes: list) -> mx.Document:
+    '''
+    @brief Read top level elements on a single core
+    '''
+    doc = mx.createDocument()
+    core.MaterialXJson().elementFromJSON({ core.CHILDREN_STRING: nodes }, doc)
+    return doc
+
+def readParallel(nodes: list, jobs: int, executor) -> mx.Document:
+    '''
+    @brief Read top level elements with the parallel module on a pool of worker processes
+    '''
+    doc = mx.createDocument()
+    parallel.elementsFromJSON(nodes, doc, None, jobs, executor)
+    return doc
+
+def timeSteps(nodes: list, jobs: int, repeat: int) -> dict:
+    '''
+    @brief Time the steps of a parallel read in the current process
+    @return Dictionary of times in seconds by step
+    '''
+    tasks = [(partition, core.JsonReadOptions()) for partition in parallel.partitionNodes(nodes, jobs)]
+    results = []
+    def build():
+        results.clear()
+        for partition, readOptions in tasks:
+            doc = mx.createDocument()
+            core.MaterialXJson().elementFromJSON({ core.CHILDREN_STRING: partition }, doc, readOptions)
+            doc.removeAttribute('version')
+            results.append(doc)
+    xmlStrings = []
+    def writeXml():
+        xmlStrings[:] = [mx.writeToXmlString(doc) for doc in results]
+    xmlOptions = mx.XmlReadOptions()
+    xmlOptions.upgradeVersion = False
+    def parsePartitions():
+        doc = mx.createDocument()
+        for xmlString in xmlStrings:
+            mx.readFromXmlString(doc, xmlString, mx.FileSearchPath(), xmlOptions)
+
+    steps = {}
+    steps['pickle'] = timeCall(lambda: [pickle.dumps(task) for task in tasks], repeat)
+    steps['build'] = timeCall(build, repeat)
+    steps['writeXml'] = timeCall(writeXml, repeat)
+    steps['parse'] = timeCall(parsePartitions, repeat)
+    return steps
+
+def runBenchmark(materialCount: int, jobs: int, repeat: int, executor) -> None:
+    '''
+    @brief Time the reads of a synthetic document and print the results
+    '''
+    options = generator.GeneratorOptions()
+    options.materialCount = materialCount
+    sourceDoc = generator.createDocument(options)
+    nodes = core.MaterialXJson().documentToJSON(sourceDoc)[core.MATERIALX_DOCUMENT_ROOT][core.CHILDREN_STRING]
+
+    if mx.writeToXmlString(readParallel(nodes, jobs, executor)) != mx.writeToXmlString(readSerial(nodes)):
+        print('%d materials: documents differ' % materialCount)
+        return
+
+    serialTime = timeCall(lambda: readSerial(nodes), repeat)
+    parallelTime = timeCall(lambda: readParallel(nodes, jobs, executor), repeat)
+    steps = timeSteps(nodes, jobs, repeat)
+    mainTime = steps['pickle'] + steps['parse']
+    print('%d materials: %d elements, %d top level elements' % (materialCount, generator.countElements(sourceDoc), len(nodes)))
+    print('  - single core   : %.3f s' % serialTime)
+    print('  - %2d jobs       : %.3f s (%.2fx)' % (jobs, parallelTime, serialTime / parallelTime))
+    print('  - pickle        : %.3f s (main process)' % steps['pickle'])
+    print('  - build         : %.3f s (workers)' % steps['build'])
+    print('  - write XML     : %.3f s (workers)' % steps['writeXml'])
+    print('  - parse XML     : %.3f s (main process)' % steps['parse'])
+    print('  - bound         : %.2fx' % (serialTime / mainTime))
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark reading large JSON documents on multiple cores')
+    parser.add_argument('--materials', dest='materials', type=int, nargs='+', default=[1000, 4000], help='Numbers of synthetic materials. Default is 1000 4000.')
+    parser.add_argument('--jobs', dest='jobs', type=int, default=0, help='Number of worker processes. Default is 0 for the number of CPUs, and at least 2.')
+    parser.add_argument('--repeat', dest='repeat', type=int, default=3, help='Number of timed repetitions. Default is 3.')
+    opts = parser.parse_args()
+
+    # Use a pool of at least 2 processes, which the parallel module does not create on a single CPU
+    jobs = max(2, opts.jobs or os.cpu_count() or 1)
+    print('- %d CPUs, %d jobs' % (os.cpu_count() or 1, jobs))
+    with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+        for materialCount in opts.materials:
+            runBenchmark(materialCount, jobs, opts.repeat, executor)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+'''
+Benchmark for the MaterialX to JSON element traversal.
+
+Compares the explicit stack traversal used by MaterialXJson.elementToJSON against
+the original recursive traversal on the bundled MaterialsVariantsShoe.gltf_converted.mtlx
+document and on a large synthetic document.
+'''
+import MaterialX as mx
+from materialxjson import core
+
+from benchmarks import generator
+
+import argparse, os, sys, time
+
+def recursiveElementToJSON(elem: mx.Element, jsonParent: list, writeOptions: core.JsonWriteOptions = None) -> list:
+    '''
+    @brief Original recursive traversal kept as a reference for comparison.
+    '''
+    if (writeOptions and writeOptions.elementPredicate and not writeOptions.elementPredicate(elem)):
+        return
+    if (elem.getSourceUri() != ""):
+        return
+
+    jsonElem = {}
+    jsonElem['name'] = elem.getName()
+    category = elem.getCategory()
+    if (writeOptions and writeOptions.addInputOutputCategories) or (category not in ['input', 'output']):
+        jsonElem['category'] = category
+    for attrName in elem.getAttributeNames():
+        jsonElem[attrName] = elem.getAttribute(attrName)
+
+    inputs = []
+    outputs = []
+    non_input_outputs = []
+    for child in elem.getChildren():
+        category = child.getCategory()
+        if category == 'input':
+            recursiveElementToJSON(child, inputs)
+        elif category == 'output':
+            recursiveElementToJSON(child, outputs)
+        else:
+            recursiveElementToJSON(child, non_input_outputs)
+
+    if len(inputs) > 0:
+        jsonElem[core.INPUTS_STRING] = inputs
+    if len(non_input_outputs) > 0:
+        jsonElem[core.CHILDREN_STRING] = non_input_outputs
+    if len(outputs) > 0:
+        jsonElem[core.OUTPUTS_STRING] = outputs
+    jsonParent.append(jsonElem)
+    return jsonParent
+
+def recursiveDocumentToJSON(doc: mx.Document, writeOptions: core.JsonWriteOptions = None) -> dict:
+    '''
+    @brief Original recursive document conversion kept as a reference for comparison.
+    '''
+    documentRoot = {}
+    for attrName in doc.getAttributeNames():
+        documentRoot[attrName] = doc.getAttribute(attrName)
+    children = []
+    for elem in doc.getChildren():
+        recursiveElementToJSON(elem, children, writeOptions)
+    documentRoot[core.CHILDREN_STRING] = children
+    return { core.JSON_MIMETYPE_KEY: core.JSON_MIMETYPE, core.MATERIALX_DOCUMENT_ROOT: documentRoot }
+
+def timeCall(func, repeat: int) -> float:
+    '''
+    @brief Return the best wall time of a number of calls to a function
+    '''
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def runBenchmark(label: str, doc: mx.Document, repeat: int):
+    '''
+    @brief Time both traversals on a document and print the results
+    '''
+    mtlxjson = core.MaterialXJson()
+    if recursiveDocumentToJSON(doc) != mtlxjson.documentToJSON(doc):
+        print('%s: outputs differ' % label)
+        return
+
+    elementCount = generator.countElements(doc)
+    recursiveTime = timeCall(lambda: recursiveDocumentToJSON(doc), repeat)
+    stackTime = timeCall(lambda: mtlxjson.documentToJSON(doc), repeat)
+    print('%s: %d elements' % (label, elementCount))
+    print('  - recursive: %.4f s (%.0f elements/s)' % (recursiveTime, elementCount / recursiveTime))
+    print('  - stack    : %.4f s (%.0f elements/s)' % (stackTime, elementCount / stackTime))
+    print('  - speedup  : %.2fx' % (recursiveTime / stackTime))
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark MaterialX to JSON element traversal')
+    parser.add_argument('--materials', dest='materials', type=int, default=500, help='Number of synthetic materials. Default is 500.')
+    parser.add_argument('--depth', dest='depth', type=int, default=20, help='Number of chained nodes per nodegraph. Default is 20.')
+    parser.add_argument('--inputs', dest='inputs', type=int, default=4, help='Number of inputs per node. Default is 4.')
+    parser.add_argument('--repeat', dest='repeat', type=int, default=5, help='Number of timed repetitions. Default is 5.')
+    opts = parser.parse_args()
+
+    dataPath = os.path.join(os.path.dirname(core.__file__), 'data', 'MaterialsVariantsShoe.gltf_converted.mtlx')
+    doc = mx.createDocument()
+    mx.readFromXmlFile(doc, dataPath)
+    runBenchmark(os.path.basename(dataPath), doc, opts.repeat)
+
+    options = generator.GeneratorOptions()
+    options.materialCount = opts.materials
+    options.graphDepth = opts.depth
+    options.inputsPerNode = opts.inputs
+    doc = generator.createDocument(options)
+    runBenchmark('synthetic', doc, opts.repeat)
+
+if __name__ == '__main__':
+    sys.exit(main())
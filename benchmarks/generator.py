@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+'''
+Generator for synthetic MaterialX documents used for benchmarking.
+
+Each material consists of a nodegraph containing an image node followed by a chain of
+nodes, a standard_surface shader connected to the nodegraph output, and a surfacematerial.
+Looks containing material assignments can be added to make up a given share of the elements.
+'''
+import MaterialX as mx
+
+import argparse, random, sys
+
+# Categories used for the chained nodes in each nodegraph
+NODE_CATEGORIES = ['multiply', 'add', 'mix', 'subtract']
+
+class GeneratorOptions:
+    '''
+    Class for holding options for generating a synthetic document.
+
+    Options:
+        - materialCount: The number of materials to create. Default is 100
+        - graphDepth: The number of chained nodes in each nodegraph. Default is 4
+        - inputsPerNode: The number of inputs on each chained node. Default is 4
+        - lookShare: The share of elements which are looks and material assignments, in the range [0, 1). Default is 0.1
+        - seed: The random seed used for values. Default is 0
+    '''
+    def __init__(self):
+        '''
+        @brief Constructor
+        '''
+        self.materialCount = 100
+        self.graphDepth = 4
+        self.inputsPerNode = 4
+        self.lookShare = 0.1
+        self.seed = 0
+
+def _color3String(rng: random.Random) -> str:
+    '''
+    @brief Create a random color3 value string
+    '''
+    return '%g, %g, %g' % (round(rng.random(), 4), round(rng.random(), 4), round(rng.random(), 4))
+
+def addMaterial(doc: mx.Document, index: int, options: GeneratorOptions, rng: random.Random) -> mx.Node:
+    '''
+    @brief Add a nodegraph, shader and material to a document
+    @param doc The document to add to
+    @param index The index of the material, used for naming
+    @param options The generator options
+    @param rng The random number generator used for values
+    @return The material node
+    '''
+    graph = doc.addNodeGraph('NG_material%d' % index)
+
+    image = graph.addNode('image', 'image_color', 'color3')
+    fileInput = image.addInput('file', 'filename')
+    fileInput.setValueString('textures/material%d_color.png' % index)
+    image.addInput('default', 'color3').setValueString(_color3String(rng))
+    previous = image
+
+    for depth in range(options.graphDepth):
+        category = NODE_CATEGORIES[depth % len(NODE_CATEGORIES)]
+        node = graph.addNode(category, '%s%d' % (category, depth), 'color3')
+        for i in range(options.inputsPerNode):
+            if i == 0:
+                node.addInput('in1', 'color3').setNodeName(previous.getName())
+            elif i % 2:
+                node.addInput('in%d' % (i + 1), 'color3').setValueString(_color3String(rng))
+            else:
+                node.addInput('in%d' % (i + 1), 'float').setValueString('%g' % round(rng.random(), 4))
+        previous = node
+
+    output = graph.addOutput('out', 'color3')
+    output.setNodeName(previous.getName())
+
+    shader = doc.addNode('standard_surface', 'SR_material%d' % index, 'surfaceshader')
+    baseColor = shader.addInput('base_color', 'color3')
+    baseColor.setNodeGraphString(graph.getName())
+    baseColor.setOutputString(output.getName())
+    shader.addInput('base', 'float').setValueString('%g' % round(rng.random(), 4))
+    shader.addInput('specular_roughness', 'float').setValueString('%g' % round(rng.random(), 4))
+    shader.addInput('normal', 'vector3').setValueString('0, 0, 1')
+
+    material = doc.addMaterialNode('M_material%d' % index, shader)
+    return material
+
+def createDocument(options: GeneratorOptions = None) -> mx.Document:
+    '''
+    @brief Create a synthetic MaterialX document
+    @param options The generator options. Default is None to use the default options
+    @return The synthetic document
+    '''
+    if not options:
+        options = GeneratorOptions()
+    rng = random.Random(options.seed)
+
+    doc = mx.createDocument()
+    materials = []
+    for index in range(options.materialCount):
+        materials.append(addMaterial(doc, index, options, rng))
+
+    # Add looks so that looks and assignments make up the requested share of elements
+    lookShare = min(max(options.lookShare, 0.0), 0.99)
+    if lookShare > 0 and materials:
+        elementCount = countElements(doc)
+        lookElementCount = int(round(elementCount * lookShare / (1.0 - lookShare)))
+        assignmentsPerLook = 10
+        lookIndex = 0
+        look = None
+        assignCount = 0
+        while lookElementCount > 0:
+            if look is None or assignCount == assignmentsPerLook:
+                look = doc.addLook('look%d' % lookIndex)
+                lookIndex += 1
+                assignCount = 0
+                lookElementCount -= 1
+                continue
+            material = materials[(lookIndex * assignmentsPerLook + assignCount) % len(materials)]
+            assign = look.addMaterialAssign('assign%d' % assignCount, material.getName())
+            assign.setGeom('/geom/mesh%d' % assignCount)
+            assignCount += 1
+            lookElementCount -= 1
+
+    return doc
+
+def countElements(doc: mx.Document) -> int:
+    '''
+    @brief Count all elements in a document, excluding the document itself
+    @param doc The document to count elements in
+    @return The number of elements
+    '''
+    return sum(1 for _ in doc.traverseTree()) - 1
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic MaterialX document')
+    parser.add_argument('--materials', dest='materials', type=int, default=100, help='Number of materials. Default is 100.')
+    parser.add_argument('--depth', dest='depth', type=int, default=4, help='Number of chained nodes per nodegraph. Default is 4.')
+    parser.add_argument('--inputs', dest='inputs', type=int, default=4, help='Number of inputs per chained node. Default is 4.')
+    parser.add_argument('--lookShare', dest='lookShare', type=float, default=0.1, help='Share of elements which are looks or material assignments. Default is 0.1.')
+    parser.add_argument('--seed', dest='seed', type=int, default=0, help='Random seed. Default is 0.')
+    parser.add_argument(dest='outputFileName', help='File name of the MaterialX document to write')
+    opts = parser.parse_args()
+
+    options = GeneratorOptions()
+    options.materialCount = opts.materials
+    options.graphDepth = opts.depth
+    options.inputsPerNode = opts.inputs
+    options.lookShare = opts.lookShare
+    options.seed = opts.seed
+    doc = createDocument(options)
+    mx.writeToXmlFile(doc, opts.outputFileName)
+    print('Wrote %d elements to "%s"' % (countElements(doc), opts.outputFileName))
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+'''
+Benchmark suite for MaterialX JSON conversion.
+
+Times the MaterialXJson document conversions and the file level Util functions on
+synthetic documents of increasing size. Throughput is reported as elements/sec and MB/sec
+of JSON text, or of CBOR data for the CBOR operations. Peak memory is measured with
+tracemalloc in a separate untimed pass and only includes Python allocations.
+
+Results are written as JSON so that runs can be compared across commits, e.g.:
+
+    python -m benchmarks.run --output before.json
+    python -m benchmarks.run --output after.json --baseline before.json
+'''
+import MaterialX as mx
+from materialxjson import core
+import materialxjson
+
+from benchmarks import generator
+
+import argparse, datetime, json, os, platform, shutil, subprocess, sys, tempfile, time, tracemalloc
+
+class Operation:
+    '''
+    Class describing a benchmarked operation.
+
+    Members:
+        - name: The name of the operation
+        - function: Callable run for each timed repetition
+        - byteCount: The number of bytes of JSON text or CBOR data processed by each call
+    '''
+    def __init__(self, name: str, function, byteCount: int):
+        '''
+        @brief Constructor
+        '''
+        self.name = name
+        self.function = function
+        self.byteCount = byteCount
+
+def createOperations(doc: mx.Document, workPath: str) -> list:
+    '''
+    @brief Create the operations to benchmark for a document
+    @param doc The MaterialX document
+    @param workPath The folder to write temporary files to
+    @return The list of operations
+    '''
+    mtlxjson = core.MaterialXJson()
+    writeOptions = core.JsonWriteOptions()
+    writeOptions.indent = 2
+    readOptions = core.JsonReadOptions()
+
+    xmlFileName = os.path.join(workPath, 'document.mtlx')
+    jsonFileName = os.path.join(workPath, 'document_mtlx.json')
+    outputXmlFileName = os.path.join(workPath, 'document_mtlx_json.mtlx')
+    outputJsonFileName = os.path.join(workPath, 'document_write.json')
+    mx.writeToXmlFile(doc, xmlFileName)
+
+    jsonObject = mtlxjson.documentToJSON(doc, writeOptions)
+    jsonString = mtlxjson.documentToJSONString(doc, writeOptions)
+    with open(jsonFileName, 'w') as outfile:
+        outfile.write(jsonString)
+    byteCount = len(jsonString.encode('utf-8'))
+    cborData = mtlxjson.documentToCBOR(doc, writeOptions)
+    tableWriteOptions = core.JsonWriteOptions()
+    tableWriteOptions.indent = 2
+    tableWriteOptions.stringTable = True
+    tableJsonString = mtlxjson.documentToJSONString(doc, tableWriteOptions)
+    tableByteCount = len(tableJsonString.encode('utf-8'))
+
+    return [
+        Operation('documentToJSON', lambda: mtlxjson.documentToJSON(doc, writeOptions), byteCount),
+        Operation('documentToJSONString', lambda: mtlxjson.documentToJSONString(doc, writeOptions), byteCount),
+        Operation('documentFromJSON', lambda: mtlxjson.documentFromJSON(jsonObject, mx.createDocument(), readOptions), byteCount),
+        Operation('documentFromJSONString', lambda: mtlxjson.documentFromJSONString(jsonString, mx.createDocument(), readOptions), byteCount),
+        Operation('documentToJSONString.stringTable', lambda: mtlxjson.documentToJSONString(doc, tableWriteOptions), tableByteCount),
+        Operation('documentFromJSONString.stringTable', lambda: mtlxjson.documentFromJSONString(tableJsonString, mx.createDocument(), readOptions), tableByteCount),
+        Operation('documentToCBOR', lambda: mtlxjson.documentToCBOR(doc, writeOptions), len(cborData)),
+        Operation('documentFromCBOR', lambda: mtlxjson.documentFromCBOR(cborData, mx.createDocument(), readOptions), len(cborData)),
+        Operation('Util.readJson', lambda: core.Util.readJson(jsonFileName), byteCount),
+        Operation('Util.writeJson', lambda: core.Util.writeJson(jsonObject, outputJsonFileName), byteCount),
+        Operation('Util.xmlFileToJsonFile', lambda: core.Util.xmlFileToJsonFile(xmlFileName, jsonFileName, writeOptions), byteCount),
+        Operation('Util.jsonFileToXml', lambda: core.Util.jsonFileToXml(jsonFileName, readOptions), byteCount),
+        Operation('Util.jsonFileToXmlFile', lambda: core.Util.jsonFileToXmlFile(jsonFileName, outputXmlFileName, readOptions), byteCount),
+    ]
+
+def timeOperation(operation: Operation, repeat: int) -> float:
+    '''
+    @brief Get the best wall time over a number of calls of an operation
+    '''
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        operation.function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def peakMemory(operation: Operation) -> int:
+    '''
+    @brief Get the peak Python memory allocated in bytes during a call of an operation
+    '''
+    tracemalloc.start()
+    try:
+        operation.function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def getMetadata() -> dict:
+    '''
+    @brief Get information about the environment the benchmark is run in
+    '''
+    commit = ''
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        pass
+    return {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'materialx': mx.getVersionString(),
+        'materialxjson': materialxjson.__version__,
+    }
+
+def runBenchmarks(sizes: list, options: generator.GeneratorOptions, repeat: int, operationNames: list = None, report = print) -> list:
+    '''
+    @brief Run benchmarks across document sizes
+    @param sizes The list of material counts to generate documents for
+    @param options The generator options. The material count is set from sizes
+    @param repeat The number of timed repetitions for each operation
+    @param operationNames Names of operations to run. Default is None to run all operations
+    @param report Function called with a message for each result. Default is print
+    @return The list of result dictionaries
+    '''
+    results = []
+    workPath = tempfile.mkdtemp(prefix='materialxjson_benchmark_')
+    try:
+        for size in sizes:
+            options.materialCount = size
+            doc = generator.createDocument(options)
+            elementCount = generator.countElements(doc)
+            report('- %d materials, %d elements' % (size, elementCount))
+
+            for operation in createOperations(doc, workPath):
+                if operationNames and operation.name not in operationNames:
+                    continue
+                seconds = timeOperation(operation, repeat)
+                memory = peakMemory(operation)
+                result = {
+                    'materials': size,
+                    'elements': elementCount,
+                    'jsonBytes': operation.byteCount,
+                    'operation': operation.name,
+                    'seconds': seconds,
+                    'elementsPerSecond': elementCount / seconds if seconds > 0 else 0.0,
+                    'mbPerSecond': operation.byteCount / 1e6 / seconds if seconds > 0 else 0.0,
+                    'peakMemoryMB': memory / 1e6,
+                }
+                results.append(result)
+                report('  %-36s %9.4f s %12.0f elements/s %8.2f MB/s %9.2f MB peak' % (
+                    operation.name, seconds, result['elementsPerSecond'], result['mbPerSecond'], result['peakMemoryMB']))
+    finally:
+        shutil.rmtree(workPath, ignore_errors=True)
+    return results
+
+def compareResults(results: list, baseline: dict, report = print) -> None:
+    '''
+    @brief Report the speedup of results relative to a previous run
+    @param results The current results
+    @param baseline The JSON of a previous run
+    @param report Function called with a message for each comparison. Default is print
+    '''
+    previous = {}
+    for result in baseline.get('results', []):
+        previous[(result['materials'], result['operation'])] = result
+    report('Comparison with baseline commit "%s":' % baseline.get('metadata', {}).get('commit', ''))
+    for result in results:
+        match = previous.get((result['materials'], result['operation']))
+        if match and result['seconds'] > 0:
+            report('  %6d materials %-36s %6.2fx' % (result['materials'], result['operation'], match['seconds'] / result['seconds']))
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark MaterialX JSON conversion')
+    parser.add_argument('--sizes', dest='sizes', type=int, nargs='+', default=[10, 100, 1000], help='Material counts to benchmark. Default is 10 100 1000.')
+    parser.add_argument('--depth', dest='depth', type=int, default=4, help='Number of chained nodes per nodegraph. Default is 4.')
+    parser.add_argument('--inputs', dest='inputs', type=int, default=4, help='Number of inputs per chained node. Default is 4.')
+    parser.add_argument('--lookShare', dest='lookShare', type=float, default=0.1, help='Share of elements which are looks or material assignments. Default is 0.1.')
+    parser.add_argument('--repeat', dest='repeat', type=int, default=3, help='Number of timed repetitions. Default is 3.')
+    parser.add_argument('--operations', dest='operations', nargs='+', default=None, help='Names of operations to run. Default is all.')
+    parser.add_argument('--output', dest='output', default='', help='File to write JSON results to.')
+    parser.add_argument('--baseline', dest='baseline', default='', help='JSON results of a previous run to compare against.')
+    opts = parser.parse_args()
+
+    options = generator.GeneratorOptions()
+    options.graphDepth = opts.depth
+    options.inputsPerNode = opts.inputs
+    options.lookShare = opts.lookShare
+
+    results = runBenchmarks(opts.sizes, options, opts.repeat, opts.operations)
+    output = {
+        'metadata': getMetadata(),
+        'parameters': {
+            'sizes': opts.sizes,
+            'depth': opts.depth,
+            'inputs': opts.inputs,
+            'lookShare': opts.lookShare,
+            'repeat': opts.repeat,
+        },
+        'results': results,
+    }
+
+    if opts.baseline:
+        with open(opts.baseline, 'r') as infile:
+            compareResults(results, json.load(infile))
+
+    if opts.output:
+        with open(opts.output, 'w') as outfile:
+            json.dump(output, outfile, indent=2)
+        print('Wrote results to "%s"' % opts.output)
+
+if __name__ == '__main__':
+    sys.exit(main())
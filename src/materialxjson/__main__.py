@@ -1,34 +1,31 @@
-import sys, os
-import subprocess
+import sys
 
 def main() -> int:
     '''
-    Main entry point
+    Main entry point. Commands are run in the current process and only the
+    module for the requested command is imported.
     '''
     argCount = len(sys.argv)
     if argCount < 2 or sys.argv[1] == '-h' or sys.argv[1] == '--help':
-        print('Usage: materialxjson <command> [options] where command is j2m or m2j')
+        print('Usage: materialxjson <command> [options] where command is j2m, m2j, serve or client')
         return 0
 
     # Check if the command is valid
-    cmdArgs = sys.argv[1:]
-    if cmdArgs[0] == 'm2j':
-        cmdArgs[0] = 'mtlx2json.py'
-    elif cmdArgs[0] == 'j2m':
-        cmdArgs[0] = 'json2mtlx.py'
+    command = sys.argv[1]
+    if command == 'm2j':
+        from materialxjson import mtlx2json as commandModule
+    elif command == 'j2m':
+        from materialxjson import json2mtlx as commandModule
+    elif command == 'serve':
+        from materialxjson import server as commandModule
+    elif command == 'client':
+        from materialxjson import client as commandModule
     else:
-        print('Unknown command specified:', cmdArgs[0])
+        print('Unknown command specified:', command)
         return 1
-    
-    # Build the command
-    cmd = ' '.join(cmdArgs)
-    packageLocation = os.path.dirname(__file__)
-    python_cmd = sys.executable
-    cmd = python_cmd + ' ' + packageLocation + '/' + cmd
-    print('Executing command:', cmd)
 
     # Run the command
-    return subprocess.call(cmd, shell=True)
+    return commandModule.main(sys.argv[2:], 'materialxjson ' + command)
 
 if __name__ == '__main__':
     sys.exit(main())
@@ -0,0 +1,194 @@
+# aio.py
+
+'''
+@file
+This module contains asyncio counterparts of the blocking file utilities in core.Util.
+
+File I/O and conversion are run in an executor so that they do not block the event loop.
+The default executor of the loop is a thread pool, which lets the file I/O of many
+conversions overlap. Conversion itself holds the interpreter lock, so a
+concurrent.futures.ProcessPoolExecutor can be passed to also spread conversions over
+multiple cores. Arguments must then be picklable, and statistics collected in the
+worker processes of the single file functions are not returned to the caller. The batch
+functions return the statistics of each conversion in their results.
+
+Cancelling a coroutine stops waiting for its result. Work which has not started in the
+executor is cancelled, while work which has already started runs to completion.
+'''
+
+import asyncio
+import copy
+import time
+
+from materialxjson import batch, core
+
+async def _runInExecutor(executor, function, *args):
+    '''
+    @brief Run a function in an executor of the running event loop
+    '''
+    return await asyncio.get_running_loop().run_in_executor(executor, function, *args)
+
+async def readJson(fileName: str, stats: core.ConversionStats = None, executor = None) -> dict:
+    '''
+    @brief Read a JSON file without blocking the event loop
+    @param fileName The file name to read
+    @param stats ConversionStats to collect timings and counters in. Default is None
+    @param executor The executor to use. Default is None to use the default executor of the loop
+    @return The JSON document
+    '''
+    return await _runInExecutor(executor, core.Util.readJson, fileName, stats)
+
+async def writeJson(jsonObject: dict, fileName: str, indentation = 2, executor = None) -> None:
+    '''
+    @brief Write a JSON document to file without blocking the event loop
+    @param jsonObject The JSON document to write
+    @param fileName The file name to write to
+    @param indentation The indentation to use. Default is 2
+    @param executor The executor to use. Default is None to use the default executor of the loop
+    '''
+    await _runInExecutor(executor, core.Util.writeJson, jsonObject, fileName, indentation)
+
+async def xmlFileToJsonFile(xmlFileName: str, jsonFileName: str, writeOptions: core.JsonWriteOptions = None,
+                            executor = None) -> None:
+    '''
+    @brief Convert a MaterialX XML file to a JSON file without blocking the event loop
+    @param xmlFileName The XML file to read from
+    @param jsonFileName The JSON file to write to
+    @param writeOptions The write options to use. Default is None
+    @param executor The executor to use. Default is None to use the default executor of the loop
+    '''
+    await _runInExecutor(executor, core.Util.xmlFileToJsonFile, xmlFileName, jsonFileName, writeOptions)
+
+async def jsonFileToXmlFile(fileName: str, outputFilename: str, readOptions: core.JsonReadOptions = None,
+                            executor = None) -> bool:
+    '''
+    @brief Convert a JSON file to a MaterialX XML file without blocking the event loop
+    @param fileName The file name to read from
+    @param outputFilename The file name to write to
+    @param readOptions The read options to use. Default is None
+    @param executor The executor to use. Default is None to use the default executor of the loop
+    @return True if successful, false otherwise
+    '''
+    return await _runInExecutor(executor, core.Util.jsonFileToXmlFile, fileName, outputFilename, readOptions)
+
+async def runBatch(worker, tasks, concurrency: int = 4, executor = None, timeout: float = None,
+                   report = print) -> batch.BatchResult:
+    '''
+    @brief Run a worker function over tasks with at most a given number running at a time.
+    If the batch is cancelled, tasks which have not started are not run and the cancellation is raised.
+    @param worker A function taking a task and returning a status message, with the same
+    conventions as batch.runBatch(). It must be a module level function when using a process executor
+    @param tasks An iterable of tasks
+    @param concurrency The maximum number of tasks running at a time. Default is 4
+    @param executor The executor to use. Default is None to use the default executor of the loop
+    @param timeout The time limit in seconds for waiting on each task. A task which exceeds it is recorded
+    as failed, but keeps running in the executor and counts towards the concurrency until it completes.
+    Default is None for no limit
+    @param report Function called with a message as each task completes. Default is print
+    @return The batch results
+    '''
+    result = batch.BatchResult()
+    remaining = iter(tasks)
+    start = time.perf_counter()
+
+    async def drain():
+        # Each runner takes the next task once its current one has completed in the executor
+        for task in remaining:
+            future = asyncio.ensure_future(_runInExecutor(executor, batch.runTask, (worker, task, None)))
+            try:
+                done, _ = await asyncio.wait((future,), timeout=timeout)
+                if not done:
+                    result.addResult(task, False, 'Timed out after %g seconds' % timeout, report)
+                    await asyncio.wait((future,))
+                    continue
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            result.addResult(*future.result(), report)
+
+    runners = [asyncio.ensure_future(drain()) for _ in range(max(concurrency, 1))]
+    try:
+        await asyncio.gather(*runners)
+    finally:
+        for runner in runners:
+            runner.cancel()
+        await asyncio.gather(*runners, return_exceptions=True)
+
+    result.elapsed = time.perf_counter() - start
+    return result
+
+def _copyOptions(options):
+    '''
+    @brief Copy read or write options for a single task, with its own stats if the options collect stats
+    @param options The options to copy, or None
+    @return The copied options
+    '''
+    if options is None or options.stats is None:
+        return options
+    options = copy.copy(options)
+    options.stats = core.ConversionStats()
+    return options
+
+def _mergeStats(options, result: batch.BatchResult) -> None:
+    '''
+    @brief Add the stats of a batch to the stats of the options it was run with
+    '''
+    if options is not None and options.stats is not None and result.stats is not None:
+        options.stats.merge(result.stats)
+
+def _xmlToJsonTask(task: tuple) -> tuple:
+    '''
+    @brief Batch worker converting an XML file to a JSON file
+    @param task Tuple of (XML file name, JSON file name, write options)
+    @return Tuple of the status message and the stats of the conversion
+    '''
+    xmlFileName, jsonFileName, writeOptions = task
+    core.Util.xmlFileToJsonFile(xmlFileName, jsonFileName, writeOptions)
+    return 'Converted "%s" to "%s"' % (xmlFileName, jsonFileName), writeOptions.stats if writeOptions else None
+
+def _jsonToXmlTask(task: tuple) -> tuple:
+    '''
+    @brief Batch worker converting a JSON file to an XML file
+    @param task Tuple of (JSON file name, XML file name, read options)
+    @return Tuple of the status message and the stats of the conversion
+    '''
+    jsonFileName, xmlFileName, readOptions = task
+    if not core.Util.jsonFileToXmlFile(jsonFileName, xmlFileName, readOptions):
+        raise ValueError('Failed to read "%s"' % jsonFileName)
+    return 'Converted "%s" to "%s"' % (jsonFileName, xmlFileName), readOptions.stats if readOptions else None
+
+async def xmlFilesToJsonFiles(fileNames, writeOptions: core.JsonWriteOptions = None, concurrency: int = 4,
+                              executor = None, timeout: float = None, report = None) -> batch.BatchResult:
+    '''
+    @brief Convert MaterialX XML files to JSON files concurrently
+    @param fileNames An iterable of (XML file name, JSON file name) tuples
+    @param writeOptions The write options to use. Each conversion uses a copy of the options, and the stats
+    of all conversions are added to the stats of the options once the batch completes. Default is None
+    @param concurrency The maximum number of conversions running at a time. Default is 4
+    @param executor The executor to use. Default is None to use the default executor of the loop
+    @param timeout The time limit in seconds for waiting on each conversion. Default is None for no limit
+    @param report Function called with a message as each conversion completes. Default is None
+    @return The batch results
+    '''
+    tasks = ((xmlFileName, jsonFileName, _copyOptions(writeOptions)) for xmlFileName, jsonFileName in fileNames)
+    result = await runBatch(_xmlToJsonTask, tasks, concurrency, executor, timeout, report)
+    _mergeStats(writeOptions, result)
+    return result
+
+async def jsonFilesToXmlFiles(fileNames, readOptions: core.JsonReadOptions = None, concurrency: int = 4,
+                              executor = None, timeout: float = None, report = None) -> batch.BatchResult:
+    '''
+    @brief Convert JSON files to MaterialX XML files concurrently
+    @param fileNames An iterable of (JSON file name, XML file name) tuples
+    @param readOptions The read options to use. Each conversion uses a copy of the options, and the stats
+    of all conversions are added to the stats of the options once the batch completes. Default is None
+    @param concurrency The maximum number of conversions running at a time. Default is 4
+    @param executor The executor to use. Default is None to use the default executor of the loop
+    @param timeout The time limit in seconds for waiting on each conversion. Default is None for no limit
+    @param report Function called with a message as each conversion completes. Default is None
+    @return The batch results
+    '''
+    tasks = ((jsonFileName, xmlFileName, _copyOptions(readOptions)) for jsonFileName, xmlFileName in fileNames)
+    result = await runBatch(_jsonToXmlTask, tasks, concurrency, executor, timeout, report)
+    _mergeStats(readOptions, result)
+    return result
@@ -0,0 +1,206 @@
+# batch.py
+
+'''
+@file
+This module contains utilities for converting batches of files, optionally in parallel
+using a pool of worker processes.
+
+A task which fails, or whose worker process terminates, e.g. on a crash while parsing a
+malformed file, is recorded as a failure and the remaining tasks are still run.
+
+Task time limits are enforced with SIGALRM in the process running the task. The alarm
+interrupts Python code, but not a call into MaterialX such as parsing a large XML file,
+so such a task is only stopped once the call returns. Time limits are not supported on
+platforms without interval timers, such as Windows, or off the main thread.
+'''
+
+import itertools
+import os
+import signal
+import threading
+import time
+
+class BatchTimeoutError(Exception):
+    '''
+    Exception raised when a batch task exceeds its time limit
+    '''
+    pass
+
+class BatchResult:
+    '''
+    Class for holding the results of a batch run.
+
+    Members:
+        - fileCount: The number of tasks run
+        - failures: List of (task, message) tuples for tasks which failed
+        - elapsed: The wall time of the batch in seconds
+        - stats: Combined ConversionStats returned by the tasks, or None if no task returned stats
+        - data: List of (task, data) tuples for tasks which returned additional data
+    '''
+    def __init__(self):
+        '''
+        @brief Constructor
+        '''
+        self.fileCount = 0
+        self.failures = []
+        self.elapsed = 0.0
+        self.stats = None
+        self.data = []
+
+    def summary(self) -> str:
+        '''
+        @brief Get a summary string of the batch run
+        @return The summary string
+        '''
+        rate = self.fileCount / self.elapsed if self.elapsed > 0 else 0.0
+        return '- Processed %d files in %.2f seconds (%.1f files/sec). Failures: %d' % (
+            self.fileCount, self.elapsed, rate, len(self.failures))
+
+    def addResult(self, task, success: bool, message, report = print) -> None:
+        '''
+        @brief Add the result of a task
+        @param task The task
+        @param success True if the task succeeded
+        @param message The value returned by the worker if successful, otherwise the failure message
+        @param report Function called with the status or failure message. Default is print
+        '''
+        self.fileCount += 1
+        if success and isinstance(message, tuple):
+            if len(message) > 2:
+                self.data.append((task, message[2]))
+            message, stats = message[0], message[1]
+            if stats:
+                if self.stats is None:
+                    self.stats = stats
+                else:
+                    self.stats.merge(stats)
+        if success:
+            if report and message:
+                report(message)
+        else:
+            self.failures.append((task, message))
+            if report:
+                report('Failed to convert "%s": %s' % (task[0] if isinstance(task, tuple) else task, message))
+
+def _raiseTimeout(signum, frame):
+    '''
+    @brief Signal handler raising a timeout error
+    '''
+    raise BatchTimeoutError()
+
+def runTask(args: tuple) -> tuple:
+    '''
+    @brief Run a single task, catching any errors so that one bad file does not abort the batch.
+    A time limit is only enforced when called on the main thread. See the module documentation.
+    @param args Tuple of (worker, task, timeout)
+    @return Tuple of (task, success, message)
+    '''
+    worker, task, timeout = args
+
+    # Timeouts are only supported where interval timers are available
+    useAlarm = bool(timeout) and hasattr(signal, 'setitimer') and threading.current_thread() is threading.main_thread()
+    if useAlarm:
+        previousHandler = signal.signal(signal.SIGALRM, _raiseTimeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return task, True, worker(task)
+    except BatchTimeoutError:
+        return task, False, 'Timed out after %g seconds' % timeout
+    except Exception as err:
+        return task, False, '%s: %s' % (type(err).__name__, err)
+    finally:
+        if useAlarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previousHandler)
+
+def _runChunk(chunk: list) -> list:
+    '''
+    @brief Run a chunk of tasks in a worker process
+    @param chunk List of runTask() arguments
+    @return List of runTask() results
+    '''
+    return [runTask(args) for args in chunk]
+
+# Number of chunks queued for each worker process. Only the queued chunks have to be run
+# again if a worker process terminates.
+_CHUNKS_PER_JOB = 2
+
+def _runPool(chunks, jobs: int, result: BatchResult, report) -> list:
+    '''
+    @brief Run chunks of tasks on a pool of worker processes until all chunks are run or a worker process terminates
+    @param chunks Iterator of lists of runTask() arguments. Chunks which have not been queued are left in the iterator
+    @param jobs The number of worker processes
+    @param result The batch results to add to
+    @param report Function called with a message as each task completes
+    @return List of the runTask() arguments of the chunks which were queued when a worker process terminated
+    '''
+    import concurrent.futures
+    from concurrent.futures.process import BrokenProcessPool
+
+    broken = []
+    with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+        pending = {}
+        def submit() -> None:
+            for chunk in itertools.islice(chunks, jobs * _CHUNKS_PER_JOB - len(pending)):
+                pending[executor.submit(_runChunk, chunk)] = chunk
+        submit()
+        while pending:
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                chunk = pending.pop(future)
+                try:
+                    for taskResult in future.result():
+                        result.addResult(*taskResult, report)
+                except BrokenProcessPool:
+                    broken.extend(chunk)
+            if broken:
+                # All queued chunks fail with the pool
+                for future, chunk in pending.items():
+                    if future.done() and future.exception() is None:
+                        for taskResult in future.result():
+                            result.addResult(*taskResult, report)
+                    else:
+                        broken.extend(chunk)
+                break
+            submit()
+    return broken
+
+def runBatch(worker, tasks: list, jobs: int = 1, chunkSize: int = 1, timeout: float = None, report = print) -> BatchResult:
+    '''
+    @brief Run a worker function over a list of tasks.
+    @param worker A module level function taking a task and returning a status message,
+    or a tuple of (status message, ConversionStats) or (status message, ConversionStats, data).
+    Failures are signalled by raising an exception.
+    @param tasks The list of tasks. Each task must be picklable when jobs is greater than 1.
+    @param jobs The number of worker processes. 1 runs in the current process and 0 uses all available CPUs. Default is 1
+    @param chunkSize The number of tasks sent to a worker process at a time. Default is 1
+    @param timeout The time limit in seconds for each task. See the module documentation for its limits. Default is None for no limit
+    @param report Function called with a message as each task completes. Default is print
+    @return The batch results
+    '''
+    result = BatchResult()
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(tasks)) if tasks else 1
+
+    args = [(worker, task, timeout) for task in tasks]
+    start = time.perf_counter()
+
+    if jobs == 1:
+        for arg in args:
+            result.addResult(*runTask(arg), report)
+    else:
+        chunkSize = max(chunkSize, 1)
+        chunks = iter([args[i:i + chunkSize] for i in range(0, len(args), chunkSize)])
+        while True:
+            broken = _runPool(chunks, jobs, result, report)
+            if not broken:
+                break
+            # Run the tasks which were queued when a worker process terminated one at a time,
+            # to find the tasks which terminate it. The remaining chunks then run in a new pool.
+            for arg in broken:
+                if _runPool(iter([[arg]]), 1, result, report):
+                    result.addResult(arg[1], False, 'Worker process terminated unexpectedly', report)
+
+    result.elapsed = time.perf_counter() - start
+    return result
@@ -0,0 +1,176 @@
+# cache.py
+
+'''
+@file
+This module contains a cache for MaterialX library documents.
+
+Loaded libraries are memoized in-process so that repeated conversions share a single
+library document. Optionally a snapshot of each loaded library is written to a cache
+folder as a single XML document, which loads faster than parsing the library folders
+and resolving each file again.
+'''
+from __future__ import annotations
+
+import materialxjson
+from materialxjson.core import mx
+
+import hashlib
+import json
+import os
+
+# Environment variable for the default snapshot folder
+LIBRARY_CACHE_ENV_VAR = 'MATERIALXJSON_LIBRARY_CACHE'
+# Attribute used to store the source URI of each top level element in a snapshot
+SOURCE_URI_ATTRIBUTE = 'mtlxjson_sourceuri'
+
+class LibraryCache:
+    '''
+    Class for caching MaterialX library documents.
+
+    Snapshots are keyed by the MaterialX and materialxjson versions, the search path, the library folders
+    and the modification times and sizes of the library files, so edits to a library
+    result in it being loaded again.
+
+    In memory, libraries are looked up by search path and library folders alone, so that a repeated
+    load does not visit the library files. The files are checked when the libraries are first loaded
+    in the process, and again when load() is called with validate set or after clear().
+
+    The returned library documents are shared and must not be modified.
+    '''
+    def __init__(self, cacheFolder: str = None):
+        '''
+        @brief Constructor
+        @param cacheFolder Folder to store library snapshots in. Default is None to only cache in memory
+        '''
+        self.cacheFolder = cacheFolder
+        # (key, library document) tuples by search path and library folders
+        self._libraries = {}
+
+    def clear(self) -> None:
+        '''
+        @brief Clear the in-process cache. Snapshots on disk are kept.
+        '''
+        self._libraries = {}
+
+    @staticmethod
+    def getKey(searchPath: mx.FileSearchPath, libraryFolders: list) -> str:
+        '''
+        @brief Compute the cache key for a set of libraries
+        @param searchPath The search path to use
+        @param libraryFolders The library folders to use
+        @return The cache key
+        '''
+        files = []
+        for libraryFolder in libraryFolders:
+            folder = searchPath.find(mx.FilePath(libraryFolder)).asString()
+            for root, dirs, fileNames in os.walk(folder):
+                dirs.sort()
+                for fileName in sorted(fileNames):
+                    if fileName.lower().endswith('.mtlx'):
+                        path = os.path.join(root, fileName)
+                        stat = os.stat(path)
+                        files.append((path, stat.st_mtime_ns, stat.st_size))
+
+        keyData = {
+            'materialx': mx.getVersionString(),
+            'materialxjson': materialxjson.__version__,
+            'searchPath': searchPath.asString(),
+            'libraryFolders': list(libraryFolders),
+            'files': files,
+        }
+        return hashlib.blake2b(json.dumps(keyData).encode('utf-8'), digest_size=20).hexdigest()
+
+    def _snapshotFileName(self, key: str) -> str:
+        '''
+        @brief Get the snapshot file name for a cache key
+        '''
+        return os.path.join(self.cacheFolder, 'library_%s.mtlx' % key)
+
+    def _readSnapshot(self, fileName: str) -> mx.Document:
+        '''
+        @brief Read a library snapshot, restoring the source URI of each top level element
+        @return The library document or None if the snapshot could not be read
+        '''
+        lib = mx.createDocument()
+        try:
+            mx.readFromXmlFile(lib, fileName)
+        except mx.Exception:
+            return None
+        for elem in lib.getChildren():
+            if elem.hasAttribute(SOURCE_URI_ATTRIBUTE):
+                elem.setSourceUri(elem.getAttribute(SOURCE_URI_ATTRIBUTE))
+                elem.removeAttribute(SOURCE_URI_ATTRIBUTE)
+        return lib
+
+    def _writeSnapshot(self, lib: mx.Document, fileName: str) -> None:
+        '''
+        @brief Write a library snapshot as a single XML document. The source URI of each top level
+        element is stored in an attribute. The file is replaced atomically.
+        '''
+        snapshot = mx.createDocument()
+        snapshot.copyContentFrom(lib)
+        for elem, libElem in zip(snapshot.getChildren(), lib.getChildren()):
+            if libElem.hasSourceUri():
+                elem.setAttribute(SOURCE_URI_ATTRIBUTE, libElem.getSourceUri())
+            elem.setSourceUri('')
+
+        writeOptions = mx.XmlWriteOptions()
+        writeOptions.writeXIncludeEnable = False
+        os.makedirs(self.cacheFolder, exist_ok=True)
+        tempFileName = '%s.%d.tmp' % (fileName, os.getpid())
+        mx.writeToXmlFile(snapshot, tempFileName, writeOptions)
+        os.replace(tempFileName, fileName)
+
+    def load(self, searchPath: mx.FileSearchPath, libraryFolders: list, validate: bool = False) -> tuple:
+        '''
+        @brief Load libraries, using the in-process cache or a snapshot if available
+        @param searchPath The search path to use
+        @param libraryFolders The library folders to use
+        @param validate Check the library files for changes even if the libraries are in the in-process cache.
+        Default is False
+        @return A tuple containing the shared library document and a status string
+        '''
+        memoryKey = (searchPath.asString(), tuple(libraryFolders))
+        entry = self._libraries.get(memoryKey)
+        if entry and not validate:
+            return entry[1], '- Loaded %d library definitions from memory cache' % len(entry[1].getNodeDefs())
+
+        key = self.getKey(searchPath, libraryFolders)
+        if entry and entry[0] == key:
+            return entry[1], '- Loaded %d library definitions from memory cache' % len(entry[1].getNodeDefs())
+
+        if self.cacheFolder:
+            fileName = self._snapshotFileName(key)
+            if os.path.isfile(fileName):
+                lib = self._readSnapshot(fileName)
+                if lib:
+                    self._libraries[memoryKey] = (key, lib)
+                    return lib, '- Loaded %d library definitions from cache "%s"' % (len(lib.getNodeDefs()), fileName)
+
+        lib = mx.createDocument()
+        try:
+            libFiles = mx.loadLibraries(libraryFolders, searchPath, lib)
+            status = '- Loaded %d library definitions from %d files' % (len(lib.getNodeDefs()), len(libFiles))
+        except mx.Exception as err:
+            return lib, '- Failed to load library definitions: "%s"' % err
+
+        self._libraries[memoryKey] = (key, lib)
+        if self.cacheFolder:
+            try:
+                self._writeSnapshot(lib, self._snapshotFileName(key))
+            except (OSError, mx.Exception) as err:
+                status += '. Failed to write cache: "%s"' % err
+        return lib, status
+
+_defaultCache = None
+
+def getLibraryCache() -> LibraryCache:
+    '''
+    @brief Get the shared library cache. Snapshots are written to the folder given by the
+    MATERIALXJSON_LIBRARY_CACHE environment variable if it is set.
+    @return The shared library cache
+    '''
+    global _defaultCache
+    if _defaultCache is None:
+        _defaultCache = LibraryCache(os.environ.get(LIBRARY_CACHE_ENV_VAR) or None)
+    return _defaultCache
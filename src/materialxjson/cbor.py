@@ -0,0 +1,410 @@
+# cbor.py
+
+'''
+@file
+This module contains a minimal CBOR (RFC 8949) encoder and decoder for the JSON data model
+used by the MaterialX JSON representation: maps, arrays, text strings, integers, floats,
+booleans and null. Byte strings are also supported.
+
+Repeated strings such as the "name", "type" and "value" keys are encoded once and then
+referenced by index using the CBOR string reference extension (tags 256 and 25).
+'''
+
+import struct
+
+# Tag marking the data as CBOR
+SELF_DESCRIBE_TAG = 55799
+# Tag starting a string reference namespace
+STRINGREF_NAMESPACE_TAG = 256
+# Tag for a reference to a previously encoded string
+STRINGREF_TAG = 25
+
+# Major types
+_MAJOR_UINT = 0
+_MAJOR_NEGINT = 1
+_MAJOR_BYTES = 2
+_MAJOR_TEXT = 3
+_MAJOR_ARRAY = 4
+_MAJOR_MAP = 5
+_MAJOR_TAG = 6
+_MAJOR_SIMPLE = 7
+
+# Additional information value for indefinite length items, and the break code
+_INDEFINITE = 31
+_BREAK = 0xff
+
+_SELF_DESCRIBE_HEAD = b'\xd9\xd9\xf7'
+_STRINGREF_NAMESPACE_HEAD = b'\xd9\x01\x00'
+_STRINGREF_HEAD = b'\xd8\x19'
+
+class CborDecodeError(ValueError):
+    '''
+    Exception raised for data which is not valid CBOR.
+    '''
+    def __init__(self, message: str, pos: int):
+        '''
+        @brief Constructor
+        @param message The error message
+        @param pos The byte offset at which the error was found
+        '''
+        ValueError.__init__(self, '%s: byte %d' % (message, pos))
+        self.msg = message
+        self.pos = pos
+
+def _minStringReferenceLength(index: int) -> int:
+    '''
+    @brief Get the minimum length in bytes of a string for it to be added to the string table
+    at the given index, as defined by the string reference extension. Shorter strings would not
+    be made smaller by a reference.
+    '''
+    if index < 24:
+        return 3
+    if index < 0x100:
+        return 4
+    if index < 0x10000:
+        return 5
+    if index < 0x100000000:
+        return 7
+    return 11
+
+def _head(major: int, value: int) -> bytes:
+    '''
+    @brief Encode the initial byte and argument of a data item
+    '''
+    major <<= 5
+    if value < 24:
+        return bytes((major | value,))
+    if value < 0x100:
+        return bytes((major | 24, value))
+    if value < 0x10000:
+        return struct.pack('>BH', major | 25, value)
+    if value < 0x100000000:
+        return struct.pack('>BI', major | 26, value)
+    return struct.pack('>BQ', major | 27, value)
+
+# Encoded heads for arguments below 256, indexed by major type and argument
+_SMALL_HEADS = [[_head(major, value) for value in range(0x100)] for major in range(8)]
+
+class CborEncoder:
+    '''
+    Class for encoding JSON compatible Python objects as CBOR.
+    '''
+    def __init__(self, stringReferences: bool = True, selfDescribe: bool = True):
+        '''
+        @brief Constructor
+        @param stringReferences Encode repeated strings as references. Default is True
+        @param selfDescribe Start the data with the self-described CBOR tag. Default is True
+        '''
+        self.stringReferences = stringReferences
+        self.selfDescribe = selfDescribe
+
+    def encode(self, obj) -> bytes:
+        '''
+        @brief Encode an object
+        @param obj The object to encode
+        @return The CBOR data
+        '''
+        out = bytearray()
+        if self.selfDescribe:
+            out += _SELF_DESCRIBE_HEAD
+        if self.stringReferences:
+            out += _STRINGREF_NAMESPACE_HEAD
+        # Encoded strings with their length in bytes, and indices of strings in the string table
+        self._encoded = {}
+        self._references = {} if self.stringReferences else None
+        self._encode(obj, out)
+        self._encoded = None
+        self._references = None
+        return bytes(out)
+
+    def _encodeString(self, value, out: bytearray) -> None:
+        '''
+        @brief Encode a text or byte string, or a reference to it if it has been encoded before
+        '''
+        references = self._references
+        if references is not None:
+            index = references.get(value)
+            if index is not None:
+                out += _STRINGREF_HEAD
+                out += _SMALL_HEADS[_MAJOR_UINT][index] if index < 0x100 else _head(_MAJOR_UINT, index)
+                return
+
+        cached = self._encoded.get(value)
+        if cached is None:
+            if isinstance(value, str):
+                data = value.encode('utf-8')
+                cached = (_head(_MAJOR_TEXT, len(data)) + data, len(data))
+            else:
+                data = bytes(value)
+                cached = (_head(_MAJOR_BYTES, len(data)) + data, len(data))
+            self._encoded[value] = cached
+        encoded, length = cached
+        out += encoded
+
+        if references is not None:
+            index = len(references)
+            if length >= _minStringReferenceLength(index):
+                references[value] = index
+
+    def _encode(self, obj, out: bytearray) -> None:
+        '''
+        @brief Encode an object and its contents
+        '''
+        objType = type(obj)
+        if objType is str:
+            self._encodeString(obj, out)
+        elif objType is dict:
+            length = len(obj)
+            out += _SMALL_HEADS[_MAJOR_MAP][length] if length < 0x100 else _head(_MAJOR_MAP, length)
+            encode = self._encode
+            encodeString = self._encodeString
+            for key, value in obj.items():
+                if type(key) is str:
+                    encodeString(key, out)
+                else:
+                    encode(key, out)
+                if type(value) is str:
+                    encodeString(value, out)
+                else:
+                    encode(value, out)
+        elif objType is list or objType is tuple:
+            length = len(obj)
+            out += _SMALL_HEADS[_MAJOR_ARRAY][length] if length < 0x100 else _head(_MAJOR_ARRAY, length)
+            encode = self._encode
+            for value in obj:
+                encode(value, out)
+        elif obj is True:
+            out.append(0xf5)
+        elif obj is False:
+            out.append(0xf4)
+        elif obj is None:
+            out.append(0xf6)
+        elif objType is int:
+            if obj >= 0:
+                out += _head(_MAJOR_UINT, obj)
+            else:
+                out += _head(_MAJOR_NEGINT, -1 - obj)
+        elif objType is float:
+            out += struct.pack('>Bd', 0xfb, obj)
+        elif isinstance(obj, (bytes, bytearray)):
+            self._encodeString(bytes(obj), out)
+        elif isinstance(obj, str):
+            self._encodeString(str(obj), out)
+        elif isinstance(obj, dict):
+            self._encode(dict(obj), out)
+        elif isinstance(obj, (list, tuple)):
+            self._encode(list(obj), out)
+        elif isinstance(obj, int):
+            self._encode(int(obj), out)
+        elif isinstance(obj, float):
+            self._encode(float(obj), out)
+        else:
+            raise TypeError('Object of type %s is not CBOR serializable' % type(obj).__name__)
+
+class CborDecoder:
+    '''
+    Class for decoding CBOR data into Python objects.
+    Tags other than the self-described and string reference tags are ignored and their content returned.
+    '''
+    def __init__(self, data):
+        '''
+        @brief Constructor
+        @param data The bytes-like object to decode
+        '''
+        self._data = bytes(data)
+        self._pos = 0
+        self._references = None
+
+    def decode(self):
+        '''
+        @brief Decode the data
+        @return The decoded object
+        '''
+        self._pos = 0
+        self._references = None
+        try:
+            obj = self._decode()
+        except (IndexError, struct.error):
+            raise CborDecodeError('Unexpected end of data', len(self._data))
+        except UnicodeDecodeError:
+            raise CborDecodeError('Invalid UTF-8 string', self._pos)
+        if self._pos != len(self._data):
+            raise CborDecodeError('Extra data', self._pos)
+        return obj
+
+    def _argument(self, info: int) -> int:
+        '''
+        @brief Read the argument of a data item. Returns None for indefinite length items.
+        '''
+        if info < 24:
+            return info
+        data = self._data
+        pos = self._pos
+        if info == 24:
+            self._pos = pos + 1
+            return data[pos]
+        if info == 25:
+            self._pos = pos + 2
+            return struct.unpack_from('>H', data, pos)[0]
+        if info == 26:
+            self._pos = pos + 4
+            return struct.unpack_from('>I', data, pos)[0]
+        if info == 27:
+            self._pos = pos + 8
+            return struct.unpack_from('>Q', data, pos)[0]
+        if info == _INDEFINITE:
+            return None
+        raise CborDecodeError('Invalid additional information %d' % info, pos - 1)
+
+    def _isBreak(self) -> bool:
+        '''
+        @brief Consume the break code ending an indefinite length item if it is next
+        '''
+        if self._data[self._pos] == _BREAK:
+            self._pos += 1
+            return True
+        return False
+
+    def _string(self, major: int, length: int):
+        '''
+        @brief Read a text or byte string, adding it to the string table if it qualifies
+        '''
+        pos = self._pos
+        if length is None:
+            # Indefinite length strings are a sequence of definite length chunks
+            chunks = []
+            while not self._isBreak():
+                initial = self._data[self._pos]
+                self._pos += 1
+                if initial >> 5 != major:
+                    raise CborDecodeError('Invalid string chunk', self._pos - 1)
+                chunks.append(self._string(major, self._argument(initial & 0x1f)))
+            return ''.join(chunks) if major == _MAJOR_TEXT else b''.join(chunks)
+
+        end = pos + length
+        if end > len(self._data):
+            raise IndexError
+        self._pos = end
+        value = self._data[pos:end]
+        if major == _MAJOR_TEXT:
+            value = value.decode('utf-8')
+
+        references = self._references
+        if references is not None:
+            if length >= _minStringReferenceLength(len(references)):
+                references.append(value)
+        return value
+
+    def _decode(self):
+        '''
+        @brief Decode the next data item and its contents
+        '''
+        data = self._data
+        pos = self._pos
+        initial = data[pos]
+        pos += 1
+        major = initial >> 5
+        info = initial & 0x1f
+
+        # Fast paths for short text strings and string references, which make up most of a document
+        if major == _MAJOR_TEXT and info < 24:
+            end = pos + info
+            if end > len(data):
+                raise IndexError
+            self._pos = end
+            value = data[pos:end].decode('utf-8')
+            references = self._references
+            if references is not None and info >= _minStringReferenceLength(len(references)):
+                references.append(value)
+            return value
+        if initial == 0xd8 and data[pos] == STRINGREF_TAG and data[pos + 1] < 24 and self._references is not None:
+            index = data[pos + 1]
+            if index < len(self._references):
+                self._pos = pos + 2
+                return self._references[index]
+        self._pos = pos
+
+        if major == _MAJOR_TEXT or major == _MAJOR_BYTES:
+            return self._string(major, self._argument(info))
+
+        decode = self._decode
+        if major == _MAJOR_MAP:
+            length = self._argument(info)
+            result = {}
+            if length is None:
+                while not self._isBreak():
+                    key = decode()
+                    result[key] = decode()
+            else:
+                for _ in range(length):
+                    key = decode()
+                    result[key] = decode()
+            return result
+
+        if major == _MAJOR_ARRAY:
+            length = self._argument(info)
+            if length is None:
+                result = []
+                while not self._isBreak():
+                    result.append(decode())
+                return result
+            return [decode() for _ in range(length)]
+
+        if major == _MAJOR_UINT:
+            return self._argument(info)
+
+        if major == _MAJOR_NEGINT:
+            return -1 - self._argument(info)
+
+        if major == _MAJOR_TAG:
+            tag = self._argument(info)
+            if tag == STRINGREF_NAMESPACE_TAG:
+                outer = self._references
+                self._references = []
+                try:
+                    return self._decode()
+                finally:
+                    self._references = outer
+            if tag == STRINGREF_TAG:
+                pos = self._pos
+                index = self._decode()
+                if self._references is None or not isinstance(index, int) or index >= len(self._references):
+                    raise CborDecodeError('Invalid string reference', pos)
+                return self._references[index]
+            return self._decode()
+
+        # Simple values and floats
+        if info == 20:
+            return False
+        if info == 21:
+            return True
+        if info == 22 or info == 23:
+            return None
+        pos = self._pos
+        if info == 25:
+            self._pos = pos + 2
+            return struct.unpack_from('>e', data, pos)[0]
+        if info == 26:
+            self._pos = pos + 4
+            return struct.unpack_from('>f', data, pos)[0]
+        if info == 27:
+            self._pos = pos + 8
+            return struct.unpack_from('>d', data, pos)[0]
+        raise CborDecodeError('Unsupported simple value %d' % info, pos - 1)
+
+def encode(obj, stringReferences: bool = True) -> bytes:
+    '''
+    @brief Encode a JSON compatible object as CBOR
+    @param obj The object to encode
+    @param stringReferences Encode repeated strings as references. Default is True
+    @return The CBOR data
+    '''
+    return CborEncoder(stringReferences).encode(obj)
+
+def decode(data):
+    '''
+    @brief Decode CBOR data
+    @param data The bytes-like object to decode
+    @return The decoded object
+    '''
+    return CborDecoder(data).decode()
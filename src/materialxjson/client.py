@@ -0,0 +1,263 @@
+#!/usr/bin/env python
+'''
+@file
+This module contains the client for the local conversion server in the server module.
+
+The client only uses the standard library and does not load MaterialX, so that it starts
+quickly. A ConversionClient keeps its connection open between requests.
+'''
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import sys
+import urllib.parse
+
+# Default address of the conversion server
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8737
+
+# Header which requests to the server must have, with the value "1". Web pages cannot add it to
+# cross-site requests without a preflight request, which the server does not answer
+REQUEST_HEADER = 'X-MaterialXJson'
+
+# Conversion commands supported by the server
+COMMANDS = ['m2j', 'j2m']
+
+class ClientError(Exception):
+    '''
+    Exception raised when the server rejects a request.
+
+    Members:
+        - status: The HTTP status code
+    '''
+    def __init__(self, status: int, message: str):
+        '''
+        @brief Constructor
+        @param status The HTTP status code
+        @param message The error message returned by the server
+        '''
+        super().__init__(message)
+        self.status = status
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    '''
+    HTTP connection over a Unix domain socket.
+    '''
+    def __init__(self, socketPath: str, timeout: float = None):
+        '''
+        @brief Constructor
+        @param socketPath The path of the socket
+        @param timeout The socket timeout in seconds. Default is None for no timeout
+        '''
+        super().__init__('localhost', timeout=timeout)
+        self.socketPath = socketPath
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socketPath)
+
+class ConversionClient:
+    '''
+    Class for sending requests to a conversion server.
+
+    Options are passed as a dictionary of server option names to values, e.g. { 'typedValues': True }.
+    Options which are not given use the defaults of the server.
+    '''
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, socketPath: str = '', timeout: float = 60):
+        '''
+        @brief Constructor
+        @param host The host of the server. Default is DEFAULT_HOST
+        @param port The port of the server. Default is DEFAULT_PORT
+        @param socketPath The Unix socket of the server, used instead of the host and port if set. Default is ''
+        @param timeout The socket timeout in seconds. Default is 60
+        '''
+        self.host = host
+        self.port = port
+        self.socketPath = socketPath
+        self.timeout = timeout
+        self._connection = None
+
+    def close(self) -> None:
+        '''
+        @brief Close the connection to the server
+        '''
+        if self._connection:
+            self._connection.close()
+            self._connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _connect(self) -> http.client.HTTPConnection:
+        '''
+        @brief Get the connection to the server, connecting if not connected
+        '''
+        if not self._connection:
+            if self.socketPath:
+                self._connection = UnixHTTPConnection(self.socketPath, self.timeout)
+            else:
+                self._connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return self._connection
+
+    def request(self, method: str, path: str, options: dict = None, body: bytes = None) -> bytes:
+        '''
+        @brief Send a request to the server
+        @param method The HTTP method
+        @param path The request path, e.g. "/m2j"
+        @param options Dictionary of query parameters. Default is None
+        @param body The request body. Default is None
+        @return The response body
+        @throws ClientError if the server rejects the request
+        @throws OSError if the server cannot be reached
+        '''
+        if options:
+            query = { name: (str(value).lower() if isinstance(value, bool) else str(value))
+                      for name, value in options.items() if value is not None }
+            path += '?' + urllib.parse.urlencode(query)
+        headers = { 'Content-Length': str(len(body) if body else 0), REQUEST_HEADER: '1' }
+
+        # Retry once on a new connection if the server closed a kept-alive connection
+        for attempt in range(2):
+            connection = self._connect()
+            try:
+                connection.request(method, path, body, headers)
+                response = connection.getresponse()
+                data = response.read()
+                break
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                self.close()
+                if attempt:
+                    raise
+        if response.will_close:
+            self.close()
+        if response.status != 200:
+            raise ClientError(response.status, data.decode('utf-8', 'replace'))
+        return data
+
+    def convert(self, command: str, data: bytes = None, options: dict = None, inputFile: str = None,
+                outputFile: str = None) -> bytes:
+        '''
+        @brief Convert a document
+        @param command "m2j" to convert XML to JSON or "j2m" to convert JSON to XML
+        @param data The document to convert. Default is None to convert inputFile
+        @param options Dictionary of conversion options. Default is None
+        @param inputFile File for the server to read the document from, which must be within the file root of the server.
+        Default is None
+        @param outputFile File for the server to write the result to, which must be within the file root of the server.
+        Default is None to return the result
+        @return The converted document, or the JSON status of the server if outputFile is set
+        @throws ClientError if the conversion fails
+        '''
+        if command not in COMMANDS:
+            raise ValueError('Unknown command "%s". Commands: %s' % (command, ', '.join(COMMANDS)))
+        options = dict(options or {})
+        # The server may run in another folder
+        if inputFile:
+            options['input'] = os.path.abspath(inputFile)
+        if outputFile:
+            options['output'] = os.path.abspath(outputFile)
+        return self.request('POST', '/' + command, options, data)
+
+    def xmlToJson(self, xmlString: str, options: dict = None) -> str:
+        '''
+        @brief Convert a MaterialX XML string to a JSON string
+        @param xmlString The XML string
+        @param options Dictionary of conversion options. Default is None
+        @return The JSON string
+        '''
+        return self.convert('m2j', xmlString.encode('utf-8'), options).decode('utf-8')
+
+    def jsonToXml(self, jsonString: str, options: dict = None) -> str:
+        '''
+        @brief Convert a JSON string to a MaterialX XML string
+        @param jsonString The JSON string
+        @param options Dictionary of conversion options. Default is None
+        @return The XML string
+        '''
+        return self.convert('j2m', jsonString.encode('utf-8'), options).decode('utf-8')
+
+    def status(self) -> dict:
+        '''
+        @brief Get the status of the server
+        @return Dictionary with the server versions, options and request counters
+        '''
+        return json.loads(self.request('GET', '/status'))
+
+    def shutdown(self) -> None:
+        '''
+        @brief Stop the server
+        '''
+        self.request('POST', '/shutdown')
+        self.close()
+
+def main(argv: list = None, prog: str = None) -> int:
+    '''
+    Command to send conversion requests to a conversion server
+    '''
+    parser = argparse.ArgumentParser(prog=prog, description='Client for the MaterialX JSON conversion server')
+    parser.add_argument('--host', dest='host', default=DEFAULT_HOST, help='Host of the server. Default is %s.' % DEFAULT_HOST)
+    parser.add_argument('--port', dest='port', type=int, default=DEFAULT_PORT, help='Port of the server. Default is %d.' % DEFAULT_PORT)
+    parser.add_argument('--socket', dest='socket', default='', help='Unix socket of the server, used instead of the host and port.')
+    parser.add_argument('--output', dest='output', default='', help='File to write the result to. Default is to write to standard output.')
+    parser.add_argument('--paths', dest='paths', default='false', help='Send file paths for the server to read and write instead of file contents. The files must be within the file root of the server. Default is False.')
+    parser.add_argument('--indent', dest='indent', help='Indentation for nested elements. Default is the server option.')
+    parser.add_argument('--compact', dest='compact', help='Write in compact format. Default is the server option.')
+    parser.add_argument('--typedValues', dest='typedValues', help='Write values as JSON numbers, booleans and arrays. Default is the server option.')
+    parser.add_argument('--stringTable', dest='stringTable', help='Write keys and repeated strings once in a string table. Default is the server option.')
+    parser.add_argument('--skipLibraryElements', dest='skipLibraryElements', help='Skip any library elements. Default is the server option.')
+    parser.add_argument('--upgradeVersion', dest='upgradeVersion', help='Upgrade document version. Default is the server option.')
+    parser.add_argument('--validate', dest='validate', help='Validate documents against the server libraries. Default is the server option.')
+    parser.add_argument(dest='command', choices=COMMANDS + ['status', 'stop'], help='Conversion command, "status" to print the server status or "stop" to stop the server.')
+    parser.add_argument(dest='inputFileName', nargs='?', default='', help='File to convert. Default is to read from standard input.')
+
+    # Allow options between the command and the input file
+    opts = parser.parse_intermixed_args(argv)
+    client = ConversionClient(opts.host, opts.port, opts.socket)
+    try:
+        if opts.command == 'status':
+            print(json.dumps(client.status(), indent=2))
+            return 0
+        if opts.command == 'stop':
+            client.shutdown()
+            return 0
+
+        options = { name: getattr(opts, name) for name in ('indent', 'compact', 'typedValues', 'stringTable',
+                    'skipLibraryElements', 'upgradeVersion', 'validate') }
+        if opts.paths.lower() in ('true', '1'):
+            if not opts.inputFileName or not opts.output:
+                print('An input file and --output are required with --paths')
+                return 1
+            client.convert(opts.command, None, options, opts.inputFileName, opts.output)
+            return 0
+
+        if opts.inputFileName:
+            with open(opts.inputFileName, 'rb') as infile:
+                data = infile.read()
+        else:
+            data = sys.stdin.buffer.read()
+        result = client.convert(opts.command, data, options)
+        if opts.output:
+            with open(opts.output, 'wb') as outfile:
+                outfile.write(result)
+        else:
+            sys.stdout.buffer.write(result)
+    except ClientError as err:
+        print('Conversion failed: %s' % err, file=sys.stderr)
+        return 1
+    except OSError as err:
+        print('Failed to connect to server: %s' % err, file=sys.stderr)
+        return 1
+    finally:
+        client.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,19 +5,47 @@
 This module contains the core definitions and utilities for reading and wring MaterialX
 in JSON format.
 '''
-
-# MaterialX support
-import MaterialX as mx
+from __future__ import annotations
 
 # JSON support
 import json
 
 # Utilities
+import codecs
+import contextlib
+import fnmatch
+import importlib
+import io
+import re
 import os
+import time
+
+class LazyModule:
+    '''
+    Module proxy which imports the named module on first attribute access.
+    '''
+    def __init__(self, name: str):
+        '''
+        @brief Constructor
+        @param name The name of the module to import
+        '''
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr: str):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+# MaterialX support. MaterialX is only imported when first used so that the
+# constants and JSON utilities in this module can be used without loading it.
+mx = LazyModule('MaterialX')
 
 # Mime type
 JSON_MIMETYPE_KEY = 'mimetype'
 JSON_MIMETYPE: str = 'application/mtlx+json'
+# Mime type for the binary CBOR encoding of the JSON representation
+CBOR_MIMETYPE: str = 'application/mtlx+cbor'
 # We use a colon to separate the category and name of an element in the JSON hierarchy
 JSON_CATEGORY_NAME_SEPARATOR: str = ':'
 # The root of the JSON hierarchy
@@ -27,25 +55,303 @@ MATERIALX_DOCUMENT_ROOT: str = 'materialx'
 INPUTS_STRING = 'inputs'
 OUTPUTS_STRING = 'outputs'
 CHILDREN_STRING = 'children'
+# Child element arrays in the order in which they are read, and the category implied by each
+CHILD_KEY_CATEGORIES = { INPUTS_STRING: 'input', CHILDREN_STRING: None, OUTPUTS_STRING: 'output' }
+CHILD_KEYS = tuple(CHILD_KEY_CATEGORIES)
+# Keys of a JSON element which are not attributes
+NON_ATTRIBUTE_KEYS = frozenset(('name', 'category') + CHILD_KEYS)
+# Separator between element names in a name path, e.g. "NG_wood/image_color/file"
+NAME_PATH_SEPARATOR = '/'
+
+# Binary support and JSON layouts. These modules use the constants above.
+from materialxjson import cbor, fileio, jsoncodec, stringtable, values
+
+class ConversionStats:
+    '''
+    Class for collecting timings and counters during conversion.
+    An instance can be set on JsonWriteOptions or JsonReadOptions to enable collection.
+
+    Members:
+        - phaseTimes: Wall time in seconds for each conversion phase. Phases are:
+          xmlRead, xmlWrite, toJSON, fromJSON, upgradeVersion, jsonEncode, jsonDecode, cborEncode, cborDecode,
+          fileRead, fileWrite, verify
+        - categoryCounts: Number of elements converted for each category
+        - skippedElements: Number of elements skipped by the element predicate
+        - bytesRead: Number of bytes read from files
+        - bytesWritten: Number of bytes written to files
+    '''
+    def __init__(self):
+        '''
+        @brief Constructor
+        '''
+        self.phaseTimes = {}
+        self.categoryCounts = {}
+        self.skippedElements = 0
+        self.bytesRead = 0
+        self.bytesWritten = 0
+
+    def addTime(self, phase: str, seconds: float) -> None:
+        '''
+        @brief Add time to a phase
+        @param phase The phase name
+        @param seconds The time in seconds to add
+        '''
+        self.phaseTimes[phase] = self.phaseTimes.get(phase, 0.0) + seconds
+
+    @contextlib.contextmanager
+    def phase(self, phase: str):
+        '''
+        @brief Context manager which adds the wall time of its block to a phase
+        @param phase The phase name
+        '''
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.addTime(phase, time.perf_counter() - start)
+
+    def countElement(self, category: str) -> None:
+        '''
+        @brief Count a converted element
+        @param category The category of the element
+        '''
+        self.categoryCounts[category] = self.categoryCounts.get(category, 0) + 1
+
+    def elementCount(self) -> int:
+        '''
+        @brief Get the total number of converted elements
+        '''
+        return sum(self.categoryCounts.values())
+
+    def merge(self, other: ConversionStats) -> None:
+        '''
+        @brief Add the timings and counters of another stats object to this one
+        @param other The stats to add
+        '''
+        for phase, seconds in other.phaseTimes.items():
+            self.addTime(phase, seconds)
+        for category, count in other.categoryCounts.items():
+            self.categoryCounts[category] = self.categoryCounts.get(category, 0) + count
+        self.skippedElements += other.skippedElements
+        self.bytesRead += other.bytesRead
+        self.bytesWritten += other.bytesWritten
+
+    def toDict(self) -> dict:
+        '''
+        @brief Get the timings and counters as a JSON compatible dictionary
+        '''
+        return {
+            'phaseTimes': dict(self.phaseTimes),
+            'categoryCounts': dict(sorted(self.categoryCounts.items())),
+            'elementCount': self.elementCount(),
+            'skippedElements': self.skippedElements,
+            'bytesRead': self.bytesRead,
+            'bytesWritten': self.bytesWritten,
+        }
+
+    def summary(self) -> str:
+        '''
+        @brief Get a readable summary of the timings and counters
+        '''
+        lines = ['- Phase times:']
+        for phase, seconds in self.phaseTimes.items():
+            lines.append('  - %s: %.4f s' % (phase, seconds))
+        lines.append('- Elements: %d' % self.elementCount())
+        for category, count in sorted(self.categoryCounts.items()):
+            lines.append('  - %s: %d' % (category, count))
+        lines.append('- Skipped elements: %d' % self.skippedElements)
+        lines.append('- Bytes read: %d' % self.bytesRead)
+        lines.append('- Bytes written: %d' % self.bytesWritten)
+        return '\n'.join(lines)
+
+def statsPhase(stats: ConversionStats, phase: str):
+    '''
+    @brief Get a context manager timing a phase, or a no-op context if stats are not being collected
+    @param stats The stats to add to. May be None
+    @param phase The phase name
+    '''
+    return stats.phase(phase) if stats else contextlib.nullcontext()
+
+class TimedStream:
+    '''
+    File-like wrapper which records the time spent in read and write calls.
+    Used to separate file I/O time from JSON encode and decode time.
+    '''
+    def __init__(self, stream):
+        '''
+        @brief Constructor
+        @param stream The file-like object to wrap
+        '''
+        self._stream = stream
+        self.elapsed = 0.0
+
+    def read(self, *args):
+        start = time.perf_counter()
+        try:
+            return self._stream.read(*args)
+        finally:
+            self.elapsed += time.perf_counter() - start
+
+    def write(self, data):
+        start = time.perf_counter()
+        try:
+            return self._stream.write(data)
+        finally:
+            self.elapsed += time.perf_counter() - start
 
 class JsonWriteOptions:
     '''
     Class for holding options for writing MaterialX to JSON.
 
     Options:
-        - elementPredicate: MaterialX function predicate for filtering elements to write
+        - elementPredicate: MaterialX function predicate for filtering elements to write.
+          The predicate is called for elements at every depth and a rejected element is skipped with its subtree
+        - elementFilter: ElementFilter for filtering elements to write. Default is None to skip
+          elements with a source URI
         - indent: The number of spaces to indent the JSON hierarchy
         - separators: JSON separators. Default is: (',', ': ')
-        - addInputOutputCategories: Add input and output categories to JSON elements. Default is False
+        - addInputOutputCategories: Add input and output categories to top level JSON elements. Nested inputs
+          and outputs are written without a category, which is implied by the array they are in. Default is True
+        - streamOutput: Write JSON directly to the output stream in chunks without building
+          the intermediate JSON dictionary. Default is False
+        - typedValues: Write values as native JSON numbers, booleans and arrays based on the element type
+          instead of strings. See the values module. Default is False
+        - stringTable: Write the compact layout in which keys and repeated strings are stored once
+          in a document level string table. See the stringtable module. The layout is detected
+          when reading. streamOutput is ignored when this is set. Default is False
+        - codec: Name or instance of the JSON codec used to encode JSON text. The output is the same
+          for all codecs. See the jsoncodec module. Default is None to use the default codec
+        - compression: Compression of JSON files written by the Util functions: 'gzip', 'lzma' or 'none'.
+          Default is None to choose from the .gz or .xz file extension
+        - stats: ConversionStats to collect timings and counters in. Default is None
+        - structureHash: verify.StructureHash to add each written element to, with its attribute values
+          as read from the document, so that the output can be checked without traversing the document again.
+          Default is None
     '''
     def __init__(self):
         '''
         @brief Constructor
         '''
         self.elementPredicate: mx.ElementPredicate = None
+        self.elementFilter: ElementFilter = None
         self.indent = None
         self.separators = (',', ': ') 
         self.addInputOutputCategories = True
+        self.streamOutput = False
+        self.typedValues = False
+        self.stringTable = False
+        self.codec = None
+        self.compression = None
+        self.stats: ConversionStats = None
+        self.structureHash = None
+
+class ElementFilter:
+    '''
+    Class for declaratively filtering the elements written to JSON.
+
+    The filter is compiled to set lookups and a single regular expression per name rule,
+    and is applied to elements at every depth. An element which is rejected is skipped
+    along with its entire subtree.
+
+    An element is written if neither it nor any ancestor matches an exclude rule, and
+    either no include rules are set, or it or an ancestor matches all include rules that are set.
+    Include rules therefore select elements along with all of their descendants.
+
+    Options:
+        - includeCategories: Set of categories to include
+        - excludeCategories: Set of categories to exclude
+        - includeTypes: Set of types to include
+        - excludeTypes: Set of types to exclude
+        - includeNames: List of glob name patterns to include, e.g. 'NG_*'
+        - excludeNames: List of glob name patterns to exclude
+        - libraryElements: Which elements to write based on whether they have a source URI:
+          'local' for elements without a source URI, 'library' for elements with a source URI,
+          or 'all' for both. Default is 'local'
+        - predicate: Optional Python predicate called for elements which pass all other rules
+    '''
+    def __init__(self):
+        '''
+        @brief Constructor
+        '''
+        self.includeCategories = set()
+        self.excludeCategories = set()
+        self.includeTypes = set()
+        self.excludeTypes = set()
+        self.includeNames = []
+        self.excludeNames = []
+        self.libraryElements = 'local'
+        self.predicate = None
+
+    @staticmethod
+    def _compileNames(patterns: list):
+        '''
+        @brief Compile a list of glob patterns into a single match function
+        @return The match function or None if there are no patterns
+        '''
+        if not patterns:
+            return None
+        return re.compile('|'.join('(?:%s)' % fnmatch.translate(pattern) for pattern in patterns)).match
+
+    def compile(self, predicate = None):
+        '''
+        @brief Compile the filter into a test function.
+        The test function takes an element, its category and whether an ancestor matched the
+        include rules. It returns None if the element and its subtree are to be skipped,
+        otherwise whether the element or an ancestor matched the include rules.
+        @param predicate An additional Python predicate to apply after the filter rules. Default is None
+        @return The test function
+        '''
+        includeCategories = frozenset(self.includeCategories)
+        excludeCategories = frozenset(self.excludeCategories)
+        includeTypes = frozenset(self.includeTypes)
+        excludeTypes = frozenset(self.excludeTypes)
+        includeName = self._compileNames(self.includeNames)
+        excludeName = self._compileNames(self.excludeNames)
+        localOnly = self.libraryElements == 'local'
+        libraryOnly = self.libraryElements == 'library'
+        predicates = tuple(p for p in (self.predicate, predicate) if p)
+        checkTypes = bool(includeTypes or excludeTypes)
+        hasIncludes = bool(includeCategories or includeTypes or includeName or libraryOnly)
+
+        def test(elem: mx.Element, category: str, included: bool):
+            if localOnly and elem.hasSourceUri():
+                return None
+            if category in excludeCategories:
+                return None
+            if checkTypes:
+                elemType = elem.getAttribute('type')
+                if elemType in excludeTypes:
+                    return None
+            if excludeName and excludeName(elem.getName()):
+                return None
+            if hasIncludes and not included:
+                if includeCategories and category not in includeCategories:
+                    return None
+                if includeTypes and elemType not in includeTypes:
+                    return None
+                if includeName and not includeName(elem.getName()):
+                    return None
+                if libraryOnly and not elem.hasSourceUri():
+                    return None
+                included = True
+            for elemPredicate in predicates:
+                if not elemPredicate(elem):
+                    return None
+            return included
+
+        return test
+
+def compileElementTest(writeOptions: JsonWriteOptions = None):
+    '''
+    @brief Compile the element filter and element predicate of write options into a test function.
+    See ElementFilter.compile() for the signature of the test function.
+    @param writeOptions The write options to use. Default is None
+    @return The test function
+    '''
+    elementFilter = writeOptions.elementFilter if writeOptions else None
+    if not elementFilter:
+        elementFilter = ElementFilter()
+    return elementFilter.compile(writeOptions.elementPredicate if writeOptions else None)
 
 class JsonReadOptions:
     '''
@@ -53,68 +359,610 @@ class JsonReadOptions:
 
     Options:
         - upgradeVersion: Upgrade the MaterialX document to the latest version        
+        - streamInput: Read JSON files incrementally, creating top level elements as they are
+          parsed instead of loading the entire JSON file first. Default is False
+        - typedValues: Convert native JSON numbers, booleans and arrays in attribute values
+          to MaterialX value strings. Default is True
+        - codec: Name or instance of the JSON codec used to decode JSON text. See the jsoncodec module.
+          Default is None to use the default codec
+        - compression: Compression of JSON files read by the Util functions and documentFromJSONStream():
+          'gzip', 'lzma' or 'none'. Default is None to choose from the .gz or .xz file extension
+        - jobs: Number of worker processes to build the top level elements of a document in, or 0 to use
+          all CPUs, limited to the number of CPUs. See the parallel module. Streamed input is read on a single core. Default is 1
+        - stats: ConversionStats to collect timings and counters in. Default is None
+        - structureHash: verify.StructureHash to add each element read to, so that the output can be
+          checked without decoding the JSON again. Default is None
     '''
     def __init__(self):
         '''
         @brief Constructor
         '''
         self.upgradeVersion = True
+        self.streamInput = False
+        self.typedValues = True
+        self.codec = None
+        self.compression = None
+        self.jobs = 1
+        self.stats: ConversionStats = None
+        self.structureHash = None
+
+# Nesting level of the top level elements in the JSON text: root, document, children array, element
+_STREAM_TOP_LEVEL = 3
+
+class JsonStreamWriter:
+    '''
+    Class for writing a MaterialX document as JSON to a file-like object.
+
+    The document is traversed using an explicit stack and JSON text is written out in chunks
+    as elements are visited, so the intermediate JSON dictionary for the document is never built.
+    The output is identical to calling json.dump() on the result of MaterialXJson.documentToJSON()
+    with the same indentation and separators.
+    '''
+    def __init__(self, stream, writeOptions: JsonWriteOptions = None, chunkSize: int = 65536):
+        '''
+        @brief Constructor
+        @param stream The file-like object to write to
+        @param writeOptions The write options to use. Default is None
+        @param chunkSize The number of characters to buffer before writing to the stream. Default is 65536
+        '''
+        indent = 2
+        separators = (',', ': ')
+        if writeOptions:
+            indent = writeOptions.indent
+            separators = writeOptions.separators
+        if indent is not None and not isinstance(indent, str):
+            indent = ' ' * indent
+
+        self._stream = stream
+        self._stats = writeOptions.stats if writeOptions else None
+        self._addCategories = bool(writeOptions and writeOptions.addInputOutputCategories)
+        self._typedValues = bool(writeOptions and writeOptions.typedValues)
+        self._structureHash = writeOptions.structureHash if writeOptions else None
+        self._elementTest = compileElementTest(writeOptions)
+        self._chunkSize = chunkSize
+        self._indent = indent
+        self._itemSeparator, self._keySeparator = separators
+        self._newlines = []
+        self._buffer = []
+        self._bufferSize = 0
+
+    def _newline(self, level: int) -> str:
+        '''
+        @brief Get the newline and indentation string for a given nesting level
+        '''
+        if self._indent is None:
+            return ''
+        while len(self._newlines) <= level:
+            self._newlines.append('\n' + self._indent * len(self._newlines))
+        return self._newlines[level]
+
+    def _write(self, text: str) -> None:
+        '''
+        @brief Buffer text and write it to the stream once the chunk size is reached
+        '''
+        self._buffer.append(text)
+        self._bufferSize += len(text)
+        if self._bufferSize >= self._chunkSize:
+            self.flush()
+
+    def flush(self) -> None:
+        '''
+        @brief Write any buffered text to the stream
+        '''
+        if self._buffer:
+            self._stream.write(''.join(self._buffer))
+            self._buffer = []
+            self._bufferSize = 0
+
+    def _writeElement(self, elem: mx.Element, category: str, level: int, included: bool, prefix: str, stack: list) -> None:
+        '''
+        @brief Write the name and attributes of an element and push its children and
+        closing tokens onto the traversal stack.
+        @param elem The MaterialX element to write
+        @param category The category of the element
+        @param level The nesting level of the element
+        @param included Whether the element or an ancestor matched the element filter include rules
+        @param prefix The name path prefix of the element
+        @param stack The traversal stack
+        '''
+        encode = json.encoder.encode_basestring_ascii
+        keySeparator = self._keySeparator
+        attrNewline = self._newline(level + 1)
+        attrSeparator = self._itemSeparator + attrNewline
+
+        name = elem.getName()
+        parts = ['{', attrNewline, '"name"', keySeparator, encode(name)]
+        if self._stats:
+            self._stats.countElement(category)
+        if (self._addCategories and level == _STREAM_TOP_LEVEL) or (category not in ('input', 'output')):
+            parts.extend((attrSeparator, '"category"', keySeparator, encode(category)))
+        # Attribute values as read, for the structure hash
+        attributes = {} if self._structureHash else None
+        typeName = elem.getAttribute('type') if self._typedValues else ''
+        if typeName in values.TYPE_COMPONENTS:
+            for attrName in elem.getAttributeNames():
+                value = elem.getAttribute(attrName)
+                if attributes is not None:
+                    attributes[attrName] = value
+                if attrName in values.VALUE_ATTRIBUTES:
+                    value = values.valueStringToJson(value, typeName)
+                parts.extend((attrSeparator, encode(attrName), keySeparator, self._encodeValue(value, attrNewline)))
+        else:
+            for attrName in elem.getAttributeNames():
+                value = elem.getAttribute(attrName)
+                if attributes is not None:
+                    attributes[attrName] = value
+                parts.extend((attrSeparator, encode(attrName), keySeparator, encode(value)))
+        self._write(''.join(parts))
+
+        # Split children based on category: input, output or other
+        inputs = []
+        outputs = []
+        nonInputOutputs = []
+        self._filterChildren(elem, included, inputs, outputs, nonInputOutputs)
+
+        path = prefix + name
+        if attributes is not None:
+            self._structureHash.addElement(path, category, attributes,
+                                           [child.getName() for child, _, _ in inputs + nonInputOutputs + outputs])
+
+        # Push in reverse order of output
+        stack.append(self._newline(level) + '}')
+        for key, group in ((OUTPUTS_STRING, outputs), (CHILDREN_STRING, nonInputOutputs), (INPUTS_STRING, inputs)):
+            if group:
+                self._pushArray(key, group, level + 1, path + NAME_PATH_SEPARATOR, stack)
+
+    def _encodeValue(self, value, newline: str) -> str:
+        '''
+        @brief Encode a string or native JSON value of an attribute
+        @param value The value to encode
+        @param newline The newline and indentation string of the attribute
+        '''
+        if isinstance(value, str):
+            return json.encoder.encode_basestring_ascii(value)
+        text = json.dumps(value, indent=self._indent, separators=(self._itemSeparator, self._keySeparator))
+        return text.replace('\n', newline) if self._indent is not None else text
+
+    def _filterChildren(self, elem: mx.Element, included: bool, inputs: list, outputs: list, others: list) -> None:
+        '''
+        @brief Filter the children of an element and split them by category.
+        Each list receives (element, category, included) tuples.
+        @param elem The parent element
+        @param included Whether the parent or an ancestor matched the element filter include rules
+        @param inputs List to add input children to. May be None to add all children to others
+        @param outputs List to add output children to
+        @param others List to add other children to
+        '''
+        elementTest = self._elementTest
+        stats = self._stats
+        for child in elem.getChildren():
+            category = child.getCategory()
+            childIncluded = elementTest(child, category, included)
+            if childIncluded is None:
+                if stats:
+                    stats.skippedElements += 1
+                continue
+            item = (child, category, childIncluded)
+            if inputs is not None and category == 'input':
+                inputs.append(item)
+            elif inputs is not None and category == 'output':
+                outputs.append(item)
+            else:
+                others.append(item)
+
+    def _pushArray(self, key: str, elements: list, level: int, prefix: str, stack: list) -> None:
+        '''
+        @brief Push an array of elements and its surrounding tokens onto the traversal stack
+        @param key The key of the array
+        @param elements List of (element, category, included) tuples in the array
+        @param level The nesting level of the key
+        @param prefix The name path prefix of the elements
+        @param stack The traversal stack
+        '''
+        childNewline = self._newline(level + 1)
+        childSeparator = self._itemSeparator + childNewline
+        if elements:
+            stack.append(self._newline(level) + ']')
+            for i in range(len(elements) - 1, -1, -1):
+                child, category, included = elements[i]
+                stack.append((child, category, level + 1, included, prefix))
+                stack.append(childSeparator if i > 0 else childNewline)
+        else:
+            stack.append(']')
+        stack.append(self._itemSeparator + self._newline(level) + json.encoder.encode_basestring_ascii(key) + self._keySeparator + '[')
+
+    def writeDocument(self, doc: mx.Document) -> None:
+        '''
+        @brief Write a MaterialX document to the stream
+        @param doc The MaterialX document to write
+        '''
+        encode = json.encoder.encode_basestring_ascii
+        keySeparator = self._keySeparator
+        rootNewline = self._newline(1)
+        docNewline = self._newline(2)
+        docSeparator = self._itemSeparator + docNewline
+
+        self._write('{' + rootNewline + encode(JSON_MIMETYPE_KEY) + keySeparator + encode(JSON_MIMETYPE) +
+                    self._itemSeparator + rootNewline + encode(MATERIALX_DOCUMENT_ROOT) + keySeparator + '{')
+
+        # Add document level attributes. The 'children' key is always written last
+        # so the first document item does not have a leading separator.
+        parts = []
+        attributes = {}
+        for attrName in doc.getAttributeNames():
+            value = attributes[attrName] = doc.getAttribute(attrName)
+            parts.extend((docSeparator if parts else docNewline, encode(attrName), keySeparator, encode(value)))
+        self._write(''.join(parts))
+
+        # Filter top level children
+        children = []
+        self._filterChildren(doc, False, None, None, children)
+        if self._structureHash:
+            self._structureHash.addElement('', MATERIALX_DOCUMENT_ROOT, attributes, [child.getName() for child, _, _ in children])
+
+        stack = [self._newline(0) + '}', rootNewline + '}']
+        self._pushArray(CHILDREN_STRING, children, _STREAM_TOP_LEVEL - 1, '', stack)
+        if not parts:
+            # Replace the leading item separator as 'children' is the first item
+            stack[-1] = stack[-1][len(self._itemSeparator):]
+
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                self._write(item)
+            else:
+                self._writeElement(item[0], item[1], item[2], item[3], item[4], stack)
+
+        self.flush()
+
+class JsonStreamReader:
+    '''
+    Class for reading a MaterialX document from a JSON stream incrementally.
+
+    The stream is read in chunks. Document attributes and each element of the 'children'
+    array of the MaterialX root are decoded one at a time and added to the document
+    as they are parsed, so the JSON dictionary for the entire file never exists at once.
+    '''
+    _WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+    def __init__(self, stream, chunkSize: int = 65536):
+        '''
+        @brief Constructor
+        @param stream The binary or text file-like object to read from
+        @param chunkSize The number of bytes to read from the stream at a time. Default is 65536
+        '''
+        self._stream = stream
+        self._chunkSize = chunkSize
+        self._textDecoder = codecs.getincrementaldecoder('utf-8')()
+        self._jsonDecoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _read(self, size: int) -> bool:
+        '''
+        @brief Append more data from the stream to the buffer
+        @param size The number of bytes to read
+        @return False if the end of the stream has been reached, otherwise True
+        '''
+        if self._eof:
+            return False
+        data = self._stream.read(size)
+        if not data:
+            self._eof = True
+        if isinstance(data, bytes) or not data:
+            data = self._textDecoder.decode(data or b'', final=self._eof)
+
+        # Discard consumed data
+        if self._pos:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        self._buffer += data
+        return not self._eof or bool(data)
+
+    def _error(self, message: str):
+        '''
+        @brief Create a decode error at the current position
+        '''
+        return json.JSONDecodeError(message, self._buffer, self._pos)
+
+    def _peek(self) -> str:
+        '''
+        @brief Skip whitespace and return the next character, or an empty string at the end of the stream
+        '''
+        while True:
+            self._pos = self._WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read(self._chunkSize):
+                return ''
+
+    def _expect(self, character: str) -> None:
+        '''
+        @brief Consume the given character after any whitespace
+        '''
+        if self._peek() != character:
+            raise self._error('Expecting %r' % character)
+        self._pos += 1
+
+    def _value(self):
+        '''
+        @brief Decode the next complete JSON value
+        '''
+        self._peek()
+        while True:
+            try:
+                value, end = self._jsonDecoder.raw_decode(self._buffer, self._pos)
+                # A value ending at the end of the buffer may be a truncated number
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            # Grow the read size with the pending data so large values are not re-parsed too often
+            self._read(max(self._chunkSize, len(self._buffer) - self._pos))
+
+    def _members(self):
+        '''
+        @brief Iterate over the keys of the next JSON object.
+        The caller must consume the value of each key before continuing the iteration.
+        '''
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            if self._peek() != '"':
+                raise self._error('Expecting property name enclosed in double quotes')
+            key = self._value()
+            self._expect(':')
+            yield key
+            delimiter = self._peek()
+            self._pos += 1
+            if delimiter == '}':
+                return
+            if delimiter != ',':
+                self._pos -= 1
+                raise self._error("Expecting ',' delimiter")
+
+    def _items(self):
+        '''
+        @brief Iterate over the items of the next JSON array.
+        The caller must consume each item before continuing the iteration.
+        '''
+        self._expect('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield
+            delimiter = self._peek()
+            self._pos += 1
+            if delimiter == ']':
+                return
+            if delimiter != ',':
+                self._pos -= 1
+                raise self._error("Expecting ',' delimiter")
+
+    def _expand(self, node: dict, strings: list, keys: dict) -> dict:
+        '''
+        @brief Expand an element from the compact string table layout
+        '''
+        try:
+            return stringtable.expandElement(node, strings, keys)
+        except ValueError as err:
+            raise self._error(str(err))
+
+    def readDocument(self, doc: mx.Document, readOptions: JsonReadOptions = None) -> bool:
+        '''
+        @brief Read a MaterialX document from the stream
+        @param doc The MaterialX document to write to
+        @param readOptions The read options to use. Default is None
+        @return True if successful, false otherwise
+        '''
+        mtlxjson = MaterialXJson()
+        mimetype = None
+        rootFound = False
+        deferredRoot = None
+        strings = None
+        keys = None
+
+        stats = readOptions.stats if readOptions else None
+        if stats:
+            # Separate the time spent reading from the stream from conversion time
+            self._stream = TimedStream(self._stream)
+            start = time.perf_counter()
+        # Document attributes and top level element names for the structure hash
+        structureHash = readOptions.structureHash if readOptions else None
+        rootAttributes = {}
+        rootChildren = []
+
+        for key in self._members():
+            if key == JSON_MIMETYPE_KEY:
+                mimetype = self._value()
+            elif key == stringtable.STRING_TABLE_KEY and strings is None:
+                strings = self._value()
+                try:
+                    keys = stringtable.createKeyMap(strings)
+                except ValueError as err:
+                    print('JSON document has an invalid string table: %s' % err)
+                    return False
+                if rootFound and deferredRoot is None:
+                    print('JSON document string table must precede the MaterialX root element')
+                    return False
+            elif key == MATERIALX_DOCUMENT_ROOT and not rootFound:
+                rootFound = True
+                if mimetype != JSON_MIMETYPE or self._peek() != '{':
+                    # The root can only be converted once the mimetype has been validated
+                    deferredRoot = self._value()
+                    continue
+                for rootKey in self._members():
+                    childrenKey = keys.get(rootKey) if keys else rootKey
+                    if childrenKey == CHILDREN_STRING and self._peek() == '[':
+                        for _ in self._items():
+                            child = self._value()
+                            if keys:
+                                child = self._expand(child, strings, keys)
+                            mtlxjson.elementFromJSON({ CHILDREN_STRING: [child] }, doc, readOptions)
+                            if structureHash:
+                                name = child.get('name', '')
+                                structureHash.addJson(child, name, child.get('category', ''))
+                                rootChildren.append(name)
+                    else:
+                        node = { rootKey: self._value() }
+                        if keys:
+                            node = self._expand(node, strings, keys)
+                        mtlxjson.elementFromJSON(node, doc, readOptions)
+                        rootAttributes.update(node)
+            else:
+                self._value()
+
+        if self._peek() != '':
+            raise self._error('Extra data')
+
+        if stats:
+            stats.addTime('fromJSON', time.perf_counter() - start - self._stream.elapsed)
+            stats.addTime('fileRead', self._stream.elapsed)
+
+        readDoc = False
+        if mimetype == JSON_MIMETYPE:
+            if rootFound:
+                if deferredRoot is not None:
+                    if keys:
+                        deferredRoot = self._expand(deferredRoot, strings, keys)
+                    mtlxjson.elementFromJSON(deferredRoot, doc, readOptions)
+                    if structureHash:
+                        structureHash.addJson(deferredRoot)
+                elif structureHash:
+                    structureHash.addElement('', MATERIALX_DOCUMENT_ROOT, rootAttributes, rootChildren)
+                readDoc = True
+            else:
+                print('JSON document is missing a MaterialX root element')
+        else:
+            print('JSON document is not a MaterialX document')
+
+        if readDoc:
+            # Upgrade to latest version if requested
+            if readOptions and readOptions.upgradeVersion:
+                with statsPhase(readOptions.stats, 'upgradeVersion'):
+                    doc.upgradeVersion()
+
+        return readDoc
 
 class MaterialXJson:
     '''
     Class for handling read and write of MaterialX from and to JSON
     '''
-    def elementToJSON(self, elem: mx.Element, jsonParent: dict, writeOptions: JsonWriteOptions = None) -> dict:
+    def elementToJSON(self, elem: mx.Element, jsonParent: list, writeOptions: JsonWriteOptions = None) -> list:
         '''
         @brief Convert an MaterialX XML element to JSON.
-        Will recursively traverse the parent/child Element hierarchy.
+        Will traverse the parent/child Element hierarchy using an explicit stack
+        so that deep hierarchies are not limited by the Python recursion limit.
+        Child containers are only created for elements which have children of that kind.
+        Element filtering is applied at every depth.
         @param elem The MaterialX element to convert
-        @param jsonParent The JSON element append to
+        @param jsonParent The JSON element list to append to
         @param writeOptions The write options to use. Default is None
+        @return The JSON parent list or None if the element was skipped
         '''
-        if (writeOptions and writeOptions.elementPredicate and not writeOptions.elementPredicate(elem)):
-            return
+        return self._elementToJSON(elem, jsonParent, writeOptions, compileElementTest(writeOptions))
+
+    def _elementToJSON(self, elem: mx.Element, jsonParent: list, writeOptions: JsonWriteOptions, elementTest) -> list:
+        '''
+        @brief Convert an MaterialX XML element to JSON using a compiled element test.
+        @param elem The MaterialX element to convert
+        @param jsonParent The JSON element list to append to
+        @param writeOptions The write options to use
+        @param elementTest The compiled element test. See compileElementTest()
+        @return The JSON parent list or None if the element was skipped
+        '''
+        stats = writeOptions.stats if writeOptions else None
+        addCategories = bool(writeOptions and writeOptions.addInputOutputCategories)
+        typedValues = bool(writeOptions and writeOptions.typedValues)
+        structureHash = writeOptions.structureHash if writeOptions else None
 
-        if (elem.getSourceUri() != ""):
-            return
-        
-        # Create a new JSON element for the MaterialX element
-        jsonElem = {}
-        jsonElem['name'] = elem.getName()
         category = elem.getCategory()
-        # It is redundant but not incorrect to add in the category
-        # For now always add in the category
-        if (writeOptions and writeOptions.addInputOutputCategories) or (category not in ['input', 'output']):
+        included = elementTest(elem, category, False)
+        if included is None:
+            if stats:
+                stats.skippedElements += 1
+            return None
+
+        # Create a new JSON element for the MaterialX element
+        jsonElem = { 'name': elem.getName() }
+        # It is redundant but not incorrect to add in the category.
+        # Nested inputs and outputs never have a category.
+        if addCategories or (category not in ('input', 'output')):
             jsonElem['category'] = category
-        
+        if stats:
+            stats.countElement(category)
+
         # Add attributes
         for attrName in elem.getAttributeNames():
             jsonElem[attrName] = elem.getAttribute(attrName)
 
-        # Add children. Split based on category: input, output or other
-        inputs = []
-        outputs = []
-        non_input_outputs = []
-        for child in elem.getChildren():
-            category = child.getCategory()
-            if category == 'input':
-                self.elementToJSON(child, inputs)
-            elif category == 'output':
-                self.elementToJSON(child, outputs)
-            else:
-                self.elementToJSON(child, non_input_outputs)
-        
-        # Add inputs, outputs and other children
-        if len(inputs) > 0:
-            jsonElem[INPUTS_STRING] = inputs
-        if len(non_input_outputs) > 0:
-            jsonElem[CHILDREN_STRING] = non_input_outputs
-        if len(outputs) > 0:
-            jsonElem[OUTPUTS_STRING] = outputs
-
-        # Add the JSON element to the parent            
+        # Add the JSON element to the parent
         jsonParent.append(jsonElem)
 
+        # Traverse descendants. Each stack entry is a MaterialX element paired
+        # with its JSON element, include state, category and name path. All children
+        # of an element are handled in one pass so that the grouping order of inputs,
+        # children and outputs is the same as for a depth-first recursive traversal.
+        # Values are typed once the children of an element are known, so that the
+        # structure hash receives the value strings as read.
+        stack = [(elem, jsonElem, included, category, elem.getNamePath())]
+        while stack:
+            parent, jsonParentElem, parentIncluded, parentCategory, path = stack.pop()
+            prefix = path + NAME_PATH_SEPARATOR
+
+            inputs = None
+            outputs = None
+            nonInputOutputs = None
+            for child in parent.getChildren():
+                category = child.getCategory()
+                included = elementTest(child, category, parentIncluded)
+                if included is None:
+                    if stats:
+                        stats.skippedElements += 1
+                    continue
+
+                jsonChild = { 'name': child.getName() }
+                if stats:
+                    stats.countElement(category)
+                if category == 'input':
+                    if inputs is None:
+                        inputs = []
+                    inputs.append(jsonChild)
+                elif category == 'output':
+                    if outputs is None:
+                        outputs = []
+                    outputs.append(jsonChild)
+                else:
+                    jsonChild['category'] = category
+                    if nonInputOutputs is None:
+                        nonInputOutputs = []
+                    nonInputOutputs.append(jsonChild)
+
+                for attrName in child.getAttributeNames():
+                    jsonChild[attrName] = child.getAttribute(attrName)
+
+                stack.append((child, jsonChild, included, category, prefix + jsonChild['name']))
+
+            if structureHash:
+                structureHash.addElement(path, parentCategory, jsonParentElem,
+                                         [jsonChild['name'] for group in (inputs, nonInputOutputs, outputs) if group for jsonChild in group])
+            if typedValues:
+                values.typeValues(jsonParentElem)
+
+            # Add inputs, outputs and other children
+            if inputs:
+                jsonParentElem[INPUTS_STRING] = inputs
+            if nonInputOutputs:
+                jsonParentElem[CHILDREN_STRING] = nonInputOutputs
+            if outputs:
+                jsonParentElem[OUTPUTS_STRING] = outputs
+
         return jsonParent
 
     def documentToJSON(self, doc: mx.Document, writeOptions: JsonWriteOptions = None) -> dict:
@@ -131,19 +979,28 @@ class MaterialXJson:
         # Create the document
         documentRoot = {}
 
-        # Add document level attributes
-        for attrName in doc.getAttributeNames():
-            documentRoot[attrName] = doc.getAttribute(attrName)
+        stats = writeOptions.stats if writeOptions else None
+        with statsPhase(stats, 'toJSON'):
+            # Add document level attributes
+            for attrName in doc.getAttributeNames():
+                documentRoot[attrName] = doc.getAttribute(attrName)
 
-        # Add children
-        children = []
-        for elem in doc.getChildren():
-            self.elementToJSON(elem, children, writeOptions)
-        documentRoot['children'] = children
+            # Add children
+            children = []
+            elementTest = compileElementTest(writeOptions)
+            for elem in doc.getChildren():
+                self._elementToJSON(elem, children, writeOptions, elementTest)
+            if writeOptions and writeOptions.structureHash:
+                writeOptions.structureHash.addElement('', MATERIALX_DOCUMENT_ROOT, documentRoot, [child['name'] for child in children])
+            documentRoot['children'] = children
 
         # Set 'materialx' root element 
         root[MATERIALX_DOCUMENT_ROOT] = documentRoot
 
+        if writeOptions and writeOptions.stringTable:
+            with statsPhase(stats, 'toJSON'):
+                root = stringtable.compactJson(root, MATERIALX_DOCUMENT_ROOT)
+
         return root
     
     def documentToJSONString(self, doc: mx.Document, writeOptions: JsonWriteOptions = None) -> str:
@@ -153,6 +1010,11 @@ class MaterialXJson:
         @param writeOptions The write options to use. Default is None
         @return The JSON string
         '''
+        if writeOptions and writeOptions.streamOutput and not writeOptions.stringTable:
+            stream = io.StringIO()
+            self.documentToJSONStream(doc, stream, writeOptions)
+            return stream.getvalue()
+
         result = self.documentToJSON(doc, writeOptions)
         json_string = ''
         if result:
@@ -161,10 +1023,31 @@ class MaterialXJson:
             if writeOptions:
                 indentation = writeOptions.indent
                 sep = writeOptions.separators
-            json_string = json.dumps(result, indent=indentation, separators=sep)
+            codec = jsoncodec.getCodec(writeOptions.codec if writeOptions else None)
+            with statsPhase(writeOptions.stats if writeOptions else None, 'jsonEncode'):
+                json_string = codec.encode(result, indentation, sep)
 
         return json_string
 
+    def documentToJSONStream(self, doc: mx.Document, stream, writeOptions: JsonWriteOptions = None) -> None:
+        '''
+        Write an MaterialX XML document as JSON to a file-like object.
+        JSON is written in chunks while traversing the document without building the JSON dictionary.
+        @param doc The MaterialX document to convert
+        @param stream The file-like object to write to
+        @param writeOptions The write options to use. Default is None
+        '''
+        stats = writeOptions.stats if writeOptions else None
+        if stats:
+            # Separate the time spent writing to the stream from conversion time
+            stream = TimedStream(stream)
+        with statsPhase(stats, 'toJSON'):
+            writer = JsonStreamWriter(stream, writeOptions)
+            writer.writeDocument(doc)
+        if stats:
+            stats.addTime('toJSON', -stream.elapsed)
+            stats.addTime('fileWrite', stream.elapsed)
+
     def elementFromJSON(self, node: dict, elem: mx.Element, readOptions: JsonReadOptions = None) -> None:
         '''
         @brief Convert an JSON element to MaterialX
@@ -172,6 +1055,7 @@ class MaterialXJson:
         @param elem The MaterialX element to write to
         @param readOptions The read options to use. Default is None
         '''
+        stats = readOptions.stats if readOptions else None
         for key in node:
             value = node[key]
 
@@ -186,21 +1070,33 @@ class MaterialXJson:
                     category = 'input'
                     name = child['name']
                     childElem = elem.addChildOfCategory(category, name)
-                    self.elementFromJSON(child, childElem)
+                    if stats:
+                        stats.countElement(category)
+                    self.elementFromJSON(child, childElem, readOptions)
                 
             elif key == CHILDREN_STRING:
                 for child in value:
                     category = child['category']
                     name = child['name']
                     childElem = elem.addChildOfCategory(category, name)
-                    self.elementFromJSON(child, childElem)
+                    if stats:
+                        stats.countElement(category)
+                    self.elementFromJSON(child, childElem, readOptions)
 
             elif key == OUTPUTS_STRING:
                 for child in value:
                     category = 'output'
                     name = child['name']
                     childElem = elem.addChildOfCategory(category, name)
-                    self.elementFromJSON(child, childElem)
+                    if stats:
+                        stats.countElement(category)
+                    self.elementFromJSON(child, childElem, readOptions)
+
+            # Set native JSON values as value strings
+            elif readOptions is None or readOptions.typedValues:
+                valueString = values.jsonToValueString(value)
+                if valueString is not None:
+                    elem.setAttribute(key, valueString)
 
     def documentFromJSON(self, jsonDoc: dict, doc: mx.Document, readOptions: JsonReadOptions = None) -> bool:
         '''
@@ -209,11 +1105,39 @@ class MaterialXJson:
         @param doc The MaterialX document to write to 
         @param readOptions The read options to use. Default is None
         '''
+        return self._documentFromJSON(jsonDoc, doc, readOptions, JSON_MIMETYPE)
+
+    def _documentFromJSON(self, jsonDoc: dict, doc: mx.Document, readOptions: JsonReadOptions, mimetype: str) -> bool:
+        '''
+        @brief Convert a decoded JSON or CBOR document to MaterialX
+        @param jsonDoc The decoded document to read
+        @param doc The MaterialX document to write to
+        @param readOptions The read options to use
+        @param mimetype The expected mimetype of the document
+        @return True if successful, false otherwise
+        '''
         readDoc = False
+        stats = readOptions.stats if readOptions else None
         # Check mimetype and existence of MaterialX root element
-        if JSON_MIMETYPE_KEY in jsonDoc and jsonDoc[JSON_MIMETYPE_KEY] == JSON_MIMETYPE:
+        if JSON_MIMETYPE_KEY in jsonDoc and jsonDoc[JSON_MIMETYPE_KEY] == mimetype:
             if MATERIALX_DOCUMENT_ROOT in jsonDoc:
-                self.elementFromJSON(jsonDoc['materialx'], doc, readOptions)
+                with statsPhase(stats, 'fromJSON'):
+                    documentRoot = jsonDoc[MATERIALX_DOCUMENT_ROOT]
+                    try:
+                        # Expand the compact string table layout
+                        if stringtable.STRING_TABLE_KEY in jsonDoc:
+                            documentRoot = stringtable.expandElement(documentRoot, jsonDoc[stringtable.STRING_TABLE_KEY])
+                    except ValueError as err:
+                        print('JSON document has an invalid string table: %s' % err)
+                        return False
+                    if readOptions and readOptions.jobs != 1:
+                        from materialxjson import parallel
+                        self.elementFromJSON({ key: value for key, value in documentRoot.items() if key != CHILDREN_STRING }, doc, readOptions)
+                        parallel.elementsFromJSON(documentRoot.get(CHILDREN_STRING, []), doc, readOptions, readOptions.jobs)
+                    else:
+                        self.elementFromJSON(documentRoot, doc, readOptions)
+                    if readOptions and readOptions.structureHash:
+                        readOptions.structureHash.addJson(documentRoot)
                 readDoc = True
             else:
                 print('JSON document is missing a MaterialX root element')
@@ -223,7 +1147,8 @@ class MaterialXJson:
         if readDoc:
             # Upgrade to latest version if requested
             if readOptions and readOptions.upgradeVersion:
-                doc.upgradeVersion()
+                with statsPhase(readOptions.stats, 'upgradeVersion'):
+                    doc.upgradeVersion()
 
         return readDoc
 
@@ -235,50 +1160,104 @@ class MaterialXJson:
         @param readOptions The read options to use. Default is None
         @return True if successful, false otherwise
         '''
-        jsonDoc = json.loads(jsonString)
+        codec = jsoncodec.getCodec(readOptions.codec if readOptions else None)
+        with statsPhase(readOptions.stats if readOptions else None, 'jsonDecode'):
+            jsonDoc = codec.decode(jsonString)
         readDoc = False
         if jsonDoc:
             readDoc = self.documentFromJSON(jsonDoc, doc, readOptions)
         return readDoc
 
+    def documentToCBOR(self, doc: mx.Document, writeOptions: JsonWriteOptions = None) -> bytes:
+        '''
+        Convert an MaterialX XML document to the binary CBOR encoding of its JSON representation.
+        Repeated strings are encoded once and then referenced by index.
+        The indent, separators and streamOutput write options do not apply.
+        @param doc The MaterialX document to convert
+        @param writeOptions The write options to use. Default is None
+        @return The CBOR data
+        '''
+        result = self.documentToJSON(doc, writeOptions)
+        result[JSON_MIMETYPE_KEY] = CBOR_MIMETYPE
+        with statsPhase(writeOptions.stats if writeOptions else None, 'cborEncode'):
+            return cbor.encode(result)
+
+    def documentFromCBOR(self, data: bytes, doc: mx.Document, readOptions: JsonReadOptions = None) -> bool:
+        '''
+        @brief Convert the binary CBOR encoding of a JSON document to MaterialX
+        @param data The CBOR data to read
+        @param doc The MaterialX document to write to
+        @param readOptions The read options to use. Default is None
+        @return True if successful, false otherwise
+        '''
+        with statsPhase(readOptions.stats if readOptions else None, 'cborDecode'):
+            cborDoc = cbor.decode(data)
+        if not isinstance(cborDoc, dict):
+            print('CBOR document is not a MaterialX document')
+            return False
+        return self._documentFromJSON(cborDoc, doc, readOptions, CBOR_MIMETYPE)
+
+    def documentFromJSONStream(self, source, doc: mx.Document, readOptions: JsonReadOptions = None) -> bool:
+        '''
+        @brief Read a JSON document to MaterialX incrementally.
+        Top level elements are created as they are parsed from the stream.
+        @param source The JSON file name or binary stream to read from. Compressed files are decompressed as they are read
+        @param doc The MaterialX document to write to 
+        @param readOptions The read options to use. Default is None
+        @return True if successful, false otherwise
+        '''
+        if isinstance(source, (str, os.PathLike)):
+            with fileio.openInputStream(source, readOptions.compression if readOptions else None) as stream:
+                return JsonStreamReader(stream).readDocument(doc, readOptions)
+        return JsonStreamReader(source).readDocument(doc, readOptions)
+
 class Util:
     '''
     Utility class for MaterialX JSON
     '''
     @staticmethod
-    def readJson(fileName: str) -> dict:
+    def readJson(fileName: str, stats: ConversionStats = None, codec = None, compression: str = None) -> dict:
         '''
-        @brief Read a JSON file
+        @brief Read a JSON file. The file is read as bytes, or memory mapped if large and the codec
+        can decode it in place, and closed before returning.
         @param fileName The file name to read
+        @param stats ConversionStats to collect timings and counters in. Default is None
+        @param codec Name or instance of the JSON codec to use. Default is None to use the default codec
+        @param compression 'gzip', 'lzma' or 'none'. Default is None to choose from the file extension
         @return The JSON document
         '''
-        jsonFile = open(fileName, 'r')
-        if not jsonFile:
-            return False
-
-        jsonObject = json.load(jsonFile)
+        codec = jsoncodec.getCodec(codec)
+        readStart = time.perf_counter()
+        with fileio.openInputData(fileName, codec.decodesBuffers, compression) as data:
+            if stats:
+                stats.addTime('fileRead', time.perf_counter() - readStart)
+                stats.bytesRead += os.path.getsize(fileName)
+            with statsPhase(stats, 'jsonDecode'):
+                jsonObject = codec.decode(data)
         if not jsonObject:
             return False
 
         return jsonObject
     
     @staticmethod
-    def jsonStringToJson(jsonString: str) -> dict:
+    def jsonStringToJson(jsonString: str, codec = None) -> dict:
         '''
         @brief Convert a JSON string to a JSON document
         @param jsonString The JSON string to convert
+        @param codec Name or instance of the JSON codec to use. Default is None to use the default codec
         @return The JSON document
         '''
-        return json.loads(jsonString)
+        return jsoncodec.getCodec(codec).decode(jsonString)
     
     @staticmethod
-    def jsonToJSONString(jsonObject: dict, indentation = 2) -> str:
+    def jsonToJSONString(jsonObject: dict, indentation = 2, codec = None) -> str:
         '''
         @brief Convert a JSON document to a JSON string
         @param jsonObject The JSON document to convert
+        @param codec Name or instance of the JSON codec to use. Default is None to use the default codec
         @return The JSON string
         '''
-        return json.dumps(jsonObject, indent=indentation)
+        return jsoncodec.getCodec(codec).encode(jsonObject, indentation)
     
     @staticmethod
     def documentToXMLString(doc: mx.Document) -> str:
@@ -299,25 +1278,47 @@ class Util:
         mx.readFromXmlString(doc, xmlString)
 
     @staticmethod
-    def writeJson(jsonObject: dict, fileName: str, indentation = 2) -> None:
+    def xmlFileToDocument(doc: mx.Document, fileName: str) -> None:
+        '''
+        @brief Read an XML file into a MaterialX document
+        @param doc The MaterialX document to write to
+        @param fileName The XML file to read. Files with a .gz or .xz extension are decompressed
+        '''
+        if fileio.getCompression(fileName):
+            with fileio.openInputStream(fileName) as infile:
+                xmlString = infile.read().decode('utf-8')
+            # Resolve includes relative to the compressed file
+            searchPath = mx.FileSearchPath(os.path.dirname(os.path.abspath(fileName)))
+            mx.readFromXmlString(doc, xmlString, searchPath)
+        else:
+            mx.readFromXmlFile(doc, fileName)
+
+    @staticmethod
+    def writeJson(jsonObject: dict, fileName: str, indentation = 2, codec = None, compression: str = None) -> None:
         '''
         @brief Write a JSON document to file
         @param jsonObject The JSON document to write
         @param fileName The file name to write to
+        @param codec Name or instance of the JSON codec to use. Default is None to use the default codec
+        @param compression 'gzip', 'lzma' or 'none'. Default is None to choose from the file extension
         '''
-        with open(fileName, 'w') as outfile:
-            json.dump(jsonObject, outfile, indent=indentation)
+        with fileio.openOutputStream(fileName, compression) as outfile:
+            jsoncodec.getCodec(codec).dump(jsonObject, outfile, indentation)
 
     @staticmethod
-    def getFiles(rootPath: str, extension: str) -> list:
+    def getFiles(rootPath: str, extension: str, compressed: bool = False) -> list:
         '''
         @brief Get all files with the given extension from the given root path
         @param rootPath The root path to search from
         @param extension The extension to search for
+        @param compressed Also get files with the extension followed by a compression extension,
+        e.g. ".json.gz". Default is False
         @return A list of file paths
         '''
         filelist = []
         exts = (extension, extension.upper() )
+        if compressed:
+            exts += tuple(extension + compressionExtension for compressionExtension in fileio.COMPRESSION_EXTENSIONS.values())
         for subdir, dirs, files in os.walk(rootPath):
             for file in files:
                 if file.lower().endswith(exts):
@@ -325,13 +1326,19 @@ class Util:
         return filelist
 
     @staticmethod
-    def loadLibraries(searchPath: mx.FileSearchPath, libraryFolders: list) -> tuple:
+    def loadLibraries(searchPath: mx.FileSearchPath, libraryFolders: list, useCache: bool = False) -> tuple:
         '''
         @brief Load all libraries from the given search path and library folders
         @param searchPath The search path to use
         @param libraryFolders The library folders to use
+        @param useCache Use the shared library cache. The returned library document is then shared
+        across calls and must not be modified. Default is False
         @return A tuple containing the library document and a status string
         '''
+        if useCache:
+            from materialxjson import cache
+            return cache.getLibraryCache().load(searchPath, libraryFolders)
+
         status = ''
         lib = mx.createDocument()
         try:
@@ -343,23 +1350,30 @@ class Util:
         return lib, status
     
     @staticmethod
-    def jsonFileToXml(fileName: str, readOptions: JsonReadOptions = None) -> mx.Document:
+    def jsonFileToXml(fileName: str, readOptions: JsonReadOptions = None, doc: mx.Document = None) -> mx.Document:
         '''
         @brief Convert a JSON file to an XML file
         @param fileName The file name to read from
         @param readOptions The read options to use. Default is None
+        @param doc The empty document to read into. Default is None to create a new document
         @return The MaterialX document if successful, None otherwise
         '''
         mtlxjson = MaterialXJson()
+        stats = readOptions.stats if readOptions else None
+        newDoc = doc if doc is not None else mx.createDocument()
 
-        jsonFile = open(fileName, 'r')
-        if not jsonFile:
+        if readOptions and readOptions.streamInput:
+            if stats:
+                stats.bytesRead += os.path.getsize(fileName)
+            if mtlxjson.documentFromJSONStream(fileName, newDoc, readOptions):
+                return newDoc
             return None
-        jsonObject = json.load(jsonFile)
+
+        jsonObject = Util.readJson(fileName, stats, readOptions.codec if readOptions else None,
+                                   readOptions.compression if readOptions else None)
         if not jsonObject:
             return None
 
-        newDoc = mx.createDocument() 
         readDoc = mtlxjson.documentFromJSON(jsonObject, newDoc, readOptions)
         if readDoc:
             return newDoc
@@ -367,54 +1381,78 @@ class Util:
         return None
 
     @staticmethod
-    def jsonFileToXmlFile(fileName: str, outputFilename: str, readOptions: JsonReadOptions = None) -> bool:
+    def jsonFileToXmlFile(fileName: str, outputFilename: str, readOptions: JsonReadOptions = None,
+                          doc: mx.Document = None) -> bool:
         '''
         @brief Convert a JSON file to an XML file
         @param fileName The file name to read from
-        @param outputFilename The file name to write to
+        @param outputFilename The file name to write to. The XML is compressed if the file name
+        ends with a .gz or .xz extension
         @param readOptions The read options to use. Default is None
+        @param doc The empty document to read into, which the caller can use after conversion.
+        Default is None to create a new document
         @return True if successful, false otherwise
         '''
-        jsonFile = open(fileName, 'r')
-        if not jsonFile:
-            return None
-        jsonObject = json.load(jsonFile)
-        if not jsonObject:
-            return None
-
-        #newDoc = mx.createDocument() 
-        mtlxjson = MaterialXJson()
-        newDoc = mx.createDocument()
-        created = mtlxjson.documentFromJSON(jsonObject, newDoc, readOptions)
-
-        if newDoc.getChildren():
-            mx.writeToXmlFile(newDoc, outputFilename)    
+        newDoc = Util.jsonFileToXml(fileName, readOptions, doc)
+        if newDoc and newDoc.getChildren():
+            stats = readOptions.stats if readOptions else None
+            with statsPhase(stats, 'xmlWrite'):
+                if fileio.getCompression(outputFilename):
+                    with fileio.openOutputStream(outputFilename) as outfile:
+                        outfile.write(mx.writeToXmlString(newDoc))
+                else:
+                    mx.writeToXmlFile(newDoc, outputFilename)
+            if stats:
+                stats.bytesWritten += os.path.getsize(outputFilename)
             return True
 
         return False
 
     @staticmethod
-    def xmlFileToJsonFile(xmlFileName: str, jsonFileName: str, writeOptions: JsonWriteOptions = None) -> None:
+    def xmlFileToJsonFile(xmlFileName: str, jsonFileName: str, writeOptions: JsonWriteOptions = None,
+                          doc: mx.Document = None) -> None:
         '''
         Convert an MaterialX XML file to a JSON file
-        @param xmlFileName The XML file to read from
+        @param xmlFileName The XML file to read from. Files with a .gz or .xz extension are decompressed
         @param jsonFileName The JSON file to write to
         @param writeOptions The write options to use. Default is None
+        @param doc The empty document to read the XML file into, which the caller can use after conversion.
+        Default is None to create a new document
         '''
         mtlxjson = MaterialXJson()
+        stats = writeOptions.stats if writeOptions else None
+        compression = writeOptions.compression if writeOptions else None
 
-        doc = mx.createDocument()
-        mx.readFromXmlFile(doc, xmlFileName)
+        if doc is None:
+            doc = mx.createDocument()
+        with statsPhase(stats, 'xmlRead'):
+            Util.xmlFileToDocument(doc, xmlFileName)
+        if stats:
+            stats.bytesRead += os.path.getsize(xmlFileName)
         if doc:
-            # Convert entire document to JSON
-            doc_result = mtlxjson.documentToJSON(doc, writeOptions)
+            if writeOptions and writeOptions.streamOutput and not writeOptions.stringTable:
+                # Stream JSON directly to file
+                with fileio.openOutputStream(jsonFileName, compression) as outfile:
+                    mtlxjson.documentToJSONStream(doc, outfile, writeOptions)
+            else:
+                # Convert entire document to JSON
+                doc_result = mtlxjson.documentToJSON(doc, writeOptions)
 
-            # Write JSON to file
-            with open(jsonFileName, 'w') as outfile:
+                # Write JSON to file
                 indentation = 2
                 sep = (',', ': ')
                 if writeOptions:
                     indentation = writeOptions.indent
                     sep = writeOptions.separators
-                json.dump(doc_result, outfile, indent=indentation, separators=sep)
+                codec = jsoncodec.getCodec(writeOptions.codec if writeOptions else None)
+                with fileio.openOutputStream(jsonFileName, compression) as outfile:
+                    # The json module writes in chunks, so separate the time spent writing
+                    stream = TimedStream(outfile) if stats else outfile
+                    with statsPhase(stats, 'jsonEncode'):
+                        codec.dump(doc_result, stream, indentation, sep)
+                    if stats:
+                        stats.addTime('jsonEncode', -stream.elapsed)
+                        stats.addTime('fileWrite', stream.elapsed)
 
+            if stats:
+                stats.bytesWritten += os.path.getsize(jsonFileName)
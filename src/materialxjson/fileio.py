@@ -0,0 +1,138 @@
+# fileio.py
+
+'''
+@file
+This module contains the file input and output layer shared by the file readers and writers.
+
+Files are read as bytes and passed to the JSON codec without decoding them to text first.
+Small files are read with a single bulk read. Files of at least MMAP_THRESHOLD bytes are
+memory mapped instead when the reader can parse the mapping in place, as with the orjson
+codec, so that the file is not also copied into memory. File handles and mappings are
+closed as soon as reading completes.
+
+Files can be compressed with gzip or lzma. The compression is chosen by the .gz and .xz
+file extensions unless given explicitly. Compressed files are read and written through
+streams which compress and decompress in chunks.
+'''
+
+import contextlib
+import gzip
+import io
+import lzma
+import mmap
+import os
+
+# Size in bytes from which files are memory mapped instead of read
+MMAP_THRESHOLD = 16 * 1024 * 1024
+
+# File extension of each compression
+COMPRESSION_EXTENSIONS = { 'gzip': '.gz', 'lzma': '.xz' }
+# Compression level for gzip and preset for lzma. The gzip default of 9 is several times
+# slower than 6 for a small gain in size
+GZIP_COMPRESS_LEVEL = 6
+LZMA_PRESET = 6
+
+def getCompression(fileName: str) -> str:
+    '''
+    @brief Get the compression of a file from its extension
+    @param fileName The file name
+    @return 'gzip', 'lzma', or an empty string for uncompressed files
+    '''
+    lowerName = fileName.lower()
+    for compression, extension in COMPRESSION_EXTENSIONS.items():
+        if lowerName.endswith(extension):
+            return compression
+    return ''
+
+def splitCompressionExtension(fileName: str) -> tuple:
+    '''
+    @brief Split the compression extension from a file name, e.g. "a.json.gz" to ("a.json", "gzip")
+    @param fileName The file name
+    @return Tuple of (file name without the compression extension, compression)
+    '''
+    compression = getCompression(fileName)
+    if compression:
+        fileName = fileName[:-len(COMPRESSION_EXTENSIONS[compression])]
+    return fileName, compression
+
+def getCompressionExtension(compression: str) -> str:
+    '''
+    @brief Get the file extension for a compression
+    @param compression 'gzip', 'lzma', or None, an empty string or 'none' for no compression
+    @return The file extension, or an empty string for no compression
+    @throws ValueError if the compression is unknown
+    '''
+    if not compression or compression == 'none':
+        return ''
+    if compression not in COMPRESSION_EXTENSIONS:
+        raise ValueError('Unknown compression "%s". Supported compressions: %s' % (
+            compression, ', '.join(COMPRESSION_EXTENSIONS)))
+    return COMPRESSION_EXTENSIONS[compression]
+
+def _resolveCompression(fileName: str, compression: str) -> str:
+    '''
+    @brief Get the compression to use for a file, validating explicit compressions
+    '''
+    if compression is None:
+        return getCompression(fileName)
+    getCompressionExtension(compression)
+    return '' if compression == 'none' else compression
+
+def openInputStream(fileName: str, compression: str = None):
+    '''
+    @brief Open a file for reading as a binary stream, decompressing it if compressed
+    @param fileName The file to read
+    @param compression 'gzip', 'lzma' or 'none'. Default is None to choose from the file extension
+    @return The binary stream, which should be closed by the caller
+    '''
+    compression = _resolveCompression(fileName, compression)
+    if compression == 'gzip':
+        return gzip.open(fileName, 'rb')
+    if compression == 'lzma':
+        return lzma.open(fileName, 'rb')
+    return open(fileName, 'rb')
+
+def openOutputStream(fileName: str, compression: str = None):
+    '''
+    @brief Open a file for writing as a UTF-8 text stream, compressing it if compressed
+    @param fileName The file to write
+    @param compression 'gzip', 'lzma' or 'none'. Default is None to choose from the file extension
+    @return The text stream, which should be closed by the caller
+    '''
+    compression = _resolveCompression(fileName, compression)
+    if compression == 'gzip':
+        # Write a zero modification time so that the same content gives the same file
+        return io.TextIOWrapper(gzip.GzipFile(fileName, 'wb', GZIP_COMPRESS_LEVEL, mtime=0), encoding='utf-8')
+    if compression == 'lzma':
+        return lzma.open(fileName, 'wt', preset=LZMA_PRESET, encoding='utf-8')
+    return open(fileName, 'w')
+
+@contextlib.contextmanager
+def openInputData(fileName: str, useMmap: bool = True, compression: str = None):
+    '''
+    @brief Context manager providing the contents of a file as a bytes-like object.
+    The data must not be used after the context exits.
+    @param fileName The file to read
+    @param useMmap Memory map uncompressed files of at least MMAP_THRESHOLD bytes. This should only be
+    set when the data is parsed in place, as copying a mapping uses more memory than reading. Default is True
+    @param compression 'gzip', 'lzma' or 'none'. Default is None to choose from the file extension
+    @return A bytes object, or an mmap object for memory mapped files
+    '''
+    if _resolveCompression(fileName, compression):
+        with openInputStream(fileName, compression) as stream:
+            yield stream.read()
+        return
+
+    with open(fileName, 'rb') as infile:
+        mapping = None
+        if useMmap and os.fstat(infile.fileno()).st_size >= MMAP_THRESHOLD:
+            try:
+                mapping = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                # Some file systems do not support mapping, fall back to reading
+                mapping = None
+        if mapping is None:
+            yield infile.read()
+        else:
+            with mapping:
+                yield mapping
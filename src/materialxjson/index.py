@@ -0,0 +1,218 @@
+# index.py
+
+'''
+@file
+This module contains an index of the elements of a MaterialX JSON document by name path.
+
+The index is built in one pass over the document and maps name paths such as
+"NG_wood/image_color/file" to the JSON elements, with reverse lookups from categories
+and types to name paths. Edits made through the index update the JSON document and
+the index together, so lookups stay constant time as the document is modified.
+'''
+
+from materialxjson import core, stringtable
+
+# Child array key for the input and output categories. Other categories use 'children'
+_CATEGORY_CHILD_KEYS = { category: key for key, category in core.CHILD_KEY_CATEGORIES.items() if category }
+
+class NamePathIndex:
+    '''
+    Class for looking up the elements of a JSON document by name path, category and type.
+
+    The document root has the empty name path. Documents in the string table layout must be
+    expanded with stringtable.expandJson() first.
+    '''
+    def __init__(self, jsonDoc: dict):
+        '''
+        @brief Constructor. Builds the index for a document.
+        @param jsonDoc The JSON document to index
+        @throws ValueError if the document uses the string table layout or has no MaterialX root
+        '''
+        if stringtable.STRING_TABLE_KEY in jsonDoc:
+            raise ValueError('Documents in the string table layout must be expanded before indexing')
+        if core.MATERIALX_DOCUMENT_ROOT not in jsonDoc:
+            raise ValueError('JSON document is missing a MaterialX root element')
+        self.jsonDoc = jsonDoc
+        # Map from name path to (JSON element, category)
+        self._elements = {}
+        # Maps from category and type to name paths. Dictionaries are used as ordered sets
+        self._categories = {}
+        self._types = {}
+        self._elements[''] = (jsonDoc[core.MATERIALX_DOCUMENT_ROOT], core.MATERIALX_DOCUMENT_ROOT)
+        self._indexChildren('', jsonDoc[core.MATERIALX_DOCUMENT_ROOT])
+
+    @staticmethod
+    def _childPath(path: str, name: str) -> str:
+        '''
+        @brief Get the name path of a child element
+        '''
+        return path + core.NAME_PATH_SEPARATOR + name if path else name
+
+    def _indexChildren(self, path: str, node: dict) -> None:
+        '''
+        @brief Add the descendants of an element to the index
+        '''
+        stack = [(path, node)]
+        while stack:
+            parentPath, parent = stack.pop()
+            for key, impliedCategory in core.CHILD_KEY_CATEGORIES.items():
+                for child in parent.get(key, ()):
+                    childPath = self._childPath(parentPath, child['name'])
+                    self._add(childPath, child, child.get('category', impliedCategory))
+                    stack.append((childPath, child))
+
+    def _add(self, path: str, node: dict, category: str) -> None:
+        '''
+        @brief Add a single element to the index
+        '''
+        self._elements[path] = (node, category)
+        self._categories.setdefault(category, {})[path] = None
+        typeName = node.get('type')
+        if isinstance(typeName, str):
+            self._types.setdefault(typeName, {})[path] = None
+
+    def _remove(self, path: str) -> None:
+        '''
+        @brief Remove an element and its descendants from the index
+        '''
+        stack = [path]
+        while stack:
+            path = stack.pop()
+            node, category = self._elements.pop(path)
+            self._categories.get(category, {}).pop(path, None)
+            typeName = node.get('type')
+            if isinstance(typeName, str):
+                self._types.get(typeName, {}).pop(path, None)
+            for key in core.CHILD_KEYS:
+                for child in node.get(key, ()):
+                    stack.append(self._childPath(path, child['name']))
+
+    def getNode(self, path: str) -> dict:
+        '''
+        @brief Get the JSON element at a name path
+        @param path The name path. The empty path returns the document root
+        @return The JSON element, or None if there is no element at the path
+        '''
+        entry = self._elements.get(path)
+        return entry[0] if entry else None
+
+    def getCategory(self, path: str) -> str:
+        '''
+        @brief Get the category of the element at a name path
+        @return The category, or None if there is no element at the path
+        '''
+        entry = self._elements.get(path)
+        return entry[1] if entry else None
+
+    def hasPath(self, path: str) -> bool:
+        '''
+        @brief Check if there is an element at a name path
+        '''
+        return path in self._elements
+
+    def getPaths(self) -> list:
+        '''
+        @brief Get the name paths of all elements, excluding the document root
+        '''
+        return [path for path in self._elements if path]
+
+    def getPathsOfCategory(self, category: str) -> list:
+        '''
+        @brief Get the name paths of all elements with a category
+        '''
+        return list(self._categories.get(category, ()))
+
+    def getPathsOfType(self, typeName: str) -> list:
+        '''
+        @brief Get the name paths of all elements with a type
+        '''
+        return list(self._types.get(typeName, ()))
+
+    def setAttribute(self, path: str, name: str, value) -> bool:
+        '''
+        @brief Set an attribute of the element at a name path
+        @param path The name path
+        @param name The attribute name. Must not be the name, category or a child array key
+        @param value The attribute value
+        @return True if the attribute was set, otherwise False
+        '''
+        entry = self._elements.get(path)
+        if not entry or name in core.NON_ATTRIBUTE_KEYS:
+            return False
+        node = entry[0]
+        if name == 'type':
+            self._retype(path, node, value)
+        node[name] = value
+        return True
+
+    def removeAttribute(self, path: str, name: str) -> bool:
+        '''
+        @brief Remove an attribute of the element at a name path
+        @return True if the attribute was removed, otherwise False
+        '''
+        entry = self._elements.get(path)
+        if not entry or name in core.NON_ATTRIBUTE_KEYS or name not in entry[0]:
+            return False
+        node = entry[0]
+        if name == 'type':
+            self._retype(path, node, None)
+        del node[name]
+        return True
+
+    def _retype(self, path: str, node: dict, typeName) -> None:
+        '''
+        @brief Move an element between type lookups
+        '''
+        oldType = node.get('type')
+        if isinstance(oldType, str):
+            self._types.get(oldType, {}).pop(path, None)
+        if isinstance(typeName, str):
+            self._types.setdefault(typeName, {})[path] = None
+
+    def addElement(self, parentPath: str, node: dict, category: str = None) -> str:
+        '''
+        @brief Add a JSON element, with its descendants, as a child of the element at a name path
+        @param parentPath The name path of the parent
+        @param node The JSON element to add. The element is added as is, not copied
+        @param category The category of the element. Default is None to use the category of the JSON element
+        @return The name path of the added element, or None if the parent does not exist,
+        the category is not known or a child with the same name exists
+        '''
+        parent = self.getNode(parentPath)
+        category = category or node.get('category')
+        name = node.get('name')
+        if parent is None or not category or not name:
+            return None
+        path = self._childPath(parentPath, name)
+        if path in self._elements:
+            return None
+
+        key = _CATEGORY_CHILD_KEYS.get(category, core.CHILDREN_STRING)
+        if key == core.CHILDREN_STRING:
+            node['category'] = category
+        parent.setdefault(key, []).append(node)
+        self._add(path, node, category)
+        self._indexChildren(path, node)
+        return path
+
+    def removeElement(self, path: str) -> bool:
+        '''
+        @brief Remove the element at a name path and its descendants
+        @return True if the element was removed, otherwise False
+        '''
+        entry = self._elements.get(path)
+        if not entry or not path:
+            return False
+        node, category = entry
+        parentPath = path.rpartition(core.NAME_PATH_SEPARATOR)[0]
+        parent = self.getNode(parentPath)
+        key = _CATEGORY_CHILD_KEYS.get(category, core.CHILDREN_STRING)
+        siblings = parent.get(key, [])
+        for index, sibling in enumerate(siblings):
+            if sibling is node:
+                del siblings[index]
+                break
+        if not siblings:
+            parent.pop(key, None)
+        self._remove(path)
+        return True
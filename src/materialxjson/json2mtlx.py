@@ -2,21 +2,87 @@
 '''
 Command to convert from JSON to XML representation of a MaterialX document
 '''
-import MaterialX as mx
-from materialxjson import core
+from __future__ import annotations
+
+import materialxjson
+from materialxjson import core, batch, fileio, manifest, verify
+from materialxjson.core import mx
 import json
-import os, argparse
+import os, sys, argparse
+
+def getManifestOptions(opts) -> dict:
+    '''
+    @brief Get the options which affect the output, for recording in a conversion manifest
+    @param opts The parsed command line options
+    @return Dictionary of options
+    '''
+    return {
+        'command': 'j2m',
+        'version': materialxjson.__version__,
+        'materialx': mx.getVersionString(),
+        'upgradeVersion': opts.upgradeVersion,
+        'compress': opts.compress,
+    }
+
+def convertFile(task: tuple) -> tuple:
+    '''
+    @brief Convert a single JSON file to XML.
+    @param task Tuple of (input file name, output file name, command line options, manifest entry)
+    @return Tuple of (status message, ConversionStats or None), with (manifest entry, skipped) added for incremental conversion
+    '''
+    fileName, outputFileName, opts, entry = task
+    readOptions = core.JsonReadOptions()
+    readOptions.upgradeVersion = opts.upgradeVersion
+    readOptions.streamInput = opts.stream
+    readOptions.jobs = opts.documentJobs
+    if opts.stats or opts.statsFile:
+        readOptions.stats = core.ConversionStats()
+    def convert():
+        # Hash the elements as they are read, so that verification only reads the XML file written
+        readOptions.structureHash = verify.StructureHash() if opts.verify else None
+        # Raise so that the batch records a failure, as the reader reports the reason itself
+        if not core.Util.jsonFileToXmlFile(fileName, outputFileName, readOptions):
+            raise ValueError('Failed to read "%s"' % fileName)
+        if opts.verify:
+            verify.checkXmlOutput(fileName, outputFileName, readOptions)
+    message = 'Convert JSON file "%s" -> XML file "%s"' % (fileName, outputFileName)
 
-def main():
+    if opts.incremental:
+        entry, skipped = manifest.convertIfChanged(convert, fileName, outputFileName, getManifestOptions(opts), entry)
+        if skipped:
+            return 'Skip unchanged JSON file "%s"' % fileName, None, (entry, True)
+        return message, readOptions.stats, (entry, False)
+
+    convert()
+    return message, readOptions.stats
+
+def stringToBoolean(value: str) -> bool:
+    '''
+    @brief Convert a command line string to a boolean. MaterialX is only loaded once an option is parsed.
+    '''
+    return mx.stringToBoolean(value)
+
+def main(argv: list = None, prog: str = None) -> int:
     '''
     Command to convert from JSON to XML representation of a MaterialX document
     '''
-    parser = argparse.ArgumentParser(description="Utility to convert from JSON to XML representation of a MaterialX document")
+    parser = argparse.ArgumentParser(prog=prog, description="Utility to convert from JSON to XML representation of a MaterialX document")
     parser.add_argument('--outputPath', dest='outputPath', default='', help='File path to output results to.')
-    parser.add_argument('--upgradeVersion', dest='upgradeVersion', type=mx.stringToBoolean, default=True, help='Upgrade document version. Default is True.')
+    parser.add_argument('--upgradeVersion', dest='upgradeVersion', type=stringToBoolean, default=True, help='Upgrade document version. Default is True.')
+    parser.add_argument('--compress', dest='compress', default='', choices=['', 'none', 'gzip', 'lzma'], help='Compress XML files with gzip (.gz) or lzma (.xz). Default is to use the compression of the input file.')
+    parser.add_argument('--stream', dest='stream', type=stringToBoolean, default=False, help='Read JSON incrementally without loading the entire file first. Default is False.')
+    parser.add_argument('--verify', dest='verify', type=stringToBoolean, default=False, help='Check that each XML file has the same structure as its JSON file after conversion. Requires --upgradeVersion false for JSON files of older MaterialX versions. Default is False.')
+    parser.add_argument('--stats', dest='stats', type=stringToBoolean, default=False, help='Print conversion timings and counters. Default is False.')
+    parser.add_argument('--statsFile', dest='statsFile', default='', help='File to write conversion timings and counters to in JSON format.')
+    parser.add_argument('--incremental', dest='incremental', type=stringToBoolean, default=False, help='Skip files whose input, options and output are unchanged since the last conversion. Default is False.')
+    parser.add_argument('--manifest', dest='manifest', default='', help='Manifest file used for incremental conversion. Default is "%s" in the output path or input folder.' % manifest.MANIFEST_FILENAME)
+    parser.add_argument('--jobs', dest='jobs', type=int, default=1, help='Number of worker processes to convert files with. 0 uses all CPUs. Default is 1.')
+    parser.add_argument('--documentJobs', dest='documentJobs', type=int, default=1, help='Number of worker processes to build the elements of each document with, for single very large documents. 0 uses all CPUs. Default is 1.')
+    parser.add_argument('--chunkSize', dest='chunkSize', type=int, default=1, help='Number of files sent to a worker process at a time. Default is 1.')
+    parser.add_argument('--timeout', dest='timeout', type=float, default=0, help='Time limit in seconds for converting each file. A call into MaterialX, such as parsing an XML file, is not interrupted. Default is 0 for no limit.')
     parser.add_argument(dest="inputFileName", help="Filename of the input document or folder containing input documents")
 
-    opts = parser.parse_args()
+    opts = parser.parse_args(argv)
 
      # Get absolute path of opts.outputPath
     if opts.outputPath:    
@@ -26,38 +92,53 @@ def main():
     if outputPath.size() > 0:
         if os.path.isdir(outputPath.asString()):
             print('Output path "%s" does not exist.' % outputPath.asString())
-            exit(-1)
+            return 1
         else:
             print('- Write files to outputPath: '+ opts.outputPath)
 
     fileList = []
     extension = 'json'
     if os.path.isdir(opts.inputFileName): 
-        fileList = core.Util.getFiles(opts.inputFileName, extension)
+        fileList = core.Util.getFiles(opts.inputFileName, extension, compressed=True)
     else:
-        extension = mx.FilePath(opts.inputFileName).getExtension()
+        extension = mx.FilePath(fileio.splitCompressionExtension(opts.inputFileName)[0]).getExtension()
         if extension == 'json':
             fileList.append(opts.inputFileName)
 
     if not fileList:
         print('No files found with extension "%s"' % extension)
-        exit(-1)
+        return 1
+
+    conversionManifest = None
+    if opts.incremental:
+        conversionManifest = manifest.ConversionManifest(opts.manifest or manifest.getManifestFileName(opts.inputFileName, opts.outputPath))
+        conversionManifest.load()
 
-    ## Create I/O handler
-    mtlxjson = core.MaterialXJson()
-    
+    tasks = []
     for fileName in fileList:
 
         if extension == 'json':
+            baseName, compression = fileio.splitCompressionExtension(fileName)
+            xmlFileName = baseName.replace('.json', '_json.mtlx') + fileio.getCompressionExtension(opts.compress or compression)
             if mx.FilePath(fileName).isAbsolute():
-                outputFilePath = mx.FilePath(fileName.replace('.json', '_json.mtlx'))
+                outputFilePath = mx.FilePath(xmlFileName)
             else:
-                outputFilePath = outputPath / mx.FilePath(fileName.replace('.json', '_json.mtlx'))
+                outputFilePath = outputPath / mx.FilePath(xmlFileName)
             outputFileName = outputFilePath.asString()
-            readOptions = core.JsonReadOptions()
-            readOptions.upgradeVersion = opts.upgradeVersion
-            converted = core.Util.jsonFileToXmlFile(fileName, outputFileName, readOptions)
-            print('Convert JSON file "%s" -> XML file "%s". Status: %s' % (fileName, outputFileName, converted))
+            tasks.append((fileName, outputFileName, opts, conversionManifest.getEntry(fileName) if conversionManifest else None))
+
+    result = batch.runBatch(convertFile, tasks, opts.jobs, opts.chunkSize, opts.timeout)
+    if conversionManifest:
+        skippedCount = manifest.updateManifest(conversionManifest, result)
+        print('- Skipped %d unchanged files. Manifest: "%s"' % (skippedCount, conversionManifest.fileName))
+    print(result.summary())
+    if result.stats:
+        if opts.stats:
+            print(result.stats.summary())
+        if opts.statsFile:
+            with open(opts.statsFile, 'w') as outfile:
+                json.dump(result.stats.toDict(), outfile, indent=2)
+    return 1 if result.failures else 0
            
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
@@ -0,0 +1,218 @@
+# jsoncodec.py
+
+'''
+@file
+This module contains the codecs used to encode and decode JSON text.
+
+The stdlib json module is always available. When orjson is installed it is used by default
+as it is several times faster, in particular for indented output, which the stdlib json module
+encodes in Python. Codecs only differ in speed: a codec falls back to the stdlib json module
+for any input or format for which its output would differ, so the JSON text and the decoded
+JSON documents are identical for all codecs.
+
+The codec can be selected per call with the codec option of JsonWriteOptions and
+JsonReadOptions, or for all calls with setDefaultCodec().
+'''
+
+import json
+import re
+
+# Depth of the objects and arrays written in parts by JsonCodec.dump(), which are the document,
+# the MaterialX root and its children array
+_DUMP_DEPTH = 3
+
+class JsonCodec:
+    '''
+    Base class for JSON codecs, which encodes and decodes with the stdlib json module.
+    '''
+    name = 'json'
+    # Whether bytes-like objects such as memory mapped files are decoded without copying them
+    decodesBuffers = False
+
+    def encode(self, jsonObject, indent = None, separators = None) -> str:
+        '''
+        @brief Encode a JSON document as text
+        @param jsonObject The JSON document to encode
+        @param indent The number of spaces to indent by, or None for no line breaks. Default is None
+        @param separators The item and key separators. Default is None to use the json module defaults
+        @return The JSON text
+        '''
+        return json.dumps(jsonObject, indent=indent, separators=separators)
+
+    def dump(self, jsonObject, stream, indent = None, separators = None) -> None:
+        '''
+        @brief Encode a JSON document as text to a file-like object, in chunks without holding
+        all of the text in memory.
+        @param jsonObject The JSON document to encode
+        @param stream The file-like object to write to
+        @param indent The number of spaces to indent by, or None for no line breaks. Default is None
+        @param separators The item and key separators. Default is None to use the json module defaults
+        '''
+        if indent is not None:
+            json.dump(jsonObject, stream, indent=indent, separators=separators)
+            return
+
+        # json.dump() does not use the C encoder of the json module, so the outer objects and arrays
+        # are written here and the values within them, such as top level elements, are encoded by it
+        encoder = json.JSONEncoder(separators=separators)
+        itemSeparator, keySeparator = separators or (', ', ': ')
+        def write(value, depth: int):
+            if depth < _DUMP_DEPTH and type(value) is dict and value and all(type(key) is str for key in value):
+                stream.write('{')
+                for index, (key, item) in enumerate(value.items()):
+                    stream.write((itemSeparator if index else '') + encoder.encode(key) + keySeparator)
+                    write(item, depth + 1)
+                stream.write('}')
+            elif depth < _DUMP_DEPTH and type(value) is list and value:
+                stream.write('[')
+                for index, item in enumerate(value):
+                    if index:
+                        stream.write(itemSeparator)
+                    write(item, depth + 1)
+                stream.write(']')
+            else:
+                stream.write(encoder.encode(value))
+        write(jsonObject, 0)
+
+    def decode(self, data):
+        '''
+        @brief Decode JSON text
+        @param data The JSON text as a string, or as bytes or a bytes-like object such as an mmap
+        in UTF-8, UTF-16 or UTF-32
+        @return The JSON document
+        @throws ValueError if the text is not valid JSON
+        '''
+        if not isinstance(data, (str, bytes, bytearray)):
+            data = bytes(data)
+        return json.loads(data)
+
+class OrjsonCodec(JsonCodec):
+    '''
+    JSON codec using the orjson package.
+    @throws ImportError on construction if orjson is not installed
+    '''
+    name = 'orjson'
+    decodesBuffers = True
+
+    # Exponent of a float, or a string such as "file1" in which case the preceding byte is checked
+    _EXPONENT = re.compile(rb'e[-0-9]')
+
+    def __init__(self):
+        '''
+        @brief Constructor
+        '''
+        import orjson
+        self._orjson = orjson
+        # Formats written by orjson, by indent and separators
+        self._options = {
+            (None, (',', ':')): 0,
+            (2, (',', ': ')): orjson.OPT_INDENT_2,
+        }
+
+    def _encodeBytes(self, jsonObject, indent, separators) -> bytes:
+        '''
+        @brief Encode a JSON document with orjson
+        @return The JSON text as bytes, or None if the json module is to be used instead
+        '''
+        if separators is None:
+            separators = (', ', ': ') if indent is None else (',', ': ')
+        option = self._options.get((indent, tuple(separators)))
+        if option is None:
+            return None
+        try:
+            data = self._orjson.dumps(jsonObject, option=option)
+        except TypeError:
+            return None
+        return None if self._differs(data) else data
+
+    def encode(self, jsonObject, indent = None, separators = None) -> str:
+        data = self._encodeBytes(jsonObject, indent, separators)
+        if data is not None:
+            return data.decode('ascii')
+        return JsonCodec.encode(self, jsonObject, indent, separators)
+
+    def dump(self, jsonObject, stream, indent = None, separators = None) -> None:
+        # The text is only held in memory when orjson writes it
+        data = self._encodeBytes(jsonObject, indent, separators)
+        if data is not None:
+            stream.write(data.decode('ascii'))
+        else:
+            JsonCodec.dump(self, jsonObject, stream, indent, separators)
+
+    def _differs(self, data: bytes) -> bool:
+        '''
+        @brief Check if orjson output may differ from the json module output. This is the case for
+        characters which the json module escapes, floats written with an exponent or below 1e-4,
+        and NaN or infinity which orjson writes as null. Matches within strings only cause a fallback.
+        '''
+        if not data.isascii() or b'\x7f' in data or b'null' in data or b'0.0000' in data:
+            return True
+        for match in self._EXPONENT.finditer(data):
+            if 48 <= data[match.start() - 1] <= 57:
+                return True
+        return False
+
+    def decode(self, data):
+        try:
+            if isinstance(data, (str, bytes, bytearray, memoryview)):
+                return self._orjson.loads(data)
+            # Parse other buffers such as memory mapped files in place
+            with memoryview(data) as view:
+                return self._orjson.loads(view)
+        except (ValueError, TypeError):
+            # Text which orjson rejects but the json module accepts, e.g. NaN, large integers or
+            # UTF-16 input, is decoded by the json module, which also reports any error
+            return JsonCodec.decode(self, data)
+
+# Codec classes by name, in order of preference
+_CODEC_CLASSES = { 'orjson': OrjsonCodec, 'json': JsonCodec }
+# Codec instances by name, or None for codecs which are not installed
+_codecs = {}
+# The default codec, or None to use the preferred installed codec
+_defaultCodec = None
+
+def _createCodec(name: str) -> JsonCodec:
+    '''
+    @brief Get the codec instance for a name, or None if the codec is not installed
+    '''
+    if name not in _codecs:
+        try:
+            _codecs[name] = _CODEC_CLASSES[name]()
+        except ImportError:
+            _codecs[name] = None
+    return _codecs[name]
+
+def getCodecNames() -> list:
+    '''
+    @brief Get the names of the installed codecs, in order of preference
+    '''
+    return [name for name in _CODEC_CLASSES if _createCodec(name)]
+
+def getCodec(codec = None) -> JsonCodec:
+    '''
+    @brief Get a codec
+    @param codec A codec name or instance. Default is None to get the default codec
+    @return The codec
+    @throws ValueError if the codec is unknown or not installed
+    '''
+    if isinstance(codec, JsonCodec):
+        return codec
+    if codec is None:
+        if _defaultCodec is not None:
+            return _defaultCodec
+        codec = getCodecNames()[0]
+    if codec not in _CODEC_CLASSES:
+        raise ValueError('Unknown JSON codec "%s". Available codecs: %s' % (codec, ', '.join(getCodecNames())))
+    instance = _createCodec(codec)
+    if instance is None:
+        raise ValueError('JSON codec "%s" is not installed' % codec)
+    return instance
+
+def setDefaultCodec(codec = None) -> None:
+    '''
+    @brief Set the codec used when no codec is given in the read or write options
+    @param codec A codec name or instance. Default is None to use the preferred installed codec
+    @throws ValueError if the codec is unknown or not installed
+    '''
+    global _defaultCodec
+    _defaultCodec = getCodec(codec) if codec is not None else None
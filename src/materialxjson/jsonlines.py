@@ -0,0 +1,237 @@
+# jsonlines.py
+
+'''
+@file
+This module contains the JSON Lines layout, in which a document is written with one
+top level element per line.
+
+The first line is a header holding the mimetype, the document attributes and the name and
+category of the element on each following line. Each following line holds the JSON for one
+top level element, as in the children array of the JSON document. A reader can therefore
+start on the first element without parsing the whole file, and select the lines to parse
+from the header alone.
+
+A document can be split into shards, each a JSON Lines file with its own header. Shards hold
+consecutive top level elements, balanced by size, so that reading all shards in order gives
+back the document. Consumers can process shards independently without coordinating. Shard
+files are named by inserting the shard index and count before the extension, e.g.
+"library-00001-of-00004.jsonl".
+
+Lines are always written compactly. The string table layout is not used, so that each line
+can be read on its own.
+'''
+
+import concurrent.futures
+import copy
+import glob
+import os
+import time
+
+from materialxjson import core, fileio, jsoncodec
+from materialxjson.core import mx
+
+# Mime type of the header line
+JSONL_MIMETYPE = 'application/mtlx+jsonl'
+# File extension of JSON Lines files
+JSONL_EXTENSION = '.jsonl'
+# Header keys
+SHARD_KEY = 'shard'
+SHARD_COUNT_KEY = 'shardCount'
+ELEMENTS_KEY = 'elements'
+
+_SEPARATORS = (',', ':')
+
+def getShardFileName(fileName: str, shard: int, shardCount: int) -> str:
+    '''
+    @brief Get the file name of a shard, e.g. "library-00001-of-00004.jsonl" for "library.jsonl"
+    @param fileName The file name of the document. A compression extension is kept at the end
+    @param shard The index of the shard
+    @param shardCount The number of shards. The file name is returned unchanged for a single shard
+    @return The shard file name
+    '''
+    if shardCount == 1:
+        return fileName
+    baseName, compression = fileio.splitCompressionExtension(fileName)
+    root, extension = os.path.splitext(baseName)
+    return '%s-%05d-of-%05d%s%s' % (root, shard, shardCount, extension, fileio.getCompressionExtension(compression))
+
+def findShardFiles(fileName: str) -> list:
+    '''
+    @brief Find the files of a document which may have been written in shards
+    @param fileName The file name the document was written with
+    @return List of the shard file names in shard order, or the file name itself if it was not sharded
+    '''
+    if os.path.exists(fileName):
+        return [fileName]
+    baseName, compression = fileio.splitCompressionExtension(fileName)
+    root, extension = os.path.splitext(baseName)
+    pattern = '%s-[0-9]*-of-[0-9]*%s%s' % (glob.escape(root), extension, fileio.getCompressionExtension(compression))
+    return sorted(glob.glob(pattern))
+
+def documentToLines(doc: mx.Document, writeOptions: core.JsonWriteOptions = None) -> tuple:
+    '''
+    @brief Convert a MaterialX document to JSON Lines
+    @param doc The MaterialX document to convert
+    @param writeOptions The write options to use. The indentation, separators and string table options are ignored.
+    Default is None
+    @return Tuple of (document attributes, list of (name, category, line) for each top level element).
+    Lines do not include the line break
+    '''
+    stats = writeOptions.stats if writeOptions else None
+    codec = jsoncodec.getCodec(writeOptions.codec if writeOptions else None)
+    jsonOptions = copy.copy(writeOptions) if writeOptions else core.JsonWriteOptions()
+    jsonOptions.stringTable = False
+
+    attributes = core.MaterialXJson().documentToJSON(doc, jsonOptions)[core.MATERIALX_DOCUMENT_ROOT]
+    nodes = attributes.pop(core.CHILDREN_STRING)
+
+    with core.statsPhase(stats, 'jsonEncode'):
+        lines = [(node['name'], node['category'], codec.encode(node, None, _SEPARATORS)) for node in nodes]
+    return attributes, lines
+
+def _partition(lines: list, shardCount: int) -> list:
+    '''
+    @brief Split lines into consecutive groups of about equal size
+    @return List of shardCount lists of lines
+    '''
+    total = sum(len(line) for _, _, line in lines)
+    shards = [[] for _ in range(shardCount)]
+    size = 0
+    shard = 0
+    for item in lines:
+        # Start the next shard once this one holds its share of the total size
+        while shard < shardCount - 1 and size >= total * (shard + 1) / shardCount:
+            shard += 1
+        shards[shard].append(item)
+        size += len(item[2])
+    return shards
+
+def writeFiles(doc: mx.Document, fileName: str, writeOptions: core.JsonWriteOptions = None, shardCount: int = 1) -> list:
+    '''
+    @brief Write a MaterialX document as JSON Lines files
+    @param doc The MaterialX document to write
+    @param fileName The file to write to. The file is compressed if it ends with a .gz or .xz extension
+    @param writeOptions The write options to use. Default is None
+    @param shardCount The number of shard files to write, named by getShardFileName(). Shards are written
+    even if they hold no elements. Default is 1
+    @return List of the files written
+    '''
+    if shardCount < 1:
+        raise ValueError('Invalid shard count %d' % shardCount)
+    stats = writeOptions.stats if writeOptions else None
+    compression = writeOptions.compression if writeOptions else None
+    codec = jsoncodec.getCodec(writeOptions.codec if writeOptions else None)
+
+    attributes, lines = documentToLines(doc, writeOptions)
+    fileNames = []
+    for shard, shardLines in enumerate(_partition(lines, shardCount)):
+        header = {
+            core.JSON_MIMETYPE_KEY: JSONL_MIMETYPE,
+            SHARD_KEY: shard,
+            SHARD_COUNT_KEY: shardCount,
+            core.MATERIALX_DOCUMENT_ROOT: attributes,
+            ELEMENTS_KEY: [[name, category] for name, category, _ in shardLines],
+        }
+        with core.statsPhase(stats, 'jsonEncode'):
+            text = '\n'.join([codec.encode(header, None, _SEPARATORS)] + [line for _, _, line in shardLines]) + '\n'
+        shardFileName = getShardFileName(fileName, shard, shardCount)
+        with core.statsPhase(stats, 'fileWrite'):
+            with fileio.openOutputStream(shardFileName, compression) as outfile:
+                outfile.write(text)
+        if stats:
+            stats.bytesWritten += os.path.getsize(shardFileName)
+        fileNames.append(shardFileName)
+    return fileNames
+
+def readHeader(line, codec = None) -> dict:
+    '''
+    @brief Decode and check the header line of a JSON Lines file
+    @param line The header line as a string or bytes
+    @param codec Name or instance of the JSON codec to use. Default is None to use the default codec
+    @return The header
+    @throws ValueError if the line is not a JSON Lines header
+    '''
+    header = jsoncodec.getCodec(codec).decode(line)
+    if not isinstance(header, dict) or header.get(core.JSON_MIMETYPE_KEY) != JSONL_MIMETYPE:
+        raise ValueError('Not a MaterialX JSON Lines file')
+    if not isinstance(header.get(ELEMENTS_KEY), list) or not isinstance(header.get(core.MATERIALX_DOCUMENT_ROOT), dict):
+        raise ValueError('JSON Lines header is missing the document attributes or elements')
+    return header
+
+def readFile(fileName: str, readOptions: core.JsonReadOptions = None, select = None) -> tuple:
+    '''
+    @brief Read the header and the selected elements of a JSON Lines file. Lines which are not
+    selected are not decoded.
+    @param fileName The file to read. The file is decompressed if it ends with a .gz or .xz extension
+    @param readOptions The read options whose codec, compression and stats are used. Default is None
+    @param select Function called with the name and category of each top level element, returning True
+    to read the element. Default is None to read all elements
+    @return Tuple of (header, list of JSON elements)
+    @throws ValueError if the file is not a valid JSON Lines file
+    '''
+    stats = readOptions.stats if readOptions else None
+    codec = jsoncodec.getCodec(readOptions.codec if readOptions else None)
+    compression = readOptions.compression if readOptions else None
+
+    readStart = time.perf_counter()
+    with fileio.openInputData(fileName, False, compression) as data:
+        lines = data.split(b'\n')
+    if stats:
+        stats.addTime('fileRead', time.perf_counter() - readStart)
+        stats.bytesRead += os.path.getsize(fileName)
+
+    with core.statsPhase(stats, 'jsonDecode'):
+        header = readHeader(lines[0], codec)
+        elements = header[ELEMENTS_KEY]
+        if len(lines) < len(elements) + 1 or any(lines[len(elements) + 1:]):
+            raise ValueError('JSON Lines file "%s" does not hold the %d elements listed in its header' % (fileName, len(elements)))
+        nodes = [codec.decode(lines[index + 1]) for index, (name, category) in enumerate(elements)
+                 if select is None or select(name, category)]
+    return header, nodes
+
+def readFiles(fileNames: list, doc: mx.Document, readOptions: core.JsonReadOptions = None, select = None, jobs: int = 1) -> bool:
+    '''
+    @brief Read JSON Lines files into a MaterialX document
+    @param fileNames The files to read, such as all or some of the shards of a document. Shards are read
+    in shard order, so that elements are added in document order
+    @param doc The MaterialX document to write to
+    @param readOptions The read options to use. Default is None
+    @param select Function called with the name and category of each top level element, returning True
+    to read the element. Default is None to read all elements
+    @param jobs The number of files to read and decode at a time with a thread pool. Reading and
+    decompression overlap between threads, while decoding does not. Default is 1
+    @return True if successful, false otherwise
+    '''
+    if isinstance(fileNames, str):
+        fileNames = [fileNames]
+    if not fileNames:
+        print('No JSON Lines files to read')
+        return False
+    stats = readOptions.stats if readOptions else None
+
+    def readShard(fileName):
+        # Collect stats separately for each thread and merge them afterwards
+        shardOptions = copy.copy(readOptions) if readOptions else core.JsonReadOptions()
+        shardOptions.stats = core.ConversionStats() if stats else None
+        header, nodes = readFile(fileName, shardOptions, select)
+        return header, nodes, shardOptions.stats
+
+    try:
+        if jobs > 1 and len(fileNames) > 1:
+            with concurrent.futures.ThreadPoolExecutor(min(jobs, len(fileNames))) as executor:
+                results = list(executor.map(readShard, fileNames))
+        else:
+            results = [readShard(fileName) for fileName in fileNames]
+    except (OSError, ValueError) as err:
+        print('Failed to read JSON Lines file: %s' % err)
+        return False
+    if stats:
+        for _, _, shardStats in results:
+            stats.merge(shardStats)
+    results.sort(key=lambda result: result[0].get(SHARD_KEY, 0))
+
+    # Read as a single JSON document so that reading matches MaterialXJson.documentFromJSON()
+    documentRoot = dict(results[0][0][core.MATERIALX_DOCUMENT_ROOT])
+    documentRoot[core.CHILDREN_STRING] = [node for _, nodes, _ in results for node in nodes]
+    jsonDoc = { core.JSON_MIMETYPE_KEY: core.JSON_MIMETYPE, core.MATERIALX_DOCUMENT_ROOT: documentRoot }
+    return core.MaterialXJson().documentFromJSON(jsonDoc, doc, readOptions)
@@ -0,0 +1,203 @@
+# manifest.py
+
+'''
+@file
+This module contains support for incremental conversion of files. A manifest records
+the content hash of each converted input, the options used and the content hash of the
+output, so that inputs which have not changed since the last conversion can be skipped.
+'''
+
+import hashlib
+import json
+import os
+
+# Default manifest file name. A non-JSON extension is used so that the manifest
+# is not picked up as an input when converting folders of JSON files.
+MANIFEST_FILENAME = 'materialxjson.manifest'
+MANIFEST_VERSION = 1
+
+def hashFile(fileName: str, chunkSize: int = 1 << 20) -> str:
+    '''
+    @brief Compute the content hash of a file
+    @param fileName The file to hash
+    @param chunkSize The number of bytes to read at a time. Default is 1 MB
+    @return The hexadecimal hash string
+    '''
+    digest = hashlib.blake2b(digest_size=20)
+    with open(fileName, 'rb') as infile:
+        while True:
+            chunk = infile.read(chunkSize)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ConversionManifest:
+    '''
+    Class for reading and writing a manifest of converted files.
+
+    Each entry is keyed by the absolute input file name and contains:
+        - inputHash: The content hash of the input file
+        - options: Dictionary of the options which affect the output
+        - output: The absolute output file name
+        - outputHash: The content hash of the output file
+
+    Paths are stored relative to the manifest folder on disk.
+    '''
+    def __init__(self, fileName: str):
+        '''
+        @brief Constructor
+        @param fileName The manifest file name
+        '''
+        self.fileName = os.path.abspath(fileName)
+        self.entries = {}
+
+    def _folder(self) -> str:
+        '''
+        @brief Get the folder containing the manifest
+        '''
+        return os.path.dirname(self.fileName)
+
+    def load(self) -> bool:
+        '''
+        @brief Load the manifest from file. A missing or unreadable manifest results in no entries.
+        @return True if the manifest was loaded, otherwise False
+        '''
+        self.entries = {}
+        try:
+            with open(self.fileName, 'r') as infile:
+                manifest = json.load(infile)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION:
+            return False
+
+        folder = self._folder()
+        for inputFile, entry in manifest.get('files', {}).items():
+            entry = dict(entry)
+            entry['output'] = os.path.normpath(os.path.join(folder, entry['output']))
+            self.entries[os.path.normpath(os.path.join(folder, inputFile))] = entry
+        return True
+
+    def save(self) -> None:
+        '''
+        @brief Save the manifest to file. The file is replaced atomically.
+        '''
+        folder = self._folder()
+        files = {}
+        for inputFile in sorted(self.entries):
+            entry = dict(self.entries[inputFile])
+            entry['output'] = os.path.relpath(entry['output'], folder)
+            files[os.path.relpath(inputFile, folder)] = entry
+
+        tempFileName = self.fileName + '.tmp'
+        with open(tempFileName, 'w') as outfile:
+            json.dump({ 'version': MANIFEST_VERSION, 'files': files }, outfile, indent=2)
+        os.replace(tempFileName, self.fileName)
+
+    def getEntry(self, inputFile: str) -> dict:
+        '''
+        @brief Get the entry for an input file
+        @param inputFile The input file name
+        @return The entry or None if the file is not in the manifest
+        '''
+        return self.entries.get(os.path.abspath(inputFile))
+
+    def setEntry(self, inputFile: str, entry: dict) -> None:
+        '''
+        @brief Set or remove the entry for an input file
+        @param inputFile The input file name
+        @param entry The entry to set, or None to remove the entry
+        '''
+        key = os.path.abspath(inputFile)
+        if entry:
+            self.entries[key] = entry
+        else:
+            self.entries.pop(key, None)
+
+    @staticmethod
+    def createEntry(inputHash: str, outputFile: str, options: dict) -> dict:
+        '''
+        @brief Create an entry for a converted file
+        @param inputHash The content hash of the input file
+        @param outputFile The output file name
+        @param options Dictionary of the options used for conversion
+        @return The entry, or None if the output file does not exist
+        '''
+        if not os.path.isfile(outputFile):
+            return None
+        return {
+            'inputHash': inputHash,
+            'options': options,
+            'output': os.path.abspath(outputFile),
+            'outputHash': hashFile(outputFile),
+        }
+
+    @staticmethod
+    def isUpToDate(entry: dict, inputHash: str, outputFile: str, options: dict) -> bool:
+        '''
+        @brief Check if an entry matches the current input and options, and its output is intact
+        @param entry The manifest entry. May be None
+        @param inputHash The content hash of the input file
+        @param outputFile The output file name
+        @param options Dictionary of the options to be used for conversion
+        @return True if the conversion can be skipped, otherwise False
+        '''
+        if not entry:
+            return False
+        if entry.get('inputHash') != inputHash or entry.get('options') != options:
+            return False
+        if entry.get('output') != os.path.abspath(outputFile) or not os.path.isfile(outputFile):
+            return False
+        return entry.get('outputHash') == hashFile(outputFile)
+
+def getManifestFileName(inputPath: str, outputPath: str = '') -> str:
+    '''
+    @brief Get the default manifest file name for a conversion. The manifest is placed in the
+    output path if one is given, otherwise next to the inputs.
+    @param inputPath The input file or folder
+    @param outputPath The output path. Default is an empty string
+    @return The manifest file name
+    '''
+    if outputPath:
+        folder = outputPath
+    elif os.path.isdir(inputPath):
+        folder = inputPath
+    else:
+        folder = os.path.dirname(os.path.abspath(inputPath))
+    return os.path.join(folder, MANIFEST_FILENAME)
+
+def convertIfChanged(convert, inputFile: str, outputFile: str, options: dict, entry: dict) -> tuple:
+    '''
+    @brief Run a conversion unless the manifest entry shows it is up to date
+    @param convert Function called with no arguments to perform the conversion
+    @param inputFile The input file name
+    @param outputFile The output file name
+    @param options Dictionary of the options which affect the output. Values must be JSON types
+    @param entry The current manifest entry for the input file. May be None
+    @return Tuple of (new entry, skipped). The entry is None if no output was written
+    '''
+    inputHash = hashFile(inputFile)
+    if ConversionManifest.isUpToDate(entry, inputHash, outputFile, options):
+        return entry, True
+    convert()
+    return ConversionManifest.createEntry(inputHash, outputFile, options), False
+
+def updateManifest(manifest: ConversionManifest, result) -> int:
+    '''
+    @brief Update and save a manifest from the results of a batch conversion.
+    Tasks must have the input file name as their first item and return (entry, skipped) as data.
+    Entries for failed tasks are removed so that they are converted again.
+    @param manifest The manifest to update
+    @param result The BatchResult
+    @return The number of skipped files
+    '''
+    skippedCount = 0
+    for task, (entry, skipped) in result.data:
+        manifest.setEntry(task[0], entry)
+        if skipped:
+            skippedCount += 1
+    for task, message in result.failures:
+        manifest.setEntry(task[0], None)
+    manifest.save()
+    return skippedCount
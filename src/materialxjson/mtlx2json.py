@@ -2,115 +2,211 @@
 '''
 Command to convert from  XML and JSON representation of a MaterialX document
 '''
-import MaterialX as mx
-import core
+from __future__ import annotations
+
+import materialxjson
+from materialxjson import core, batch, fileio, manifest, verify
+from materialxjson.core import mx
 import json
-import os, argparse
+import os, sys, argparse
+
+# Categories and types skipped by the --skipAssignments and --skipMaterials options
+ASSIGNMENT_CATEGORIES = ['materialassign', 'look', 'lookgroup']
+MATERIAL_CATEGORIES = ['surfacematerial']
+MATERIAL_TYPES = ['surfaceshader', 'displacementshader', 'volumeshader']
+
+def splitList(value: str) -> list:
+    '''
+    @brief Split a comma separated command line string into a list
+    '''
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+def createElementFilter(opts) -> core.ElementFilter:
+    '''
+    @brief Create an element filter from command line options
+    @param opts The parsed command line options
+    @return The element filter
+    '''
+    elementFilter = core.ElementFilter()
+    elementFilter.includeCategories.update(splitList(opts.includeCategories))
+    elementFilter.excludeCategories.update(splitList(opts.excludeCategories))
+    elementFilter.includeTypes.update(splitList(opts.includeTypes))
+    elementFilter.excludeTypes.update(splitList(opts.excludeTypes))
+    elementFilter.includeNames.extend(splitList(opts.includeNames))
+    elementFilter.excludeNames.extend(splitList(opts.excludeNames))
+    if opts.skipAssignments:
+        elementFilter.excludeCategories.update(ASSIGNMENT_CATEGORIES)
+    if opts.skipMaterials:
+        elementFilter.excludeCategories.update(MATERIAL_CATEGORIES)
+        elementFilter.excludeTypes.update(MATERIAL_TYPES)
+    elementFilter.libraryElements = 'local' if opts.skipLibraryElements else 'all'
+    return elementFilter
+
+def createWriteOptions(opts) -> core.JsonWriteOptions:
+    '''
+    @brief Create write options from command line options
+    @param opts The parsed command line options
+    @return The write options
+    '''
+    writeOptions = core.JsonWriteOptions()
+    writeOptions.elementFilter = createElementFilter(opts)
+    writeOptions.indent = opts.indent
+    if opts.compact:
+        writeOptions.separators = (',', ':')
+        writeOptions.indent = None
+    writeOptions.streamOutput = opts.stream
+    writeOptions.typedValues = opts.typedValues
+    writeOptions.stringTable = opts.stringTable
+    return writeOptions
+
+def getManifestOptions(opts) -> dict:
+    '''
+    @brief Get the options which affect the output, for recording in a conversion manifest
+    @param opts The parsed command line options
+    @return Dictionary of options
+    '''
+    return {
+        'command': 'm2j',
+        'version': materialxjson.__version__,
+        'materialx': mx.getVersionString(),
+        'indent': None if opts.compact else opts.indent,
+        'compact': opts.compact,
+        'typedValues': opts.typedValues,
+        'stringTable': opts.stringTable,
+        'compress': opts.compress,
+        'skipLibraryElements': opts.skipLibraryElements,
+        'skipMaterials': opts.skipMaterials,
+        'skipAssignments': opts.skipAssignments,
+        'includeCategories': sorted(splitList(opts.includeCategories)),
+        'excludeCategories': sorted(splitList(opts.excludeCategories)),
+        'includeTypes': sorted(splitList(opts.includeTypes)),
+        'excludeTypes': sorted(splitList(opts.excludeTypes)),
+        'includeNames': splitList(opts.includeNames),
+        'excludeNames': splitList(opts.excludeNames),
+    }
+
+def convertFile(task: tuple) -> tuple:
+    '''
+    @brief Convert a single XML file to JSON.
+    @param task Tuple of (input file name, output file name, command line options, manifest entry)
+    @return Tuple of (status message, ConversionStats or None), with (manifest entry, skipped) added for incremental conversion
+    '''
+    fileName, outputFileName, opts, entry = task
+    writeOptions = createWriteOptions(opts)
+    if opts.stats or opts.statsFile:
+        writeOptions.stats = core.ConversionStats()
+    def convert():
+        # Hash the elements as they are written, so that verification only reads the JSON file.
+        # The document read is kept to report mismatches
+        doc = mx.createDocument() if opts.verify else None
+        writeOptions.structureHash = verify.StructureHash(writeOptions.typedValues) if opts.verify else None
+        core.Util.xmlFileToJsonFile(fileName, outputFileName, writeOptions, doc)
+        if opts.verify:
+            verify.checkJsonOutput(doc, outputFileName, writeOptions)
+    message = 'Convert XML "%s" -> JSON  "%s"' % (fileName, outputFileName)
 
-def main():
+    if opts.incremental:
+        entry, skipped = manifest.convertIfChanged(convert, fileName, outputFileName, getManifestOptions(opts), entry)
+        if skipped:
+            return 'Skip unchanged XML "%s"' % fileName, None, (entry, True)
+        return message, writeOptions.stats, (entry, False)
+
+    convert()
+    return message, writeOptions.stats
+
+def stringToBoolean(value: str) -> bool:
+    '''
+    @brief Convert a command line string to a boolean. MaterialX is only loaded once an option is parsed.
+    '''
+    return mx.stringToBoolean(value)
+
+def main(argv: list = None, prog: str = None) -> int:
     '''
     Command to convert from  XML and JSON representation of a MaterialX document
     '''
-    parser = argparse.ArgumentParser(description="Utility to convert from XML to JSON representations of a MaterialX document")
+    parser = argparse.ArgumentParser(prog=prog, description="Utility to convert from XML to JSON representations of a MaterialX document")
     parser.add_argument('--outputPath', dest='outputPath', default='', help='File path to output results to.')
     parser.add_argument('--indent', dest='indent', type=int, default=2, help='Indentation for nested elements. Default is 2.')
-    parser.add_argument('--compact', dest='compact', type=mx.stringToBoolean, default=False, help='Write in compact format. Default is False.')
-    parser.add_argument('--skipLibraryElements', dest='skipLibraryElements', type=mx.stringToBoolean, default=True, help='Skip any library elements. Default is True.')
-    parser.add_argument('--skipMaterials', dest='skipMaterials', type=mx.stringToBoolean, default=False, help='Skip any material elements. Default is False.')
-    parser.add_argument('--skipAssignments', dest='skipAssignments', type=mx.stringToBoolean, default=False, help='Skip any material assignment elements. Default is False.')
+    parser.add_argument('--compact', dest='compact', type=stringToBoolean, default=False, help='Write in compact format. Default is False.')
+    parser.add_argument('--stream', dest='stream', type=stringToBoolean, default=False, help='Stream JSON to file without building the intermediate JSON object. Default is False.')
+    parser.add_argument('--typedValues', dest='typedValues', type=stringToBoolean, default=False, help='Write values as JSON numbers, booleans and arrays instead of strings. Default is False.')
+    parser.add_argument('--stringTable', dest='stringTable', type=stringToBoolean, default=False, help='Write keys and repeated strings once in a string table. Default is False.')
+    parser.add_argument('--compress', dest='compress', default='', choices=['', 'none', 'gzip', 'lzma'], help='Compress JSON files with gzip (.gz) or lzma (.xz). Default is to use the compression of the input file.')
+    parser.add_argument('--skipLibraryElements', dest='skipLibraryElements', type=stringToBoolean, default=True, help='Skip any library elements. Default is True.')
+    parser.add_argument('--skipMaterials', dest='skipMaterials', type=stringToBoolean, default=False, help='Skip any material elements. Default is False.')
+    parser.add_argument('--skipAssignments', dest='skipAssignments', type=stringToBoolean, default=False, help='Skip any material assignment elements. Default is False.')
+    parser.add_argument('--includeCategories', dest='includeCategories', default='', help='Comma separated list of top level element categories to include. Default is all.')
+    parser.add_argument('--excludeCategories', dest='excludeCategories', default='', help='Comma separated list of element categories to exclude at any depth.')
+    parser.add_argument('--includeTypes', dest='includeTypes', default='', help='Comma separated list of top level element types to include. Default is all.')
+    parser.add_argument('--excludeTypes', dest='excludeTypes', default='', help='Comma separated list of element types to exclude at any depth.')
+    parser.add_argument('--includeNames', dest='includeNames', default='', help='Comma separated list of top level element name patterns to include, e.g. "NG_*". Default is all.')
+    parser.add_argument('--excludeNames', dest='excludeNames', default='', help='Comma separated list of element name patterns to exclude at any depth.')
+    parser.add_argument('--verify', dest='verify', type=stringToBoolean, default=False, help='Check that each JSON file has the same structure as its XML file after conversion. Default is False.')
+    parser.add_argument('--stats', dest='stats', type=stringToBoolean, default=False, help='Print conversion timings and counters. Default is False.')
+    parser.add_argument('--statsFile', dest='statsFile', default='', help='File to write conversion timings and counters to in JSON format.')
+    parser.add_argument('--incremental', dest='incremental', type=stringToBoolean, default=False, help='Skip files whose input, options and output are unchanged since the last conversion. Default is False.')
+    parser.add_argument('--manifest', dest='manifest', default='', help='Manifest file used for incremental conversion. Default is "%s" in the output path or input folder.' % manifest.MANIFEST_FILENAME)
+    parser.add_argument('--jobs', dest='jobs', type=int, default=1, help='Number of worker processes to convert files with. 0 uses all CPUs. Default is 1.')
+    parser.add_argument('--chunkSize', dest='chunkSize', type=int, default=1, help='Number of files sent to a worker process at a time. Default is 1.')
+    parser.add_argument('--timeout', dest='timeout', type=float, default=0, help='Time limit in seconds for converting each file. A call into MaterialX, such as parsing an XML file, is not interrupted. Default is 0 for no limit.')
     parser.add_argument(dest="inputFileName", help="Filename of the input document or folder containing input documents")
 
-    opts = parser.parse_args()
+    opts = parser.parse_args(argv)
 
     # Get absolute path of opts.outputPath
-    if opts.outputPath:    
+    if opts.outputPath:
         opts.outputPath = os.path.abspath(opts.outputPath)
     outputPath = mx.FilePath(opts.outputPath)
     if outputPath.size() > 0:
         if os.path.isdir(outputPath.asString()):
             print('Output path "%s" does not exist.' % outputPath.asString())
-            exit(-1)
+            return 1
         else:
             print('- Write files to outputPath: '+ opts.outputPath)
 
-    # Get list of MaterialX files 
+    # Get list of MaterialX files
     fileList = []
     extension = 'mtlx'
-    if os.path.isdir(opts.inputFileName): 
-        extension = 'mtlx'   
-        fileList = core.Util.getFiles(opts.inputFileName, extension)
+    if os.path.isdir(opts.inputFileName):
+        extension = 'mtlx'
+        fileList = core.Util.getFiles(opts.inputFileName, extension, compressed=True)
     else:
-        extension = mx.FilePath(opts.inputFileName).getExtension()
+        extension = mx.FilePath(fileio.splitCompressionExtension(opts.inputFileName)[0]).getExtension()
         if extension == 'mtlx':
             fileList.append(opts.inputFileName)
 
     if not fileList:
         print('No files found with extension "%s"' % extension)
-        exit(-1)
-
-    ## Create I/O handler
-    mtlxjson = core.MaterialXJson()
-    
-    class Predicates:
-        '''
-        @brief Utility class to define predicates for skipping elements when iterating over elements in a document.
-        '''
-        def __init__(self):
-            self.predicates = []
-
-        def skip(self, elem: mx.Element):
-            '''            
-            @brief Utility to skip elements when iterating over elements in a document.
-            '''
-            for predicate in self.predicates:
-                if not predicate(elem):
-                    return False
-            return True
-
-    def skipLibraryElement(elem: mx.Element) -> bool:
-        '''
-        @brief Utility to skip library elements when iterating over elements in a document.
-        @return True if the element is not in a library, otherwise False.
-        '''
-        return not elem.hasSourceUri()
-    
-    def skipAssignments(elem: mx.Element) -> bool:
-        '''
-        @brief Utility to skip material assignment elements when iterating over elements in a document.
-        @return True if the element is not a material assignment, otherwise False.
-        '''
-        return elem.getCategory() not in ['materialassign', 'look', 'lookgroup']
-
-    def skipMaterials(elem: mx.Element) -> bool:
-        '''
-        @brief Utility to skip material elements when iterating over elements in a document.
-        @return True if the element is not a material element, otherwise False.
-        '''
-        if elem.getCategory() in ['surfacematerial'] or elem.getType() in ['surfaceshader', 'displacementshader', 'volumeshader']:
-            return False
-        return True
+        return 1
+
+    conversionManifest = None
+    if opts.incremental:
+        conversionManifest = manifest.ConversionManifest(opts.manifest or manifest.getManifestFileName(opts.inputFileName, opts.outputPath))
+        conversionManifest.load()
 
+    tasks = []
     for fileName in fileList:
+        baseName, compression = fileio.splitCompressionExtension(fileName)
+        jsonFileName = baseName.replace('.mtlx', '_mtlx.json') + fileio.getCompressionExtension(opts.compress or compression)
         if mx.FilePath(fileName).isAbsolute():
-            outputFilePath = mx.FilePath(fileName.replace('.mtlx', '_mtlx.json'))
-        else:            
-            outputFilePath = outputPath / mx.FilePath(fileName.replace('.mtlx', '_mtlx.json'))
+            outputFilePath = mx.FilePath(jsonFileName)
+        else:
+            outputFilePath = outputPath / mx.FilePath(jsonFileName)
         outputFileName = outputFilePath.asString()
-        writeOptions = core.JsonWriteOptions()
-        predicate = Predicates()        
-        if opts.skipAssignments:
-            predicate.predicates.append(skipAssignments)
-        if opts.skipMaterials:
-            predicate.predicates.append(skipMaterials)    
-        if opts.skipLibraryElements:
-            predicate.predicates.append(skipLibraryElement)
-        writeOptions.elementPredicate = predicate.skip
-        writeOptions.indent = opts.indent
-        if opts.compact:
-            writeOptions.separators = (',', ':')
-            writeOptions.indent = None
-        core.Util.xmlFileToJsonFile(fileName, outputFileName, writeOptions)
-        print('Convert XML "%s" -> JSON  "%s"' % (fileName, outputFileName))
-    
+        tasks.append((fileName, outputFileName, opts, conversionManifest.getEntry(fileName) if conversionManifest else None))
+
+    result = batch.runBatch(convertFile, tasks, opts.jobs, opts.chunkSize, opts.timeout)
+    if conversionManifest:
+        skippedCount = manifest.updateManifest(conversionManifest, result)
+        print('- Skipped %d unchanged files. Manifest: "%s"' % (skippedCount, conversionManifest.fileName))
+    print(result.summary())
+    if result.stats:
+        if opts.stats:
+            print(result.stats.summary())
+        if opts.statsFile:
+            with open(opts.statsFile, 'w') as outfile:
+                json.dump(result.stats.toDict(), outfile, indent=2)
+    return 1 if result.failures else 0
+
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
@@ -0,0 +1,129 @@
+# parallel.py
+
+'''
+@file
+This module contains reading of large JSON documents on multiple cores.
+
+The top level elements of the document are split into consecutive partitions which are
+built into separate documents by a pool of worker processes. Each worker returns its
+document as an XML string, as documents cannot be passed between processes. The partitions
+are then parsed into the target document in order, so the result is the same as reading
+the document on a single core.
+
+Pickling the partitions and parsing the XML strings is done by the main process and cannot
+be sped up by more workers. In benchmarks/bench_parallel.py this is about 60% of the time of
+reading the document on a single core, which bounds the speedup to below 2x on any number of
+cores. Documents are therefore only read in parallel on request, when there are at least 2 CPUs.
+
+Top level element names are checked for conflicts before any partition is built. Version
+upgrade is done once on the merged document.
+'''
+
+from __future__ import annotations
+
+import concurrent.futures
+import os
+
+from materialxjson import core
+from materialxjson.core import mx
+
+# Minimum number of top level elements in a partition, below which the cost of starting
+# workers and transferring partitions outweighs building in parallel
+MIN_PARTITION_SIZE = 64
+# Number of partitions per worker, so that workers which finish early can take more partitions
+PARTITIONS_PER_JOB = 4
+
+def getJobCount(jobs: int) -> int:
+    '''
+    @brief Get the number of worker processes to use, which is at most the number of CPUs
+    @param jobs The requested number of jobs, or 0 to use all CPUs
+    @return The number of worker processes
+    '''
+    cpuCount = os.cpu_count() or 1
+    return min(jobs, cpuCount) if jobs > 0 else cpuCount
+
+def _buildPartition(args: tuple) -> tuple:
+    '''
+    @brief Build a partition of top level elements into a document in a worker process
+    @param args Tuple of (JSON elements, read options)
+    @return Tuple of (XML string, ConversionStats or None)
+    '''
+    nodes, readOptions = args
+    doc = mx.createDocument()
+    core.MaterialXJson().elementFromJSON({ core.CHILDREN_STRING: nodes }, doc, readOptions)
+    # Parsing the partition into the target document would otherwise set its version
+    doc.removeAttribute('version')
+    return mx.writeToXmlString(doc), readOptions.stats
+
+def checkNames(nodes: list, doc: mx.Document) -> None:
+    '''
+    @brief Check that top level elements can be added to a document without name conflicts
+    @param nodes The JSON elements
+    @param doc The document to add to
+    @throws LookupError, as raised by MaterialX, if a name is not unique
+    '''
+    names = set()
+    for node in nodes:
+        name = node.get('name', '')
+        if name in names or doc.getChild(name):
+            raise LookupError('Child name is not unique: %s' % name)
+        names.add(name)
+
+def partitionNodes(nodes: list, jobs: int) -> list:
+    '''
+    @brief Split top level elements into consecutive partitions
+    @param nodes The JSON elements
+    @param jobs The number of worker processes
+    @return List of lists of JSON elements
+    '''
+    count = min(jobs * PARTITIONS_PER_JOB, max(1, len(nodes) // MIN_PARTITION_SIZE))
+    size, remainder = divmod(len(nodes), count)
+    partitions = []
+    start = 0
+    for index in range(count):
+        end = start + size + (1 if index < remainder else 0)
+        partitions.append(nodes[start:end])
+        start = end
+    return partitions
+
+def elementsFromJSON(nodes: list, doc: mx.Document, readOptions: core.JsonReadOptions = None, jobs: int = 0, executor = None) -> None:
+    '''
+    @brief Add top level elements to a document, building them on multiple cores
+    @param nodes The JSON elements, as in the children array of a JSON document
+    @param doc The document to add to
+    @param readOptions The read options to use. Version upgrade is not done. Default is None
+    @param jobs The number of worker processes, or 0 to use all CPUs. The elements are built on a single
+    core for fewer than 2 jobs, after limiting the jobs to the number of CPUs. Default is 0
+    @param executor A concurrent.futures executor to use instead of creating a process pool, in which case
+    the jobs are not limited to the number of CPUs. Default is None
+    @throws LookupError if an element name is not unique
+    '''
+    checkNames(nodes, doc)
+    jobs = getJobCount(jobs) if executor is None else max(jobs, 1)
+    if jobs < 2 or len(nodes) < 2 * MIN_PARTITION_SIZE:
+        core.MaterialXJson().elementFromJSON({ core.CHILDREN_STRING: nodes }, doc, readOptions)
+        return
+
+    # Workers only collect element counts, as the time is recorded for the whole read
+    stats = readOptions.stats if readOptions else None
+    tasks = []
+    for partition in partitionNodes(nodes, jobs):
+        workerOptions = core.JsonReadOptions()
+        workerOptions.typedValues = readOptions.typedValues if readOptions else True
+        workerOptions.stats = core.ConversionStats() if stats else None
+        tasks.append((partition, workerOptions))
+
+    xmlOptions = mx.XmlReadOptions()
+    xmlOptions.upgradeVersion = False
+    ownExecutor = executor is None
+    if ownExecutor:
+        executor = concurrent.futures.ProcessPoolExecutor(min(jobs, len(tasks)))
+    try:
+        # Parse partitions into the document in document order as they complete
+        for xmlString, partitionStats in executor.map(_buildPartition, tasks):
+            mx.readFromXmlString(doc, xmlString, mx.FileSearchPath(), xmlOptions)
+            if partitionStats:
+                stats.merge(partitionStats)
+    finally:
+        if ownExecutor:
+            executor.shutdown()
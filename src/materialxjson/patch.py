@@ -0,0 +1,205 @@
+# patch.py
+
+'''
+@file
+This module contains support for computing and applying patches between MaterialX documents.
+
+A patch lists the differences between two documents as operations addressed by element
+name paths, e.g. "NG_wood/image_color/file". The empty path addresses the document.
+Operations are applied in order:
+    - set: Set the attributes in "attributes" and remove the attributes in "remove"
+    - remove: Remove the element
+    - add: Add the element in "element", with its descendants, as a child of the element at "path"
+    - order: Reorder the children named in "children" to that order, within the positions they
+      occupy among the children of the element. The other children are not moved
+
+Patches are JSON compatible so they can be sent in place of the full JSON document.
+'''
+from __future__ import annotations
+
+from materialxjson import core, stringtable, values
+from materialxjson.core import mx
+
+# Mime type of a patch
+PATCH_MIMETYPE = 'application/mtlx+json-patch'
+# Key of the list of operations
+PATCH_OPERATIONS_KEY = 'operations'
+
+def _childPath(path: str, name: str) -> str:
+    '''
+    @brief Get the name path of a child element
+    '''
+    return path + core.NAME_PATH_SEPARATOR + name if path else name
+
+def _getChildren(node: dict) -> list:
+    '''
+    @brief Get the children of a JSON element as (name, category, node) tuples. Children are in
+    document order within each of the inputs, children and outputs arrays
+    '''
+    children = []
+    for key, category in core.CHILD_KEY_CATEGORIES.items():
+        for child in node.get(key, ()):
+            children.append((child['name'], child.get('category', category), child))
+    return children
+
+def _getChildNames(node: dict, key: str) -> list:
+    '''
+    @brief Get the names of the children of a JSON element in one child array, in document order
+    '''
+    return [child['name'] for child in node.get(key, ())]
+
+def _getAttributes(node: dict) -> dict:
+    '''
+    @brief Get the attributes of a JSON element
+    '''
+    return { key: value for key, value in node.items() if key not in core.NON_ATTRIBUTE_KEYS }
+
+def _getRoot(jsonDoc: dict) -> dict:
+    '''
+    @brief Get the MaterialX root of a JSON document, expanding the string table layout
+    '''
+    root = jsonDoc[core.MATERIALX_DOCUMENT_ROOT]
+    if stringtable.STRING_TABLE_KEY in jsonDoc:
+        root = stringtable.expandElement(root, jsonDoc[stringtable.STRING_TABLE_KEY])
+    return root
+
+def diffJson(oldJson: dict, newJson: dict) -> dict:
+    '''
+    @brief Compute the patch between two JSON documents
+    @param oldJson The JSON document to patch from
+    @param newJson The JSON document to patch to
+    @return The patch
+    '''
+    operations = []
+    stack = [('', _getRoot(oldJson), _getRoot(newJson))]
+    while stack:
+        path, oldNode, newNode = stack.pop()
+
+        # Attributes
+        oldAttributes = _getAttributes(oldNode)
+        newAttributes = _getAttributes(newNode)
+        changed = { key: value for key, value in newAttributes.items()
+                    if key not in oldAttributes or oldAttributes[key] != value }
+        removed = [key for key in oldAttributes if key not in newAttributes]
+        if changed or removed:
+            operation = { 'op': 'set', 'path': path }
+            if changed:
+                operation['attributes'] = changed
+            if removed:
+                operation['remove'] = removed
+            operations.append(operation)
+
+        # Children. A child whose category changed is removed and added again.
+        oldChildren = _getChildren(oldNode)
+        newChildren = _getChildren(newNode)
+        oldCategories = { name: category for name, category, _ in oldChildren }
+        newCategories = { name: category for name, category, _ in newChildren }
+        for name, category, _ in oldChildren:
+            if newCategories.get(name) != category:
+                operations.append({ 'op': 'remove', 'path': _childPath(path, name) })
+        for name, category, child in newChildren:
+            if oldCategories.get(name) != category:
+                operations.append({ 'op': 'add', 'path': path, 'category': category, 'element': child })
+
+        # Order. JSON only holds the relative order of the children in the same child array, so
+        # each array is ordered separately. Added children are appended to the element.
+        for key in core.CHILD_KEYS:
+            order = [name for name in _getChildNames(oldNode, key) if newCategories.get(name) == oldCategories[name]]
+            kept = frozenset(order)
+            newOrder = _getChildNames(newNode, key)
+            order.extend(name for name in newOrder if name not in kept)
+            if order != newOrder:
+                operations.append({ 'op': 'order', 'path': path, 'children': newOrder })
+
+        oldNodes = { name: child for name, _, child in oldChildren }
+        for name, category, child in reversed(newChildren):
+            if oldCategories.get(name) == category:
+                stack.append((_childPath(path, name), oldNodes[name], child))
+
+    return { core.JSON_MIMETYPE_KEY: PATCH_MIMETYPE, PATCH_OPERATIONS_KEY: operations }
+
+def diffDocuments(oldDoc: mx.Document, newDoc: mx.Document, writeOptions: core.JsonWriteOptions = None) -> dict:
+    '''
+    @brief Compute the patch between two MaterialX documents
+    @param oldDoc The document to patch from
+    @param newDoc The document to patch to
+    @param writeOptions The write options used to convert the documents to JSON. Default is None
+    @return The patch
+    '''
+    mtlxjson = core.MaterialXJson()
+    return diffJson(mtlxjson.documentToJSON(oldDoc, writeOptions), mtlxjson.documentToJSON(newDoc, writeOptions))
+
+def _valueString(value) -> str:
+    '''
+    @brief Get the attribute string for a string or native JSON value
+    '''
+    return value if isinstance(value, str) else values.jsonToValueString(value)
+
+def applyPatch(doc: mx.Document, patch: dict, readOptions: core.JsonReadOptions = None) -> bool:
+    '''
+    @brief Apply a patch to a MaterialX document in place
+    @param doc The document to patch
+    @param patch The patch returned by diffJson() or diffDocuments()
+    @param readOptions The read options used to create added elements. Default is None
+    @return True if all operations were applied. Operations are applied in order and
+    application stops at the first operation which fails
+    '''
+    if patch.get(core.JSON_MIMETYPE_KEY) != PATCH_MIMETYPE:
+        print('JSON document is not a MaterialX patch')
+        return False
+
+    mtlxjson = core.MaterialXJson()
+    for index, operation in enumerate(patch.get(PATCH_OPERATIONS_KEY, [])):
+        op = operation.get('op')
+        path = operation.get('path', '')
+        elem = doc.getDescendant(path) if path else doc
+        if not elem:
+            print('Patch operation %d: element "%s" not found' % (index, path))
+            return False
+
+        if op == 'set':
+            for key, value in operation.get('attributes', {}).items():
+                valueString = _valueString(value)
+                if valueString is None:
+                    print('Patch operation %d: invalid value for attribute "%s" of "%s"' % (index, key, path))
+                    return False
+                elem.setAttribute(key, valueString)
+            for key in operation.get('remove', []):
+                elem.removeAttribute(key)
+
+        elif op == 'remove':
+            if not path:
+                print('Patch operation %d: the document cannot be removed' % index)
+                return False
+            elem.getParent().removeChild(elem.getName())
+
+        elif op == 'add':
+            node = operation.get('element', {})
+            name = node.get('name', '')
+            category = operation.get('category') or node.get('category', '')
+            if not name or not category or elem.getChild(name):
+                print('Patch operation %d: cannot add element "%s" to "%s"' % (index, name, path))
+                return False
+            child = elem.addChildOfCategory(category, name)
+            mtlxjson.elementFromJSON(node, child, readOptions)
+
+        elif op == 'order':
+            names = operation.get('children', [])
+            if len(set(names)) != len(names) or any(not elem.getChild(name) for name in names):
+                print('Patch operation %d: cannot reorder children of "%s"' % (index, path))
+                return False
+            # Fill the positions of the named children in the given order, then move each child
+            # to its position in turn
+            childNames = [child.getName() for child in elem.getChildren()]
+            positions = sorted(childNames.index(name) for name in names)
+            for position, name in zip(positions, names):
+                childNames[position] = name
+            for childIndex, name in enumerate(childNames):
+                if elem.getChildIndex(name) != childIndex:
+                    elem.setChildIndex(name, childIndex)
+
+        else:
+            print('Patch operation %d: unknown operation "%s"' % (index, op))
+            return False
+
+    return True
@@ -0,0 +1,564 @@
+#!/usr/bin/env python
+'''
+@file
+This module contains a local conversion server which keeps MaterialX and its libraries loaded.
+
+Each run of the conversion commands pays for interpreter startup, importing MaterialX and,
+when validating, loading the standard libraries. The server pays for these once, so that
+converting a small document takes milliseconds. It listens on localhost HTTP or a Unix socket
+and handles the following requests:
+    - POST /m2j: Convert the MaterialX XML document in the request body to JSON
+    - POST /j2m: Convert the JSON document in the request body to MaterialX XML
+    - GET /status: Get the server versions, options and request counters as JSON
+    - POST /shutdown: Stop the server
+
+Conversion options are passed as query parameters, e.g. /m2j?typedValues=true, and default
+to the options the server was started with. If the server was started with a file root folder,
+the document is read from a file within it with the input query parameter instead of the request
+body, and with the output parameter the result is written to a file within it instead of the
+response. Conversions use MaterialXJson with the read and write options, so the results are the
+same as for the conversion commands. JSON documents are checked by the validation module first,
+and malformed documents are rejected with their errors.
+
+The server has no authentication, so it only listens on loopback addresses or a Unix socket.
+As web pages can send requests to local addresses, requests must have the X-MaterialXJson: 1 header,
+which web pages cannot add to cross-site requests, and requests with an Origin header are rejected.
+Over TCP, the Host header must be a local address, so that other sites cannot reach the server by
+DNS rebinding. Any local program can still send requests, which is why files can only be read and
+written within the file root.
+'''
+
+import argparse
+import copy
+import http.server
+import ipaddress
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+import urllib.parse
+
+import materialxjson
+from materialxjson import core, fileio, jsoncodec, validation
+from materialxjson.client import DEFAULT_HOST, DEFAULT_PORT, REQUEST_HEADER
+from materialxjson.core import mx
+
+# Content type of XML responses
+XML_CONTENT_TYPE = 'application/xml'
+# Host names accepted in the Host header of TCP requests, in addition to the host the server listens on
+LOCAL_HOSTS = ('localhost', '127.0.0.1', '::1')
+
+class ConversionError(Exception):
+    '''
+    Exception raised when a conversion request cannot be completed.
+
+    Members:
+        - status: The HTTP status code to respond with
+    '''
+    def __init__(self, message: str, status: int = 400):
+        '''
+        @brief Constructor
+        @param message The error message
+        @param status The HTTP status code. Default is 400
+        '''
+        super().__init__(message)
+        self.status = status
+
+class ServerOptions:
+    '''
+    Class for holding the options of a conversion server.
+
+    Options:
+        - host: The host to listen on. Default is DEFAULT_HOST
+        - port: The port to listen on, or 0 to choose a free port. Default is DEFAULT_PORT
+        - socketPath: Unix socket to listen on instead of the host and port. Default is ''
+        - writeOptions: The default JsonWriteOptions for conversion to JSON. Default is indented by 2
+        - readOptions: The default JsonReadOptions for conversion from JSON
+        - validate: Validate documents against the libraries by default. Default is False
+        - loadLibraries: Load the libraries on startup instead of on the first validation. Default is True
+        - searchPath: The search path of the libraries. Default is None for the MaterialX data search path
+        - libraryFolders: The library folders. Default is None for the MaterialX data library folders
+        - fileRoot: Folder within which files may be read and written with the input and output query parameters.
+          Default is '' to reject requests with file paths
+        - verbose: Log each request. Default is False
+    '''
+    def __init__(self):
+        '''
+        @brief Constructor
+        '''
+        self.host = DEFAULT_HOST
+        self.port = DEFAULT_PORT
+        self.socketPath = ''
+        self.writeOptions = core.JsonWriteOptions()
+        self.writeOptions.indent = 2
+        self.readOptions = core.JsonReadOptions()
+        self.validate = False
+        self.loadLibraries = True
+        self.searchPath: mx.FileSearchPath = None
+        self.libraryFolders: list = None
+        self.fileRoot = ''
+        self.verbose = False
+
+class ConversionService:
+    '''
+    Class which handles conversion requests independently of the transport.
+    Requests may be handled concurrently.
+    '''
+    def __init__(self, options: ServerOptions = None):
+        '''
+        @brief Constructor. MaterialX is loaded, along with the libraries if options.loadLibraries is set.
+        @param options The server options. Default is None
+        '''
+        self.options = options or ServerOptions()
+        self.startTime = time.time()
+        self.requestCounts = {}
+        self._lock = threading.Lock()
+        self.libraryStatus = ''
+        self._libraries = None
+        mx.getVersionString()
+        if self.options.loadLibraries:
+            self.getLibraries()
+
+    def getLibraries(self) -> mx.Document:
+        '''
+        @brief Get the library document, loading it on first use
+        @return The shared library document, which must not be modified
+        '''
+        with self._lock:
+            if self._libraries is None:
+                searchPath = self.options.searchPath or mx.getDefaultDataSearchPath()
+                libraryFolders = self.options.libraryFolders or mx.getDefaultDataLibraryFolders()
+                self._libraries, self.libraryStatus = core.Util.loadLibraries(searchPath, libraryFolders, useCache=True)
+            return self._libraries
+
+    @staticmethod
+    def _getBoolean(params: dict, name: str, default: bool) -> bool:
+        '''
+        @brief Get a boolean query parameter
+        '''
+        value = params.get(name)
+        if value is None:
+            return default
+        if value.lower() not in ('true', 'false', '1', '0'):
+            raise ConversionError('Invalid value "%s" for %s' % (value, name))
+        return value.lower() in ('true', '1')
+
+    def getWriteOptions(self, params: dict) -> core.JsonWriteOptions:
+        '''
+        @brief Get the write options for a request
+        @param params Dictionary of query parameters
+        @return The server write options with the options of the request applied
+        '''
+        defaults = self.options.writeOptions
+        writeOptions = copy.copy(defaults)
+        if 'compact' in params:
+            if self._getBoolean(params, 'compact', False):
+                writeOptions.separators = (',', ':')
+                writeOptions.indent = None
+            else:
+                writeOptions.separators = (',', ': ')
+                writeOptions.indent = 2 if defaults.indent is None else defaults.indent
+        if 'indent' in params:
+            try:
+                writeOptions.indent = int(params['indent'])
+            except ValueError:
+                raise ConversionError('Invalid value "%s" for indent' % params['indent'])
+        writeOptions.typedValues = self._getBoolean(params, 'typedValues', defaults.typedValues)
+        writeOptions.stringTable = self._getBoolean(params, 'stringTable', defaults.stringTable)
+        if 'skipLibraryElements' in params:
+            elementFilter = copy.copy(defaults.elementFilter) if defaults.elementFilter else core.ElementFilter()
+            elementFilter.libraryElements = 'local' if self._getBoolean(params, 'skipLibraryElements', True) else 'all'
+            writeOptions.elementFilter = elementFilter
+        writeOptions.stats = None
+        return writeOptions
+
+    def getReadOptions(self, params: dict) -> core.JsonReadOptions:
+        '''
+        @brief Get the read options for a request
+        @param params Dictionary of query parameters
+        @return The server read options with the options of the request applied
+        '''
+        defaults = self.options.readOptions
+        readOptions = copy.copy(defaults)
+        readOptions.upgradeVersion = self._getBoolean(params, 'upgradeVersion', defaults.upgradeVersion)
+        readOptions.streamInput = False
+        readOptions.stats = None
+        return readOptions
+
+    def _validate(self, doc: mx.Document, params: dict) -> None:
+        '''
+        @brief Validate a document against the libraries if requested
+        @throws ConversionError if the document is invalid
+        '''
+        if not self._getBoolean(params, 'validate', self.options.validate):
+            return
+        doc.setDataLibrary(self.getLibraries())
+        valid, message = doc.validate()
+        if not valid:
+            raise ConversionError('Document is not valid: %s' % message, 422)
+
+    def getFilePath(self, path: str) -> str:
+        '''
+        @brief Get the path of a file given in a request, which must be within the file root
+        @param path The file path, relative to the file root or absolute
+        @return The absolute file path with symbolic links resolved
+        @throws ConversionError if file paths are not allowed or the file is not within the file root
+        '''
+        if not self.options.fileRoot:
+            raise ConversionError('File paths are not allowed. Start the server with a file root to allow them', 403)
+        root = os.path.realpath(self.options.fileRoot)
+        filePath = os.path.realpath(os.path.join(root, path))
+        if os.path.commonpath((root, filePath)) != root:
+            raise ConversionError('File "%s" is not within the file root' % path, 403)
+        return filePath
+
+    def _getFiles(self, params: dict) -> tuple:
+        '''
+        @brief Get the input and output files of a request
+        @return Tuple of the input and output file paths, each None if not given
+        @throws ConversionError if a file is not allowed
+        '''
+        return tuple(self.getFilePath(params[name]) if params.get(name) else None for name in ('input', 'output'))
+
+    @staticmethod
+    def _writeOutput(outputFile: str, data: str, compression: str = None) -> tuple:
+        '''
+        @brief Write a result to the output file if requested
+        @return Tuple of (content type, response data) for the output file, or None if there is no output file
+        '''
+        if not outputFile:
+            return None
+        with fileio.openOutputStream(outputFile, compression) as outfile:
+            outfile.write(data)
+        return 'application/json', json.dumps({ 'output': outputFile }).encode('utf-8')
+
+    def xmlToJson(self, params: dict, body: bytes) -> tuple:
+        '''
+        @brief Convert a MaterialX XML document to JSON
+        @param params Dictionary of query parameters
+        @param body The XML document, if the input parameter is not set
+        @return Tuple of (content type, response data)
+        '''
+        writeOptions = self.getWriteOptions(params)
+        inputFile, outputFile = self._getFiles(params)
+        doc = mx.createDocument()
+        try:
+            if inputFile:
+                core.Util.xmlFileToDocument(doc, inputFile)
+            else:
+                core.Util.xmlStringToDocument(doc, body.decode('utf-8'))
+        except Exception as err:
+            # MaterialX parse errors do not derive from mx.Exception
+            raise ConversionError('Failed to read XML: %s' % err)
+        self._validate(doc, params)
+
+        jsonString = core.MaterialXJson().documentToJSONString(doc, writeOptions)
+        result = self._writeOutput(outputFile, jsonString, writeOptions.compression)
+        return result or (core.JSON_MIMETYPE, jsonString.encode('utf-8'))
+
+    def jsonToXml(self, params: dict, body: bytes) -> tuple:
+        '''
+        @brief Convert a JSON document to MaterialX XML
+        @param params Dictionary of query parameters
+        @param body The JSON document, if the input parameter is not set
+        @return Tuple of (content type, response data)
+        '''
+        readOptions = self.getReadOptions(params)
+        inputFile, outputFile = self._getFiles(params)
+        try:
+            if inputFile:
+                jsonDoc = core.Util.readJson(inputFile, None, readOptions.codec, readOptions.compression)
+            else:
+                jsonDoc = jsoncodec.getCodec(readOptions.codec).decode(body)
+        except Exception as err:
+            raise ConversionError('Failed to read JSON: %s' % err)
+
+        # Reject malformed documents before creating any elements
+        errors = validation.validateJson(jsonDoc, readOptions)
+        if errors:
+            raise ConversionError(str(validation.JsonValidationError(errors)))
+        doc = mx.createDocument()
+        try:
+            core.MaterialXJson().documentFromJSON(jsonDoc, doc, readOptions)
+        except Exception as err:
+            raise ConversionError('Failed to read JSON: %s' % err)
+        self._validate(doc, params)
+
+        xmlString = core.Util.documentToXMLString(doc)
+        result = self._writeOutput(outputFile, xmlString)
+        return result or (XML_CONTENT_TYPE, xmlString.encode('utf-8'))
+
+    def status(self) -> tuple:
+        '''
+        @brief Get the server status
+        @return Tuple of (content type, response data)
+        '''
+        with self._lock:
+            requestCounts = dict(self.requestCounts)
+        writeOptions = self.options.writeOptions
+        status = {
+            'version': materialxjson.__version__,
+            'materialx': mx.getVersionString(),
+            'uptime': time.time() - self.startTime,
+            'requests': requestCounts,
+            'libraries': self.libraryStatus,
+            'options': {
+                'indent': writeOptions.indent,
+                'typedValues': writeOptions.typedValues,
+                'stringTable': writeOptions.stringTable,
+                'upgradeVersion': self.options.readOptions.upgradeVersion,
+                'validate': self.options.validate,
+            },
+        }
+        return 'application/json', json.dumps(status, indent=2).encode('utf-8')
+
+    def handle(self, method: str, path: str, params: dict, body: bytes) -> tuple:
+        '''
+        @brief Handle a request
+        @param method The HTTP method
+        @param path The request path
+        @param params Dictionary of query parameters
+        @param body The request body
+        @return Tuple of (content type, response data)
+        @throws ConversionError if the request fails
+        '''
+        handlers = {
+            ('POST', '/m2j'): self.xmlToJson,
+            ('POST', '/j2m'): self.jsonToXml,
+            ('GET', '/status'): lambda params, body: self.status(),
+        }
+        handler = handlers.get((method, path))
+        if not handler:
+            raise ConversionError('Unknown request %s %s' % (method, path), 404)
+        with self._lock:
+            self.requestCounts[path] = self.requestCounts.get(path, 0) + 1
+        return handler(params, body)
+
+class ConversionRequestHandler(http.server.BaseHTTPRequestHandler):
+    '''
+    HTTP request handler passing requests to the ConversionService of the server.
+    Connections are kept alive between requests.
+    '''
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        # Send responses without waiting for acknowledgements of previous writes. This only applies to TCP
+        self.disable_nagle_algorithm = isinstance(self.client_address, tuple)
+        super().setup()
+
+    def _respond(self, status: int, contentType: str, data: bytes, close: bool = False) -> None:
+        '''
+        @brief Send a response
+        @param close Close the connection after the response. Default is False
+        '''
+        self.send_response(status)
+        self.send_header('Content-Type', contentType)
+        self.send_header('Content-Length', str(len(data)))
+        if close:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _checkRequest(self) -> str:
+        '''
+        @brief Check that a request does not come from a web page
+        @return The reason to reject the request, or an empty string if the request is allowed
+        '''
+        if self.headers.get('Origin') is not None:
+            return 'Requests from web pages are not allowed'
+        if self.headers.get(REQUEST_HEADER) != '1':
+            return 'Requests must have the header "%s: 1"' % REQUEST_HEADER
+        # Unix socket clients have no host
+        if isinstance(self.client_address, tuple):
+            try:
+                host = urllib.parse.urlsplit('//' + self.headers.get('Host', '')).hostname
+            except ValueError:
+                host = None
+            if host not in LOCAL_HOSTS and host != self.server.service.options.host:
+                return 'Requests must be sent to a local host'
+        return ''
+
+    def _handle(self, method: str) -> None:
+        '''
+        @brief Handle a request with the conversion service
+        '''
+        reason = self._checkRequest()
+        if reason:
+            # The body is not read, so the connection cannot be used for further requests
+            self._respond(403, 'text/plain; charset=utf-8', reason.encode('utf-8'), close=True)
+            return
+
+        url = urllib.parse.urlsplit(self.path)
+        params = dict(urllib.parse.parse_qsl(url.query))
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+        if method == 'POST' and url.path == '/shutdown':
+            self._respond(200, 'application/json', b'{}')
+            self.close_connection = True
+            threading.Thread(target=self.server.shutdown).start()
+            return
+        try:
+            contentType, data = self.server.service.handle(method, url.path, params, body)
+            self._respond(200, contentType, data)
+        except ConversionError as err:
+            self._respond(err.status, 'text/plain; charset=utf-8', str(err).encode('utf-8'))
+        except Exception as err:
+            self._respond(500, 'text/plain; charset=utf-8', ('%s: %s' % (type(err).__name__, err)).encode('utf-8'))
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def address_string(self) -> str:
+        # Unix socket clients have no address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else 'local'
+
+    def log_message(self, format, *args):
+        if self.server.service.options.verbose:
+            super().log_message(format, *args)
+
+class ConversionServer(http.server.ThreadingHTTPServer):
+    '''
+    Conversion server listening on TCP.
+    '''
+    daemon_threads = True
+
+    def __init__(self, service: ConversionService):
+        '''
+        @brief Constructor
+        @param service The conversion service to handle requests with
+        '''
+        self.service = service
+        super().__init__((service.options.host, service.options.port), ConversionRequestHandler)
+
+    def getAddress(self) -> str:
+        '''
+        @brief Get the address the server listens on
+        '''
+        return 'http://%s:%d' % self.server_address[:2]
+
+if hasattr(socketserver, 'UnixStreamServer'):
+    class UnixConversionServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        '''
+        Conversion server listening on a Unix socket. The socket is removed when the server is closed.
+        '''
+        daemon_threads = True
+
+        def __init__(self, service: ConversionService):
+            '''
+            @brief Constructor
+            @param service The conversion service to handle requests with
+            '''
+            self.service = service
+            # Replace the socket of a server which was not closed
+            if os.path.exists(service.options.socketPath):
+                os.remove(service.options.socketPath)
+            super().__init__(service.options.socketPath, ConversionRequestHandler)
+
+        def server_close(self):
+            super().server_close()
+            if os.path.exists(self.server_address):
+                os.remove(self.server_address)
+
+        def getAddress(self) -> str:
+            '''
+            @brief Get the address the server listens on
+            '''
+            return self.server_address
+
+def isLoopbackHost(host: str) -> bool:
+    '''
+    @brief Check if a host is a loopback address, which other machines cannot connect to
+    @param host A host name or IP address
+    '''
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+def createServer(options: ServerOptions = None):
+    '''
+    @brief Create a conversion server. Call serve_forever() on the server to handle requests.
+    @param options The server options. Default is None
+    @return A ConversionServer, or a UnixConversionServer if options.socketPath is set
+    @throws ValueError if the host is not a loopback address, or Unix sockets are not supported
+    '''
+    options = options or ServerOptions()
+    if not options.socketPath and not isLoopbackHost(options.host):
+        raise ValueError('The server has no authentication and only listens on loopback addresses, not "%s"' % options.host)
+    service = ConversionService(options)
+    if service.options.socketPath:
+        if not hasattr(socketserver, 'UnixStreamServer'):
+            raise ValueError('Unix sockets are not supported on this platform')
+        return UnixConversionServer(service)
+    return ConversionServer(service)
+
+def stringToBoolean(value: str) -> bool:
+    '''
+    @brief Convert a command line string to a boolean. MaterialX is only loaded once an option is parsed.
+    '''
+    return mx.stringToBoolean(value)
+
+def main(argv: list = None, prog: str = None) -> int:
+    '''
+    Command to run a conversion server
+    '''
+    parser = argparse.ArgumentParser(prog=prog, description='Server which converts MaterialX documents between XML and JSON representations')
+    parser.add_argument('--host', dest='host', default=DEFAULT_HOST, help='Loopback address to listen on. Default is %s.' % DEFAULT_HOST)
+    parser.add_argument('--port', dest='port', type=int, default=DEFAULT_PORT, help='Port to listen on. Default is %d.' % DEFAULT_PORT)
+    parser.add_argument('--socket', dest='socket', default='', help='Unix socket to listen on instead of the host and port.')
+    parser.add_argument('--indent', dest='indent', type=int, default=2, help='Default indentation for nested elements. Default is 2.')
+    parser.add_argument('--compact', dest='compact', type=stringToBoolean, default=False, help='Write in compact format by default. Default is False.')
+    parser.add_argument('--typedValues', dest='typedValues', type=stringToBoolean, default=False, help='Write values as JSON numbers, booleans and arrays by default. Default is False.')
+    parser.add_argument('--stringTable', dest='stringTable', type=stringToBoolean, default=False, help='Write keys and repeated strings once in a string table by default. Default is False.')
+    parser.add_argument('--skipLibraryElements', dest='skipLibraryElements', type=stringToBoolean, default=True, help='Skip any library elements by default. Default is True.')
+    parser.add_argument('--upgradeVersion', dest='upgradeVersion', type=stringToBoolean, default=True, help='Upgrade document version by default. Default is True.')
+    parser.add_argument('--validate', dest='validate', type=stringToBoolean, default=False, help='Validate documents against the libraries by default. Default is False.')
+    parser.add_argument('--loadLibraries', dest='loadLibraries', type=stringToBoolean, default=True, help='Load the libraries on startup. Default is True.')
+    parser.add_argument('--fileRoot', dest='fileRoot', default='', help='Folder within which requests may read and write files. Default is to not allow file paths in requests.')
+    parser.add_argument('--verbose', dest='verbose', type=stringToBoolean, default=False, help='Log each request. Default is False.')
+
+    opts = parser.parse_args(argv)
+    options = ServerOptions()
+    options.host = opts.host
+    options.port = opts.port
+    options.socketPath = opts.socket
+    options.writeOptions.indent = opts.indent
+    if opts.compact:
+        options.writeOptions.separators = (',', ':')
+        options.writeOptions.indent = None
+    options.writeOptions.typedValues = opts.typedValues
+    options.writeOptions.stringTable = opts.stringTable
+    options.writeOptions.elementFilter = core.ElementFilter()
+    options.writeOptions.elementFilter.libraryElements = 'local' if opts.skipLibraryElements else 'all'
+    options.readOptions.upgradeVersion = opts.upgradeVersion
+    options.validate = opts.validate
+    options.loadLibraries = opts.loadLibraries
+    options.fileRoot = opts.fileRoot
+    options.verbose = opts.verbose
+
+    try:
+        server = createServer(options)
+    except (ValueError, OSError) as err:
+        print('Failed to start server: %s' % err)
+        return 1
+    if server.service.libraryStatus:
+        print(server.service.libraryStatus)
+    print('- Listening on %s' % server.getAddress())
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
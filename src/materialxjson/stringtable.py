@@ -0,0 +1,160 @@
+# stringtable.py
+
+'''
+@file
+This module contains support for the compact string table layout of the JSON representation.
+
+In the compact layout, keys and repeated string values are stored once in a document level
+array of strings, ordered by frequency, and elements refer to them by index:
+    - Keys are replaced by the decimal string of their index in the table
+    - Repeated string values are replaced by their integer index in the table
+    - Strings which occur once are kept inline
+    - Native numeric values written in typed value mode are wrapped in a one item array
+      so that they cannot be mistaken for table indices. Arrays with one item are also
+      wrapped, so that every one item array is unwrapped when expanding
+
+The mimetype and the root keys of the document are not changed, and the table is
+stored under the 'strings' key ahead of the MaterialX root.
+'''
+
+import collections
+
+from materialxjson import core
+
+# Key of the string table in the JSON document
+STRING_TABLE_KEY = 'strings'
+
+def _countStrings(root: dict, counts: collections.Counter) -> set:
+    '''
+    @brief Count the keys and string values of an element hierarchy
+    @param root The root JSON element
+    @param counts The counter to update
+    @return The set of keys
+    '''
+    keys = set()
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        for key, value in node.items():
+            counts[key] += 1
+            keys.add(key)
+            if type(value) is str:
+                counts[value] += 1
+            elif key in core.CHILD_KEYS and type(value) is list:
+                stack.extend(value)
+    return keys
+
+def createStringTable(root: dict) -> list:
+    '''
+    @brief Create the string table for an element hierarchy
+    @param root The root JSON element
+    @return The list of strings, ordered by decreasing frequency. All keys and
+    every string value which occurs more than once are included
+    '''
+    counts = collections.Counter()
+    keys = _countStrings(root, counts)
+    return [string for string, count in counts.most_common() if count > 1 or string in keys]
+
+def _compactElement(node: dict, keyRefs: dict, valueRefs: dict) -> dict:
+    '''
+    @brief Convert a JSON element and its children to the compact layout
+    '''
+    result = {}
+    for key, value in node.items():
+        valueType = type(value)
+        if valueType is str:
+            value = valueRefs.get(value, value)
+        elif key in core.CHILD_KEYS and valueType is list:
+            value = [_compactElement(child, keyRefs, valueRefs) for child in value]
+        elif valueType is int or valueType is float or (valueType is list and len(value) == 1):
+            value = [value]
+        result[keyRefs[key]] = value
+    return result
+
+def _expandElement(node: dict, keys: dict, strings: list) -> dict:
+    '''
+    @brief Convert a JSON element and its children from the compact layout
+    '''
+    result = {}
+    for keyRef, value in node.items():
+        key = keys[keyRef]
+        valueType = type(value)
+        if valueType is int:
+            if value < 0:
+                raise IndexError('negative index %d' % value)
+            value = strings[value]
+        elif valueType is list:
+            if key in core.CHILD_KEYS:
+                value = [_expandElement(child, keys, strings) for child in value]
+            elif len(value) == 1:
+                value = value[0]
+        result[key] = value
+    return result
+
+def compactJson(jsonDoc: dict, rootKey: str = core.MATERIALX_DOCUMENT_ROOT) -> dict:
+    '''
+    @brief Convert a JSON document to the compact string table layout
+    @param jsonDoc The JSON document to convert
+    @param rootKey The key of the MaterialX root element. Default is 'materialx'
+    @return The compact JSON document
+    '''
+    root = jsonDoc[rootKey]
+    strings = createStringTable(root)
+    refs = { string: index for index, string in enumerate(strings) }
+    keyRefs = { string: str(index) for string, index in refs.items() }
+
+    result = {}
+    for key, value in jsonDoc.items():
+        if key == rootKey:
+            result[STRING_TABLE_KEY] = strings
+            value = _compactElement(root, keyRefs, refs)
+        result[key] = value
+    return result
+
+def expandJson(jsonDoc: dict, rootKey: str = core.MATERIALX_DOCUMENT_ROOT) -> dict:
+    '''
+    @brief Convert a JSON document from the compact string table layout.
+    Documents without a string table are returned unchanged.
+    @param jsonDoc The JSON document to convert
+    @param rootKey The key of the MaterialX root element. Default is 'materialx'
+    @return The expanded JSON document
+    @throws ValueError if the string table or a reference to it is invalid
+    '''
+    strings = jsonDoc.get(STRING_TABLE_KEY)
+    if strings is None:
+        return jsonDoc
+    result = {}
+    for key, value in jsonDoc.items():
+        if key == STRING_TABLE_KEY:
+            continue
+        if key == rootKey:
+            value = expandElement(value, strings)
+        result[key] = value
+    return result
+
+def createKeyMap(strings: list) -> dict:
+    '''
+    @brief Create the map from key references to keys for a string table
+    @param strings The string table
+    @return Dictionary of keys indexed by their reference
+    @throws ValueError if the string table is not an array of strings
+    '''
+    if not isinstance(strings, list) or set(map(type, strings)) - { str }:
+        raise ValueError('String table is not an array of strings')
+    return { str(index): string for index, string in enumerate(strings) }
+
+def expandElement(node: dict, strings: list, keys: dict = None) -> dict:
+    '''
+    @brief Convert a JSON element and its children from the compact string table layout
+    @param node The compact JSON element
+    @param strings The string table
+    @param keys The key map returned by createKeyMap(). Default is None to create it
+    @return The expanded JSON element
+    @throws ValueError if the string table or a reference to it is invalid
+    '''
+    if keys is None:
+        keys = createKeyMap(strings)
+    try:
+        return _expandElement(node, keys, strings)
+    except (IndexError, KeyError, TypeError, AttributeError) as err:
+        raise ValueError('Invalid string table reference: %s' % err)
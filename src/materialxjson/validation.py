@@ -0,0 +1,195 @@
+# validation.py
+
+'''
+@file
+This module contains structural validation of JSON documents before they are converted to MaterialX.
+
+MaterialXJson.documentFromJSON() only checks the mimetype and the MaterialX root, so a malformed
+element is only found partway through building the document, or is silently skipped. The
+validator checks the structure read by MaterialXJson.elementFromJSON() in a single iterative
+pass over the decoded JSON, without creating any MaterialX elements:
+    - Elements are objects and child arrays are arrays of elements
+    - Each element has a valid, non-empty name which is unique among its siblings
+    - Each element in a children array has a category
+    - Attribute values are strings, or native JSON values when typed values are read
+    - References into the string table of the compact layout are valid
+
+All errors are collected, each with the JSON path of the value in the document as given,
+e.g. "$.materialx.children[3].name". The compact layout is validated without expanding it,
+so paths use its key references.
+'''
+
+import json
+import re
+
+from materialxjson import core, stringtable
+
+# Number of errors after which validation stops by default
+MAX_ERRORS = 100
+
+# Names as accepted by mx.isValidName(), which must also not be empty
+_VALID_NAME = re.compile(r'[A-Za-z0-9_:]+\Z')
+_PATH_KEY = re.compile(r'[A-Za-z_][A-Za-z0-9_]*\Z')
+_NUMBER_TYPES = frozenset((int, float, bool))
+
+class JsonValidationError(Exception):
+    '''
+    Error raised when a JSON document does not have the structure of a MaterialX document.
+
+    Members:
+        - errors: List of error messages, each starting with a JSON path
+    '''
+    # Number of errors included in the error message
+    MESSAGE_ERRORS = 5
+
+    def __init__(self, errors: list):
+        '''
+        @brief Constructor
+        @param errors List of error messages
+        '''
+        self.errors = errors
+        shown = errors[:self.MESSAGE_ERRORS]
+        if len(errors) > len(shown):
+            shown = shown + ['...']
+        super().__init__('Invalid MaterialX JSON document. %d errors: %s' % (len(errors), '; '.join(shown)))
+
+def _formatPath(path) -> str:
+    '''
+    @brief Get the JSON path string for a path of nested (parent, key or index) pairs
+    '''
+    tokens = []
+    while path:
+        path, token = path
+        if isinstance(token, int):
+            tokens.append('[%d]' % token)
+        elif _PATH_KEY.match(token):
+            tokens.append('.' + token)
+        else:
+            tokens.append('[%s]' % json.dumps(token))
+    return '$' + ''.join(reversed(tokens))
+
+def _isValueArray(value: list) -> bool:
+    '''
+    @brief Check that an array can be converted to a value string by values.jsonToValueString()
+    '''
+    itemTypes = set(map(type, value))
+    if list in itemTypes:
+        # Rows of matrices are flattened once
+        itemTypes = set(type(part) for item in value for part in (item if type(item) is list else (item,)))
+    return itemTypes <= _NUMBER_TYPES or itemTypes == { str }
+
+def validateJson(jsonDoc, readOptions: core.JsonReadOptions = None, mimetype: str = core.JSON_MIMETYPE,
+                 maxErrors: int = MAX_ERRORS) -> list:
+    '''
+    @brief Check that a decoded JSON document has the structure expected by MaterialXJson.documentFromJSON()
+    @param jsonDoc The decoded JSON document
+    @param readOptions The read options the document will be read with. Native attribute values
+    are only accepted if typedValues is set. Default is None
+    @param mimetype The expected mimetype of the document. Default is core.JSON_MIMETYPE
+    @param maxErrors The number of errors after which to stop. Default is MAX_ERRORS
+    @return List of error messages, each starting with the JSON path of the invalid value.
+    The list is empty if the document is valid
+    '''
+    errors = []
+    if not isinstance(jsonDoc, dict):
+        return ['$: Document is not a JSON object']
+    if jsonDoc.get(core.JSON_MIMETYPE_KEY) != mimetype:
+        errors.append('%s: Mimetype is not "%s"' % (_formatPath((None, core.JSON_MIMETYPE_KEY)), mimetype))
+    root = jsonDoc.get(core.MATERIALX_DOCUMENT_ROOT)
+    rootPath = (None, core.MATERIALX_DOCUMENT_ROOT)
+    if not isinstance(root, dict):
+        errors.append('%s: %s' % (_formatPath(rootPath), 'Missing MaterialX root element' if root is None else 'MaterialX root is not a JSON object'))
+        return errors
+
+    # Keys and strings of the compact layout
+    keys = None
+    strings = jsonDoc.get(stringtable.STRING_TABLE_KEY)
+    if strings is not None:
+        try:
+            keys = stringtable.createKeyMap(strings)
+        except ValueError as err:
+            errors.append('%s: %s' % (_formatPath((None, stringtable.STRING_TABLE_KEY)), err))
+            return errors
+    stringCount = len(strings) if keys else 0
+    typedValues = readOptions is None or readOptions.typedValues
+
+    # Elements still to check, as (element, path, category implied by its array, names of its siblings)
+    stack = [(root, rootPath, '', None)]
+    while stack and len(errors) < maxErrors:
+        node, path, category, siblingNames = stack.pop()
+        if not isinstance(node, dict):
+            errors.append('%s: Element is not a JSON object' % _formatPath(path))
+            continue
+
+        hasName = siblingNames is None
+        childArrays = []
+        for keyRef, value in node.items():
+            # Paths are only built for errors
+            if keys is not None:
+                key = keys.get(keyRef)
+                if key is None:
+                    errors.append('%s: Invalid string table key reference' % _formatPath((path, keyRef)))
+                    continue
+                if type(value) is int:
+                    if not 0 <= value < stringCount:
+                        errors.append('%s: Invalid string table reference %d' % (_formatPath((path, keyRef)), value))
+                        continue
+                    value = strings[value]
+            else:
+                key = keyRef
+
+            if key not in core.NON_ATTRIBUTE_KEYS:
+                if type(value) is str:
+                    continue
+                if not typedValues:
+                    errors.append('%s: Attribute "%s" is not a string' % (_formatPath((path, keyRef)), key))
+                elif not (type(value) in _NUMBER_TYPES or (type(value) is list and _isValueArray(value))):
+                    errors.append('%s: Attribute "%s" is not a value string, number, boolean or array of values'
+                                  % (_formatPath((path, keyRef)), key))
+            elif key == 'name':
+                if siblingNames is None:
+                    continue
+                hasName = True
+                if type(value) is not str or not _VALID_NAME.match(value):
+                    errors.append('%s: Invalid element name %s' % (_formatPath((path, keyRef)), json.dumps(value)))
+                elif value in siblingNames:
+                    errors.append('%s: Name "%s" is not unique among its siblings' % (_formatPath((path, keyRef)), value))
+                else:
+                    siblingNames.add(value)
+            elif key == 'category':
+                if category is None:
+                    category = value
+                    if type(value) is not str or not value:
+                        errors.append('%s: Invalid category %s' % (_formatPath((path, keyRef)), json.dumps(value)))
+            elif type(value) is list:
+                childArrays.append((key, (path, keyRef), value))
+            else:
+                errors.append('%s: "%s" is not an array of elements' % (_formatPath((path, keyRef)), key))
+
+        if not hasName:
+            errors.append('%s: Element has no name' % _formatPath(path))
+        if category is None:
+            errors.append('%s: Element has no category' % _formatPath(path))
+
+        # Inputs, children and outputs share one namespace. Children are pushed in reverse so that
+        # errors are reported in document order
+        childNames = set()
+        for key, arrayPath, children in reversed(childArrays):
+            implied = core.CHILD_KEY_CATEGORIES[key]
+            for index in range(len(children) - 1, -1, -1):
+                stack.append((children[index], (arrayPath, index), implied, childNames))
+
+    del errors[maxErrors:]
+    return errors
+
+def checkJson(jsonDoc, readOptions: core.JsonReadOptions = None, mimetype: str = core.JSON_MIMETYPE) -> None:
+    '''
+    @brief Check that a decoded JSON document can be converted to MaterialX
+    @param jsonDoc The decoded JSON document
+    @param readOptions The read options the document will be read with. Default is None
+    @param mimetype The expected mimetype of the document. Default is core.JSON_MIMETYPE
+    @throws JsonValidationError listing the errors if the document is not valid
+    '''
+    errors = validateJson(jsonDoc, readOptions, mimetype)
+    if errors:
+        raise JsonValidationError(errors)
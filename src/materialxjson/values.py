@@ -0,0 +1,123 @@
+# values.py
+
+'''
+@file
+This module contains conversion between MaterialX value strings and native JSON values.
+
+Values are converted based on the MaterialX type of the element:
+    - integer, float and boolean values are written as JSON numbers and booleans
+    - color, vector and matrix values, and integer, float and boolean arrays are written as
+      flat arrays of numbers or booleans
+    - Values of all other types, and values which cannot be parsed, are left as strings
+
+Value strings are parsed in bulk by the JSON scanner instead of splitting them in Python.
+'''
+
+import json
+import re
+
+# Attributes which hold a value of the element type
+VALUE_ATTRIBUTES = ('value', 'uimin', 'uimax', 'uisoftmin', 'uisoftmax', 'uistep')
+
+# Number of components for fixed size types
+TYPE_COMPONENTS = {
+    'integer': 0,
+    'float': 0,
+    'boolean': 0,
+    'vector2': 2,
+    'vector3': 3,
+    'vector4': 4,
+    'color3': 3,
+    'color4': 4,
+    'matrix33': 9,
+    'matrix44': 16,
+    'integerarray': -1,
+    'floatarray': -1,
+    'booleanarray': -1,
+}
+
+# Python type of the components of each type
+_COMPONENT_TYPES = {
+    'integer': int,
+    'integerarray': int,
+    'boolean': bool,
+    'booleanarray': bool,
+}
+
+# Decoder which reads integers as floats for float based types
+_floatDecoder = json.JSONDecoder(parse_int=float)
+
+# Trailing zero fraction of whole numbers written by the JSON encoder, e.g. the ".0" in "1.0, 0.5"
+_WHOLE_NUMBER_FRACTION = re.compile(r'\.0(?=,|$)')
+
+def valueStringToJson(valueString: str, typeName: str):
+    '''
+    @brief Convert a MaterialX value string to a native JSON value
+    @param valueString The MaterialX value string
+    @param typeName The MaterialX type of the value
+    @return A number, boolean or list, or the value string if the type is not supported
+    or the string cannot be parsed
+    '''
+    components = TYPE_COMPONENTS.get(typeName)
+    if components is None:
+        return valueString
+    componentType = _COMPONENT_TYPES.get(typeName, float)
+
+    try:
+        if componentType is float:
+            values = _floatDecoder.decode('[' + valueString + ']')
+        else:
+            values = json.loads('[' + valueString + ']')
+    except ValueError:
+        # Fall back to Python parsing for numbers which are not valid JSON, e.g. ".5"
+        if componentType is bool:
+            return valueString
+        try:
+            values = [componentType(item) for item in valueString.split(',')] if valueString.strip() else []
+        except ValueError:
+            return valueString
+
+    if set(map(type, values)) - { componentType }:
+        return valueString
+    if components == 0:
+        return values[0] if len(values) == 1 else valueString
+    if components > 0 and len(values) != components:
+        return valueString
+    return values
+
+def jsonToValueString(value) -> str:
+    '''
+    @brief Convert a native JSON value to a MaterialX value string
+    @param value A number, boolean or list. Nested lists such as matrix rows are flattened.
+    Objects with a tolist() method, such as NumPy arrays, are also accepted.
+    @return The MaterialX value string, or None if the value cannot be converted
+    '''
+    if hasattr(value, 'tolist'):
+        value = value.tolist()
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return _WHOLE_NUMBER_FRACTION.sub('', json.dumps(value))
+    if isinstance(value, (list, tuple)):
+        itemTypes = set(map(type, value))
+        if list in itemTypes or tuple in itemTypes:
+            value = [item for row in value for item in (row if isinstance(row, (list, tuple)) else (row,))]
+            itemTypes = set(map(type, value))
+        if itemTypes == { str }:
+            return ', '.join(value)
+        if itemTypes - { int, float, bool }:
+            return None
+        return _WHOLE_NUMBER_FRACTION.sub('', json.dumps(value)[1:-1])
+    return None
+
+def typeValues(jsonElem: dict) -> None:
+    '''
+    @brief Convert the value attributes of a JSON element from strings to native JSON values
+    @param jsonElem The JSON element to update
+    '''
+    typeName = jsonElem.get('type')
+    if typeName in TYPE_COMPONENTS:
+        for attrName in VALUE_ATTRIBUTES:
+            valueString = jsonElem.get(attrName)
+            if valueString is not None:
+                jsonElem[attrName] = valueStringToJson(valueString, typeName)
@@ -0,0 +1,424 @@
+# verify.py
+
+'''
+@file
+This module contains structural verification of MaterialX documents against their JSON representation.
+
+The structural hash of a document covers the name path, category, attributes and children of each
+element, and can be computed for an mx.Document, a JSON document or a written XML file. Attribute
+order is ignored. Children are compared in the order in which they are stored in JSON: inputs,
+other children and then outputs, each in document order. Values of numeric and boolean types are
+compared by value, so that "1.0" matches "1" and typed JSON values match value strings.
+
+Elements can be added to a StructureHash in any order, so the writers and readers in the core
+module add each element as they convert it. A converted file is then checked by hashing only the
+written output. Only when the hashes differ are the elements recorded by name path, with normalized
+values, to report the mismatching elements.
+'''
+
+from __future__ import annotations
+
+import hashlib
+from xml.etree import ElementTree
+
+from materialxjson import core, fileio, stringtable, values
+from materialxjson.core import mx
+
+# Name used for the document in mismatch reports
+DOCUMENT_PATH = '(document)'
+
+_VALUE_ATTRIBUTES = frozenset(values.VALUE_ATTRIBUTES)
+# Classes of native JSON values whose repr identifies the value
+_NATIVE_CLASSES = (list, float, int, bool)
+
+class VerificationError(Exception):
+    '''
+    Error raised when a converted file does not have the same structure as its source.
+
+    Members:
+        - fileName: The converted file
+        - mismatches: List of mismatch messages
+    '''
+    # Number of mismatches included in the error message
+    MESSAGE_MISMATCHES = 5
+
+    def __init__(self, fileName: str, mismatches: list):
+        '''
+        @brief Constructor
+        @param fileName The converted file
+        @param mismatches List of mismatch messages
+        '''
+        self.fileName = fileName
+        self.mismatches = mismatches
+        shown = mismatches[:self.MESSAGE_MISMATCHES]
+        if len(mismatches) > len(shown):
+            shown = shown + ['...']
+        super().__init__('"%s" does not match its source. %d mismatches: %s' % (fileName, len(mismatches), '; '.join(shown)))
+
+class ElementRecord:
+    '''
+    Structure of a single element, as recorded by recordDocument() and recordJson().
+
+    Members:
+        - category: The element category
+        - attributes: Dictionary of normalized attribute strings
+        - children: List of child names in canonical order
+    '''
+    __slots__ = ('category', 'attributes', 'children')
+
+    def __init__(self, category: str, attributes: dict, children: list):
+        self.category = category
+        self.attributes = attributes
+        self.children = children
+
+def _normalizeValue(value, typeName: str) -> str:
+    '''
+    @brief Get the canonical string for an attribute value
+    '''
+    if not isinstance(value, str):
+        valueString = values.jsonToValueString(value)
+        return valueString if valueString is not None else str(value)
+    if typeName in values.TYPE_COMPONENTS:
+        parsed = values.valueStringToJson(value, typeName)
+        if not isinstance(parsed, str):
+            return values.jsonToValueString(parsed)
+    return value
+
+def _stringAttributes(attributes: dict, normalize: bool, cache: dict) -> list:
+    '''
+    @brief Get the attributes of an element as value strings
+    @param attributes Dictionary of attributes with string or native JSON values. The name, category
+    and child keys of JSON elements are skipped
+    @param normalize Whether to normalize the value strings of numeric and boolean types
+    @param cache Dictionary of value strings by the repr of native JSON values and of normalized values
+    by (value, type), shared for a document as values repeat
+    @return List of (name, value string) pairs
+    '''
+    typeName = attributes.get('type')
+    normalize = normalize and typeName in values.TYPE_COMPONENTS
+    pairs = []
+    for name, value in attributes.items():
+        if name in core.NON_ATTRIBUTE_KEYS:
+            continue
+        if value.__class__ is not str:
+            key = repr(value) if value.__class__ in _NATIVE_CLASSES else None
+            converted = cache.get(key)
+            if converted is None:
+                converted = _normalizeValue(value, typeName)
+                if key is not None:
+                    cache[key] = converted
+            value = converted
+        if normalize and name in _VALUE_ATTRIBUTES:
+            key = (value, typeName)
+            normalized = cache.get(key)
+            if normalized is None:
+                normalized = cache[key] = _normalizeValue(value, typeName)
+            value = normalized
+        pairs.append((name, value))
+    return pairs
+
+class StructureHash:
+    '''
+    Structural hash of a document, to which elements can be added in any order.
+
+    Each element is added as a line with its name path, category, child names and "name\x1evalue"
+    attribute fields sorted by name, separated by \x1f, and the hash is computed over the sorted lines.
+    Instances are passed as the structureHash option of core.JsonWriteOptions and core.JsonReadOptions
+    to hash the elements of a document as they are converted.
+
+    Members:
+        - normalize: Whether value strings are normalized
+    '''
+    def __init__(self, normalize: bool = False):
+        '''
+        @brief Constructor
+        @param normalize Whether to normalize value strings, so that "1.0" matches "1". Default is False
+        '''
+        self.normalize = normalize
+        self._lines = []
+        self._cache = {}
+
+    def addElement(self, path: str, category: str, attributes: dict, children: list) -> None:
+        '''
+        @brief Add an element
+        @param path The name path of the element, which is empty for the document
+        @param category The element category
+        @param attributes Dictionary of attributes with string or native JSON values. The name, category
+        and child keys of JSON elements are skipped
+        @param children List of child names, with inputs first and outputs last
+        '''
+        fields = None
+        if not self.normalize:
+            try:
+                fields = [name + '\x1e' + value for name, value in attributes.items() if name not in core.NON_ATTRIBUTE_KEYS]
+            except TypeError:
+                # The element has native JSON values
+                pass
+        if fields is None:
+            fields = [name + '\x1e' + value for name, value in _stringAttributes(attributes, self.normalize, self._cache)]
+        fields.sort()
+        self._lines.append('\x1f'.join([path, category, '\x1d'.join(children)] + fields))
+
+    def addJson(self, node: dict, path: str = '', category: str = core.MATERIALX_DOCUMENT_ROOT) -> None:
+        '''
+        @brief Add a JSON element in the plain layout and its descendants
+        @param node The JSON element
+        @param path The name path of the element. Default is the document
+        @param category The element category. Default is the document
+        '''
+        _walkTree((node, category), _expandJson, self.addElement, path)
+
+    def hexdigest(self) -> str:
+        '''
+        @brief Get the hash of the elements added so far
+        @return The hexadecimal hash string
+        '''
+        self._lines.sort()
+        return hashlib.blake2b('\n'.join(self._lines).encode('utf-8'), digest_size=16).hexdigest()
+
+def _documentExpander(doc: mx.Document, writeOptions: core.JsonWriteOptions):
+    '''
+    @brief Get the root item and expand function for the elements of a MaterialX document
+    '''
+    elementTest = core.compileElementTest(writeOptions)
+
+    def expand(item):
+        elem, category, included = item
+        getAttribute = elem.getAttribute
+        attributes = { name: getAttribute(name) for name in elem.getAttributeNames() }
+        inputs, others, outputs = [], [], []
+        for child in elem.getChildren():
+            childCategory = child.getCategory()
+            childIncluded = elementTest(child, childCategory, included)
+            if childIncluded is None:
+                continue
+            group = inputs if childCategory == 'input' else outputs if childCategory == 'output' else others
+            group.append((child.getName(), (child, childCategory, childIncluded)))
+        return category, attributes, inputs + others + outputs
+
+    return (doc, core.MATERIALX_DOCUMENT_ROOT, False), expand
+
+def _jsonRoot(jsonDoc: dict) -> dict:
+    '''
+    @brief Get the root element of a JSON document in the plain layout
+    '''
+    root = jsonDoc[core.MATERIALX_DOCUMENT_ROOT]
+    if stringtable.STRING_TABLE_KEY in jsonDoc:
+        root = stringtable.expandElement(root, jsonDoc[stringtable.STRING_TABLE_KEY])
+    return root
+
+def _expandJson(item):
+    '''
+    @brief Expand function for the elements of a JSON document. The attributes are the JSON element itself
+    '''
+    node, category = item
+    children = []
+    for key, impliedCategory in core.CHILD_KEY_CATEGORIES.items():
+        childNodes = node.get(key)
+        if childNodes:
+            children.extend((child.get('name', ''), (child, child.get('category', impliedCategory) or '')) for child in childNodes)
+    return category, node, children
+
+def _xmlRoot(xmlFileName: str) -> ElementTree.Element:
+    '''
+    @brief Parse a written XML file, independently of the MaterialX reader. XIncludes are not expanded
+    '''
+    with fileio.openInputStream(xmlFileName) as infile:
+        return ElementTree.parse(infile).getroot()
+
+def _expandXml(elem: ElementTree.Element):
+    '''
+    @brief Expand function for the elements of a parsed XML file. The category is the tag of an element
+    '''
+    inputs, others, outputs = [], [], []
+    for child in elem:
+        group = inputs if child.tag == 'input' else outputs if child.tag == 'output' else others
+        group.append((child.get('name', ''), child))
+    return elem.tag, elem.attrib, inputs + others + outputs
+
+def _walkTree(root, expand, visit, path: str = '') -> None:
+    '''
+    @brief Visit the elements of a tree depth first
+    @param root The root item
+    @param expand Function returning (category, attributes, [(name, item), ...]) for an item,
+    with the children in canonical order
+    @param visit Function called with (name path, category, attributes, child names) for each element
+    @param path The name path of the root. Default is the document
+    '''
+    stack = [(path, root)]
+    while stack:
+        path, item = stack.pop()
+        category, attributes, children = expand(item)
+        visit(path, category, attributes, [name for name, _ in children])
+        prefix = path + core.NAME_PATH_SEPARATOR if path else ''
+        for name, child in reversed(children):
+            stack.append((prefix + name, child))
+
+def _recordTree(root, expand) -> dict:
+    '''
+    @brief Record the structure of a tree with normalized values
+    @return Dictionary of ElementRecord indexed by name path, with the empty path for the root
+    '''
+    records = {}
+    cache = {}
+    def visit(path, category, attributes, children):
+        records[path] = ElementRecord(category, dict(_stringAttributes(attributes, True, cache)), children)
+    _walkTree(root, expand, visit)
+    return records
+
+def _hashTree(root, expand, normalize: bool) -> str:
+    '''
+    @brief Hash the structure of a tree
+    @return The hexadecimal hash string
+    '''
+    structureHash = StructureHash(normalize)
+    _walkTree(root, expand, structureHash.addElement)
+    return structureHash.hexdigest()
+
+def recordDocument(doc: mx.Document, writeOptions: core.JsonWriteOptions = None) -> dict:
+    '''
+    @brief Record the structure of a MaterialX document
+    @param doc The MaterialX document
+    @param writeOptions The write options whose element filter and predicate select the elements
+    to include, as for MaterialXJson.documentToJSON(). Default is None
+    @return Dictionary of ElementRecord indexed by name path
+    '''
+    return _recordTree(*_documentExpander(doc, writeOptions))
+
+def recordJson(jsonDoc: dict) -> dict:
+    '''
+    @brief Record the structure of a JSON document
+    @param jsonDoc The JSON document, in any layout
+    @return Dictionary of ElementRecord indexed by name path
+    '''
+    return _recordTree((_jsonRoot(jsonDoc), core.MATERIALX_DOCUMENT_ROOT), _expandJson)
+
+def hashDocument(doc: mx.Document, writeOptions: core.JsonWriteOptions = None) -> str:
+    '''
+    @brief Compute the structural hash of a MaterialX document
+    @param doc The MaterialX document
+    @param writeOptions The write options whose element filter and predicate select the elements
+    to include. Default is None
+    @return The hexadecimal hash string
+    '''
+    return _hashTree(*_documentExpander(doc, writeOptions), True)
+
+def hashJson(jsonDoc: dict) -> str:
+    '''
+    @brief Compute the structural hash of a JSON document
+    @param jsonDoc The JSON document, in any layout
+    @return The hexadecimal hash string
+    '''
+    return _hashTree((_jsonRoot(jsonDoc), core.MATERIALX_DOCUMENT_ROOT), _expandJson, True)
+
+def hashXmlFile(xmlFileName: str) -> str:
+    '''
+    @brief Compute the structural hash of a MaterialX XML file, which is parsed without MaterialX
+    @param xmlFileName The XML file. Files with a .gz or .xz extension are decompressed
+    @return The hexadecimal hash string
+    '''
+    return _hashTree(_xmlRoot(xmlFileName), _expandXml, True)
+
+def compareRecords(expected: dict, actual: dict, maxMismatches: int = 100) -> list:
+    '''
+    @brief Compare the structures recorded for two documents
+    @param expected The records of the expected document
+    @param actual The records of the document to check
+    @param maxMismatches The maximum number of mismatches to report. Default is 100
+    @return List of mismatch messages prefixed by element name path. The list is empty if the structures match
+    '''
+    mismatches = []
+    stack = ['']
+    while stack and len(mismatches) < maxMismatches:
+        path = stack.pop()
+        old, new = expected[path], actual[path]
+        label = path or DOCUMENT_PATH
+        if old.category != new.category:
+            mismatches.append('%s: category "%s" != "%s"' % (label, old.category, new.category))
+        for name in sorted(set(old.attributes) | set(new.attributes)):
+            oldValue, newValue = old.attributes.get(name), new.attributes.get(name)
+            if oldValue == newValue:
+                continue
+            if newValue is None:
+                mismatches.append('%s: missing attribute "%s"' % (label, name))
+            elif oldValue is None:
+                mismatches.append('%s: extra attribute "%s"' % (label, name))
+            else:
+                mismatches.append('%s: attribute "%s" differs: "%s" != "%s"' % (label, name, oldValue, newValue))
+
+        prefix = path + core.NAME_PATH_SEPARATOR if path else ''
+        newChildren = set(new.children)
+        oldChildren = set(old.children)
+        for name in old.children:
+            if name not in newChildren:
+                mismatches.append('%s: missing child "%s"' % (label, name))
+        for name in new.children:
+            if name not in oldChildren:
+                mismatches.append('%s: extra child "%s"' % (label, name))
+        common = [name for name in old.children if name in newChildren]
+        if common != [name for name in new.children if name in oldChildren]:
+            mismatches.append('%s: children are in a different order' % label)
+        stack.extend(prefix + name for name in reversed(common))
+    return mismatches[:maxMismatches]
+
+def compareDocumentToJson(doc: mx.Document, jsonDoc: dict, writeOptions: core.JsonWriteOptions = None,
+                          maxMismatches: int = 100) -> list:
+    '''
+    @brief Check that a JSON document has the same structure as a MaterialX document
+    @param doc The MaterialX document
+    @param jsonDoc The JSON document
+    @param writeOptions The write options whose element filter and predicate select the elements
+    of the MaterialX document to compare. Default is None
+    @param maxMismatches The maximum number of mismatches to report. Default is 100
+    @return List of mismatch messages. The list is empty if the structures match
+    '''
+    # Compare the hashes with value strings as written first, as they match unless values are written
+    # differently. Native JSON values are converted to value strings, which are written as in MaterialX
+    if _hashTree(*_documentExpander(doc, writeOptions), False) == \
+       _hashTree((_jsonRoot(jsonDoc), core.MATERIALX_DOCUMENT_ROOT), _expandJson, False):
+        return []
+    # Record the elements by name path with all values normalized, to report the mismatches if any.
+    # Values which are only written differently, such as "1.0" and "1", do not mismatch
+    return compareRecords(recordDocument(doc, writeOptions), recordJson(jsonDoc), maxMismatches)
+
+def checkJsonOutput(doc: mx.Document, jsonFileName: str, writeOptions: core.JsonWriteOptions) -> None:
+    '''
+    @brief Check that a JSON file written from a document has the same structure as the document, as done by
+    the --verify command option. Only the JSON file is read and hashed, and compared with the hash of the
+    elements written, which the writer computes while converting
+    @param doc The document which was converted, which is only traversed again to report mismatches
+    @param jsonFileName The JSON file written
+    @param writeOptions The write options used for conversion, with a structureHash set before conversion.
+    Its stats, if any, record the time in the verify phase
+    @throws VerificationError if the structures differ
+    '''
+    structureHash = writeOptions.structureHash
+    with core.statsPhase(writeOptions.stats, 'verify'):
+        jsonDoc = core.Util.readJson(jsonFileName, None, writeOptions.codec, writeOptions.compression)
+        jsonRoot = (_jsonRoot(jsonDoc), core.MATERIALX_DOCUMENT_ROOT)
+        if _hashTree(jsonRoot, _expandJson, structureHash.normalize) == structureHash.hexdigest():
+            return
+        mismatches = compareRecords(recordDocument(doc, writeOptions), _recordTree(jsonRoot, _expandJson))
+    if mismatches:
+        raise VerificationError(jsonFileName, mismatches)
+
+def checkXmlOutput(jsonFileName: str, xmlFileName: str, readOptions: core.JsonReadOptions) -> None:
+    '''
+    @brief Check that an XML file written from a JSON file has the same structure as the JSON file, as done by
+    the --verify command option. Only the XML file is read and hashed, and compared with the hash of the
+    elements read, which the reader computes while converting
+    @param jsonFileName The JSON file which was converted, which is only read again to report mismatches
+    @param xmlFileName The XML file written. Files with a .gz or .xz extension are decompressed
+    @param readOptions The read options used for conversion, with a structureHash set before conversion.
+    Its stats, if any, record the time in the verify phase
+    @throws VerificationError if the structures differ
+    '''
+    structureHash = readOptions.structureHash
+    with core.statsPhase(readOptions.stats, 'verify'):
+        xmlRoot = _xmlRoot(xmlFileName)
+        if _hashTree(xmlRoot, _expandXml, structureHash.normalize) == structureHash.hexdigest():
+            return
+        jsonDoc = core.Util.readJson(jsonFileName, None, readOptions.codec, readOptions.compression)
+        mismatches = compareRecords(recordJson(jsonDoc), _recordTree(xmlRoot, _expandXml))
+    if mismatches:
+        raise VerificationError(xmlFileName, mismatches)
@@ -0,0 +1,301 @@
+# view.py
+
+'''
+@file
+This module contains a lightweight read-only view of a MaterialX JSON document.
+
+The view navigates the decoded JSON directly, with an interface similar to the MaterialX
+element classes, so that queries such as listing the materials of a document or the files it
+references do not require building an mx.Document. Element wrappers are only created when
+they are first visited. The typed value and string table layouts are supported without
+expanding the document.
+'''
+
+from materialxjson import cbor, core, fileio, jsoncodec, stringtable, values
+
+class _StringTableView:
+    '''
+    Lookup tables for reading a document in the compact string table layout.
+    '''
+    __slots__ = ('strings', 'keys', 'refs')
+
+    def __init__(self, strings: list):
+        self.strings = strings
+        self.keys = stringtable.createKeyMap(strings)
+        self.refs = { key: ref for ref, key in self.keys.items() }
+
+class ElementView:
+    '''
+    Read-only view of an element of a MaterialX JSON document.
+    '''
+    __slots__ = ('_node', '_category', '_parent', '_table', '_children', '_childMap')
+
+    def __init__(self, node: dict, category: str, parent, table: _StringTableView = None):
+        '''
+        @brief Constructor. Views are created by their parent and should not be constructed directly.
+        @param node The JSON element
+        @param category The category of the element
+        @param parent The parent view, or None for the document
+        @param table The string table lookups, or None if the document does not use a string table
+        '''
+        self._node = node
+        self._category = category
+        self._parent = parent
+        self._table = table
+        self._children = None
+        self._childMap = None
+
+    def __repr__(self) -> str:
+        return '<%s name="%s">' % (self._category, self.getName())
+
+    def _get(self, key: str):
+        '''
+        @brief Get the JSON value of a key, resolving string table references
+        '''
+        table = self._table
+        if table is None:
+            return self._node.get(key)
+        ref = table.refs.get(key)
+        if ref is None:
+            return None
+        value = self._node.get(ref)
+        if type(value) is int:
+            return table.strings[value]
+        return value
+
+    def getName(self) -> str:
+        '''
+        @brief Get the name of the element
+        '''
+        return self._get('name') or ''
+
+    def getCategory(self) -> str:
+        '''
+        @brief Get the category of the element
+        '''
+        return self._category
+
+    def getParent(self):
+        '''
+        @brief Get the parent view, or None for the document
+        '''
+        return self._parent
+
+    def getDocument(self):
+        '''
+        @brief Get the document view
+        '''
+        elem = self
+        while elem._parent is not None:
+            elem = elem._parent
+        return elem
+
+    def getNamePath(self) -> str:
+        '''
+        @brief Get the name path of the element relative to the document, e.g. "NG_wood/image_color/file"
+        '''
+        names = []
+        elem = self
+        while elem._parent is not None:
+            names.append(elem.getName())
+            elem = elem._parent
+        return core.NAME_PATH_SEPARATOR.join(reversed(names))
+
+    def getAttributeNames(self) -> list:
+        '''
+        @brief Get the names of the attributes of the element
+        '''
+        if self._table is None:
+            return [key for key in self._node if key not in core.NON_ATTRIBUTE_KEYS]
+        keys = self._table.keys
+        return [keys[ref] for ref in self._node if keys[ref] not in core.NON_ATTRIBUTE_KEYS]
+
+    def hasAttribute(self, name: str) -> bool:
+        '''
+        @brief Check if the element has an attribute
+        '''
+        return name not in core.NON_ATTRIBUTE_KEYS and self._get(name) is not None
+
+    def getAttribute(self, name: str) -> str:
+        '''
+        @brief Get an attribute as a string. Native JSON values are converted to MaterialX value strings.
+        @return The attribute string, or an empty string if the attribute is not set
+        '''
+        if name in core.NON_ATTRIBUTE_KEYS:
+            return ''
+        value = self._get(name)
+        if value is None:
+            return ''
+        if isinstance(value, str):
+            return value
+        if self._table is not None and type(value) is list and len(value) == 1:
+            # Numeric scalars and one item arrays are wrapped in the string table layout
+            value = value[0]
+        return values.jsonToValueString(value) or ''
+
+    def getType(self) -> str:
+        '''
+        @brief Get the type attribute of the element
+        '''
+        return self.getAttribute('type')
+
+    def getValueString(self) -> str:
+        '''
+        @brief Get the value attribute of the element as a string
+        '''
+        return self.getAttribute('value')
+
+    def getValue(self):
+        '''
+        @brief Get the value attribute of the element as a native JSON value based on the element type.
+        @return A number, boolean or list, a string for other types, or None if no value is set
+        '''
+        valueString = self.getValueString()
+        if not valueString and not self.hasAttribute('value'):
+            return None
+        return values.valueStringToJson(valueString, self.getType())
+
+    def getChildren(self) -> list:
+        '''
+        @brief Get the child views of the element, in the order inputs, other children, outputs
+        '''
+        if self._children is None:
+            children = []
+            table = self._table
+            if table is None:
+                for key, impliedCategory in core.CHILD_KEY_CATEGORIES.items():
+                    nodes = self._node.get(key)
+                    if nodes:
+                        children.extend([ElementView(node, node.get('category', impliedCategory), self) for node in nodes])
+            else:
+                categoryKey = table.refs.get('category')
+                for key, impliedCategory in core.CHILD_KEY_CATEGORIES.items():
+                    for node in self._get(key) or ():
+                        category = node.get(categoryKey, impliedCategory)
+                        if type(category) is int:
+                            category = table.strings[category]
+                        children.append(ElementView(node, category or '', self, table))
+            self._children = children
+        return self._children
+
+    def getChild(self, name: str):
+        '''
+        @brief Get a child view by name
+        @return The child view, or None if there is no child with the name
+        '''
+        if self._childMap is None:
+            self._childMap = { child.getName(): child for child in self.getChildren() }
+        return self._childMap.get(name)
+
+    def getChildrenOfCategory(self, category: str) -> list:
+        '''
+        @brief Get the child views with a given category
+        '''
+        return [child for child in self.getChildren() if child._category == category]
+
+    def getInputs(self) -> list:
+        '''
+        @brief Get the input views of the element
+        '''
+        return self.getChildrenOfCategory('input')
+
+    def getInput(self, name: str):
+        '''
+        @brief Get an input view by name, or None if there is no such input
+        '''
+        child = self.getChild(name)
+        return child if child and child._category == 'input' else None
+
+    def getOutputs(self) -> list:
+        '''
+        @brief Get the output views of the element
+        '''
+        return self.getChildrenOfCategory('output')
+
+    def getOutput(self, name: str):
+        '''
+        @brief Get an output view by name, or None if there is no such output
+        '''
+        child = self.getChild(name)
+        return child if child and child._category == 'output' else None
+
+    def getDescendant(self, namePath: str):
+        '''
+        @brief Get a descendant view by name path relative to this element
+        @return The descendant view, or None if not found
+        '''
+        elem = self
+        for name in namePath.split(core.NAME_PATH_SEPARATOR) if namePath else ():
+            elem = elem.getChild(name)
+            if elem is None:
+                return None
+        return elem
+
+    def traverseTree(self):
+        '''
+        @brief Iterate over this element and all of its descendants in depth-first order
+        '''
+        stack = [self]
+        while stack:
+            elem = stack.pop()
+            yield elem
+            stack.extend(reversed(elem.getChildren()))
+
+class DocumentView(ElementView):
+    '''
+    Read-only view of a MaterialX JSON document.
+    '''
+    __slots__ = ()
+
+    def __init__(self, jsonDoc: dict):
+        '''
+        @brief Constructor
+        @param jsonDoc The decoded JSON or CBOR document
+        @throws ValueError if the document is not a MaterialX document
+        '''
+        if not isinstance(jsonDoc, dict) or jsonDoc.get(core.JSON_MIMETYPE_KEY) not in (core.JSON_MIMETYPE, core.CBOR_MIMETYPE):
+            raise ValueError('JSON document is not a MaterialX document')
+        if core.MATERIALX_DOCUMENT_ROOT not in jsonDoc:
+            raise ValueError('JSON document is missing a MaterialX root element')
+        table = None
+        if stringtable.STRING_TABLE_KEY in jsonDoc:
+            table = _StringTableView(jsonDoc[stringtable.STRING_TABLE_KEY])
+        ElementView.__init__(self, jsonDoc[core.MATERIALX_DOCUMENT_ROOT], 'materialx', None, table)
+
+    def __repr__(self) -> str:
+        return '<materialx version="%s">' % self.getVersionString()
+
+    def getName(self) -> str:
+        '''
+        @brief Get the name of the document, which is empty
+        '''
+        return ''
+
+    def getVersionString(self) -> str:
+        '''
+        @brief Get the MaterialX version of the document
+        '''
+        return self.getAttribute('version')
+
+    @staticmethod
+    def fromString(data):
+        '''
+        @brief Create a view from JSON text or from CBOR data
+        @param data A JSON string, or bytes or a bytes-like object containing JSON text or CBOR data
+        @return The document view
+        @throws ValueError if the data cannot be decoded or is not a MaterialX document
+        '''
+        if not isinstance(data, str) and bytes(data[:3]) == b'\xd9\xd9\xf7':
+            return DocumentView(cbor.decode(data))
+        return DocumentView(jsoncodec.getCodec().decode(data))
+
+    @staticmethod
+    def fromFile(fileName: str):
+        '''
+        @brief Create a view from a JSON or CBOR file
+        @param fileName The file to read
+        @return The document view
+        @throws ValueError if the file cannot be decoded or is not a MaterialX document
+        '''
+        with fileio.openInputData(fileName, jsoncodec.getCodec().decodesBuffers) as data:
+            return DocumentView.fromString(data)
@@ -0,0 +1,99 @@
+'''
+Tests for the asyncio conversion API
+'''
+import asyncio
+import concurrent.futures
+import os
+import threading
+import time
+
+import pytest
+
+import materialxjson
+from materialxjson import aio, core
+
+DATA_FOLDER = os.path.join(os.path.dirname(materialxjson.__file__), 'data')
+
+class _Tracker:
+    '''
+    Worker which records the tasks it runs and the number running at a time
+    '''
+    def __init__(self, duration: float):
+        self.duration = duration
+        self.lock = threading.Lock()
+        self.running = 0
+        self.maxRunning = 0
+        self.started = []
+
+    def __call__(self, task):
+        with self.lock:
+            self.running += 1
+            self.maxRunning = max(self.maxRunning, self.running)
+            self.started.append(task)
+        try:
+            time.sleep(self.duration * (10 if task == 'slow' else 1))
+            if task == 'fail':
+                raise ValueError('bad file')
+            return 'Converted "%s"' % task
+        finally:
+            with self.lock:
+                self.running -= 1
+
+@pytest.fixture
+def executor():
+    with concurrent.futures.ThreadPoolExecutor(8) as threadExecutor:
+        yield threadExecutor
+
+def test_concurrency_is_bounded(executor):
+    worker = _Tracker(0.02)
+    tasks = ['a%d' % index for index in range(12)] + ['fail']
+    result = asyncio.run(aio.runBatch(worker, tasks, 3, executor, report=None))
+    assert result.fileCount == len(tasks)
+    assert result.failures == [('fail', 'ValueError: bad file')]
+    assert worker.maxRunning == 3
+
+def test_timed_out_tasks_keep_their_place(executor):
+    worker = _Tracker(0.05)
+    tasks = ['slow', 'a', 'b', 'c']
+    result = asyncio.run(aio.runBatch(worker, tasks, 2, executor, timeout=0.2, report=None))
+    assert result.failures == [('slow', 'Timed out after 0.2 seconds')]
+    assert result.fileCount == len(tasks)
+    # The slow task still runs after its time limit, so only one other task runs at a time
+    assert worker.maxRunning == 2
+
+def test_cancellation_stops_pending_tasks(executor):
+    worker = _Tracker(0.05)
+    tasks = ['a%d' % index for index in range(20)]
+
+    async def cancelBatch():
+        batchTask = asyncio.ensure_future(aio.runBatch(worker, tasks, 2, executor, report=None))
+        await asyncio.sleep(0.07)
+        batchTask.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await batchTask
+
+    asyncio.run(cancelBatch())
+    executor.shutdown(wait=True)
+    assert 2 <= len(worker.started) <= 6
+
+def test_file_conversion_stats(executor, tmp_path):
+    xmlFileName = os.path.join(DATA_FOLDER, 'standard_surface_default.mtlx')
+    fileNames = [(xmlFileName, str(tmp_path / ('doc%d.json' % index))) for index in range(6)]
+    writeOptions = core.JsonWriteOptions()
+    writeOptions.stats = core.ConversionStats()
+    result = asyncio.run(aio.xmlFilesToJsonFiles(fileNames, writeOptions, 3, executor))
+    assert not result.failures
+    singleStats = core.ConversionStats()
+    singleOptions = core.JsonWriteOptions()
+    singleOptions.stats = singleStats
+    core.Util.xmlFileToJsonFile(xmlFileName, str(tmp_path / 'single.json'), singleOptions)
+    assert writeOptions.stats.elementCount() == 6 * singleStats.elementCount()
+    assert result.stats.elementCount() == 6 * singleStats.elementCount()
+
+    readOptions = core.JsonReadOptions()
+    readOptions.stats = core.ConversionStats()
+    xmlFileNames = [(jsonFileName, jsonFileName + '.mtlx') for _, jsonFileName in fileNames]
+    result = asyncio.run(aio.jsonFilesToXmlFiles(xmlFileNames, readOptions, 3, executor))
+    assert not result.failures
+    assert readOptions.stats.elementCount() == 6 * singleStats.elementCount()
+    assert all(os.path.isfile(xmlFileName) for _, xmlFileName in xmlFileNames)
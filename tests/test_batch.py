@@ -0,0 +1,57 @@
+'''
+Tests for batch conversion
+'''
+import os
+import time
+
+import pytest
+
+from materialxjson import batch, core
+
+def _worker(task: str) -> str:
+    if task.startswith('crash'):
+        # Terminate the worker process as a crash in MaterialX would
+        os._exit(1)
+    if task.startswith('fail'):
+        raise ValueError('bad file')
+    if task.startswith('slow'):
+        time.sleep(5)
+    return 'Converted "%s"' % task
+
+def _statsWorker(task: str) -> tuple:
+    stats = core.ConversionStats()
+    stats.countElement('nodegraph')
+    return 'Converted "%s"' % task, stats, task.upper()
+
+def _failures(result: batch.BatchResult) -> dict:
+    return { task: message for task, message in result.failures }
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_failures_do_not_abort_the_batch(jobs):
+    tasks = ['a', 'fail1', 'b', 'c', 'fail2']
+    result = batch.runBatch(_worker, tasks, jobs, report=None)
+    assert result.fileCount == len(tasks)
+    assert _failures(result) == { 'fail1': 'ValueError: bad file', 'fail2': 'ValueError: bad file' }
+
+@pytest.mark.parametrize('chunkSize', [1, 3])
+def test_terminated_workers_are_failures(chunkSize):
+    tasks = ['a%d' % index for index in range(10)]
+    tasks[4] = 'crash'
+    messages = []
+    result = batch.runBatch(_worker, tasks, 2, chunkSize, report=messages.append)
+    assert result.fileCount == len(tasks)
+    assert _failures(result) == { 'crash': 'Worker process terminated unexpectedly' }
+    assert sorted(message for message in messages if message.startswith('Converted')) == \
+        sorted('Converted "%s"' % task for task in tasks if task != 'crash')
+
+def test_timeouts():
+    start = time.perf_counter()
+    result = batch.runBatch(_worker, ['a', 'slow', 'b'], 1, timeout=0.2, report=None)
+    assert time.perf_counter() - start < 4
+    assert _failures(result) == { 'slow': 'Timed out after 0.2 seconds' }
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_stats_and_data_are_collected(jobs):
+    result = batch.runBatch(_statsWorker, ['a', 'b', 'c'], jobs, report=None)
+    assert result.stats.categoryCounts == { 'nodegraph': 3 }
+    assert sorted(data for _, data in result.data) == ['A', 'B', 'C']
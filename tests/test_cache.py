@@ -0,0 +1,75 @@
+'''
+Tests for the library cache
+'''
+import os
+
+import pytest
+
+from materialxjson import cache
+from materialxjson.core import mx
+
+NODEDEF = '  <nodedef name="ND_test%d" node="test%d"><output name="out" type="float" /></nodedef>\n'
+
+def _writeLibrary(folder, count: int) -> None:
+    os.makedirs(folder, exist_ok=True)
+    fileName = os.path.join(folder, 'test_defs.mtlx')
+    with open(fileName, 'w', encoding='utf-8') as outfile:
+        outfile.write('<?xml version="1.0"?>\n<materialx version="1.39">\n')
+        outfile.write(''.join(NODEDEF % (index, index) for index in range(count)))
+        outfile.write('</materialx>\n')
+    # Make sure that the modification time changes with the edit
+    stat = os.stat(fileName)
+    os.utime(fileName, ns=(stat.st_atime_ns, stat.st_mtime_ns + count * 1000000000))
+
+@pytest.fixture
+def library(tmp_path):
+    _writeLibrary(tmp_path / 'lib', 2)
+    return mx.FileSearchPath(str(tmp_path)), ['lib']
+
+@pytest.fixture
+def keyCount(monkeypatch):
+    count = [0]
+    getKey = cache.LibraryCache.getKey
+    def countKey(*args):
+        count[0] += 1
+        return getKey(*args)
+    monkeypatch.setattr(cache.LibraryCache, 'getKey', staticmethod(countKey))
+    return count
+
+def test_memory_hits_do_not_visit_files(library, keyCount):
+    libraryCache = cache.LibraryCache()
+    lib, status = libraryCache.load(*library)
+    assert len(lib.getNodeDefs()) == 2 and 'from 1 files' in status
+    for _ in range(3):
+        cachedLib, status = libraryCache.load(*library)
+        assert cachedLib is lib and 'memory cache' in status
+    assert keyCount[0] == 1
+
+def test_validation_finds_edited_libraries(library, tmp_path):
+    libraryCache = cache.LibraryCache()
+    lib, _ = libraryCache.load(*library)
+    assert libraryCache.load(*library, validate=True)[0] is lib
+
+    _writeLibrary(tmp_path / 'lib', 3)
+    assert libraryCache.load(*library)[0] is lib
+    editedLib, _ = libraryCache.load(*library, validate=True)
+    assert len(editedLib.getNodeDefs()) == 3
+    libraryCache.clear()
+    assert libraryCache.load(*library)[0] is not editedLib
+
+def test_snapshots(library, tmp_path):
+    cacheFolder = str(tmp_path / 'cache')
+    lib, _ = cache.LibraryCache(cacheFolder).load(*library)
+    assert len(os.listdir(cacheFolder)) == 1
+
+    snapshotLib, status = cache.LibraryCache(cacheFolder).load(*library)
+    assert 'from cache' in status
+    assert [elem.getName() for elem in snapshotLib.getChildren()] == [elem.getName() for elem in lib.getChildren()]
+    assert all(elem.getSourceUri() == libElem.getSourceUri() for elem, libElem in zip(snapshotLib.getChildren(), lib.getChildren()))
+    assert all(not elem.hasAttribute(cache.SOURCE_URI_ATTRIBUTE) for elem in snapshotLib.getChildren())
+
+    # An edited library has a new key and is loaded from its files
+    _writeLibrary(tmp_path / 'lib', 3)
+    editedLib, status = cache.LibraryCache(cacheFolder).load(*library)
+    assert len(editedLib.getNodeDefs()) == 3 and 'from 1 files' in status
+    assert len(os.listdir(cacheFolder)) == 2
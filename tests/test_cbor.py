@@ -0,0 +1,42 @@
+'''
+Tests for the CBOR encoding and its string reference extension
+'''
+import pytest
+
+from materialxjson import cbor
+
+def _encode(obj) -> bytes:
+    return cbor.CborEncoder(stringReferences=True, selfDescribe=False).encode(obj)
+
+def test_short_strings_are_not_referenced():
+    # Strings of 2 bytes are below the minimum length of 3 for the first 24 references
+    data = _encode(['ab', 'ab', 'abc', 'abc'])
+    assert data.hex() == 'd90100' '84' '626162' '626162' '63616263' 'd81900'
+    assert cbor.decode(data) == ['ab', 'ab', 'abc', 'abc']
+
+def test_minimum_length_uses_utf8_bytes():
+    # "é" is one character but 2 bytes, "éa" is 3 bytes and is referenced
+    data = _encode(['é', 'é', 'éa', 'éa'])
+    assert data.endswith(bytes.fromhex('d81900'))
+    assert cbor.decode(data) == ['é', 'é', 'éa', 'éa']
+
+def test_minimum_length_grows_with_index():
+    # From index 24 strings need 4 bytes to be referenced
+    strings = ['s%02d' % i for i in range(24)] + ['abc', 'abcd']
+    data = _encode(strings + ['abc', 'abcd'])
+    assert cbor.decode(data) == strings + ['abc', 'abcd']
+    assert data.count(bytes.fromhex('63616263')) == 2
+    assert data.endswith(bytes.fromhex('d8191818'))
+
+@pytest.mark.parametrize('obj', [
+    ['ab', 'ab', 'abc', 'abc'],
+    ['x%d' % i for i in range(30)] * 2 + ['long string %d' % i for i in range(300)] * 2,
+    { 'mimetype': 'application/mtlx+cbor', 'materialx': { 'name': 'doc', 'children': [
+        { 'name': 'n%d' % i, 'category': 'image', 'type': 'color3', 'value': [0.5, 1, -0.0] } for i in range(50)] } },
+])
+def test_matches_cbor2(obj):
+    cbor2 = pytest.importorskip('cbor2')
+    data = _encode(obj)
+    assert data == cbor2.dumps(obj, string_referencing=True)
+    assert cbor2.loads(data) == obj
+    assert cbor.decode(cbor2.dumps(obj, string_referencing=True)) == obj
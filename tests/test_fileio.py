@@ -0,0 +1,124 @@
+'''
+Tests for the file input and output layer
+'''
+import json
+import mmap
+import os
+
+import pytest
+
+import materialxjson
+from materialxjson import core, fileio, jsoncodec
+
+DATA_FOLDER = os.path.join(os.path.dirname(materialxjson.__file__), 'data')
+
+@pytest.fixture
+def jsonFileName(tmp_path) -> str:
+    '''
+    @brief Write a JSON document with non-ASCII text as UTF-8
+    '''
+    fileName = str(tmp_path / 'doc.json')
+    with open(os.path.join(DATA_FOLDER, 'standard_surface_default_mtlx.json'), encoding='utf-8') as infile:
+        jsonDoc = json.load(infile)
+    jsonDoc['materialx']['doc'] = 'café \U0001f600 日本'
+    with open(fileName, 'w', encoding='utf-8') as outfile:
+        json.dump(jsonDoc, outfile, ensure_ascii=False, indent=2)
+    return fileName
+
+def _readBytes(fileName: str) -> bytes:
+    with open(fileName, 'rb') as infile:
+        return infile.read()
+
+@pytest.mark.parametrize('useMmap', [False, True])
+def test_large_files_are_mapped(jsonFileName, monkeypatch, useMmap):
+    monkeypatch.setattr(fileio, 'MMAP_THRESHOLD', 0)
+    with fileio.openInputData(jsonFileName, useMmap) as data:
+        assert isinstance(data, mmap.mmap) == useMmap
+        assert bytes(data) == _readBytes(jsonFileName)
+        mapping = data
+    # Mappings are closed once reading completes
+    assert not useMmap or mapping.closed
+
+def test_small_and_empty_files_are_read(jsonFileName, tmp_path, monkeypatch):
+    with fileio.openInputData(jsonFileName) as data:
+        assert isinstance(data, bytes) and data == _readBytes(jsonFileName)
+    # Empty files cannot be mapped
+    monkeypatch.setattr(fileio, 'MMAP_THRESHOLD', 0)
+    emptyFileName = str(tmp_path / 'empty.json')
+    open(emptyFileName, 'wb').close()
+    with fileio.openInputData(emptyFileName) as data:
+        assert data == b''
+
+@pytest.mark.parametrize('threshold', [0, fileio.MMAP_THRESHOLD])
+@pytest.mark.parametrize('codecName', jsoncodec.getCodecNames())
+def test_read_json_decodes_bytes(jsonFileName, monkeypatch, codecName, threshold):
+    monkeypatch.setattr(fileio, 'MMAP_THRESHOLD', threshold)
+    with open(jsonFileName, encoding='utf-8') as infile:
+        expected = json.load(infile)
+    stats = core.ConversionStats()
+    assert core.Util.readJson(jsonFileName, stats, codecName) == expected
+    assert stats.bytesRead == os.path.getsize(jsonFileName)
+
+def test_json_files_convert_from_bytes(jsonFileName, monkeypatch):
+    monkeypatch.setattr(fileio, 'MMAP_THRESHOLD', 0)
+    doc = core.Util.jsonFileToXml(jsonFileName)
+    assert doc.getDocString() == 'café \U0001f600 日本'
+
+# Leading bytes of each compressed format
+MAGIC_NUMBERS = { 'gzip': b'\x1f\x8b', 'lzma': b'\xfd7zXZ\x00' }
+
+@pytest.mark.parametrize('streamOutput', [False, True])
+@pytest.mark.parametrize('compression', ['gzip', 'lzma'])
+def test_compressed_round_trip(tmp_path, compression, streamOutput):
+    xmlFileName = os.path.join(DATA_FOLDER, 'MaterialsVariantsShoe.gltf_converted.mtlx')
+    extension = fileio.getCompressionExtension(compression)
+    writeOptions = core.JsonWriteOptions()
+    writeOptions.streamOutput = streamOutput
+    jsonFileName = str(tmp_path / ('shoe.json' + extension))
+    core.Util.xmlFileToJsonFile(xmlFileName, jsonFileName, writeOptions)
+    assert _readBytes(jsonFileName).startswith(MAGIC_NUMBERS[compression])
+    core.Util.xmlFileToJsonFile(xmlFileName, str(tmp_path / 'plain.json'), writeOptions)
+    assert core.Util.readJson(jsonFileName) == core.Util.readJson(str(tmp_path / 'plain.json'))
+
+    # Compressed XML is written and read back, including as the input of a conversion
+    outputFileName = str(tmp_path / ('shoe.mtlx' + extension))
+    assert core.Util.jsonFileToXmlFile(jsonFileName, outputFileName)
+    assert _readBytes(outputFileName).startswith(MAGIC_NUMBERS[compression])
+    core.Util.xmlFileToJsonFile(outputFileName, str(tmp_path / 'again.json'))
+    assert core.Util.readJson(str(tmp_path / 'again.json')) == core.Util.readJson(str(tmp_path / 'plain.json'))
+
+def test_explicit_compression_overrides_extension(tmp_path):
+    xmlFileName = os.path.join(DATA_FOLDER, 'standard_surface_default.mtlx')
+    writeOptions = core.JsonWriteOptions()
+    writeOptions.compression = 'gzip'
+    jsonFileName = str(tmp_path / 'doc.json')
+    core.Util.xmlFileToJsonFile(xmlFileName, jsonFileName, writeOptions)
+    assert _readBytes(jsonFileName).startswith(MAGIC_NUMBERS['gzip'])
+    expected = core.Util.readJson(jsonFileName, compression='gzip')
+
+    writeOptions.compression = 'none'
+    plainFileName = str(tmp_path / 'doc.json.gz')
+    core.Util.xmlFileToJsonFile(xmlFileName, plainFileName, writeOptions)
+    assert core.Util.readJson(plainFileName, compression='none') == expected
+
+    writeOptions.compression = 'zip'
+    with pytest.raises(ValueError):
+        core.Util.xmlFileToJsonFile(xmlFileName, jsonFileName, writeOptions)
+
+def test_gzip_output_is_reproducible(tmp_path):
+    xmlFileName = os.path.join(DATA_FOLDER, 'standard_surface_default.mtlx')
+    # The gzip header holds the file name, but no modification time
+    fileNames = []
+    for folder in ('first', 'second'):
+        (tmp_path / folder).mkdir()
+        fileNames.append(str(tmp_path / folder / 'doc.json.gz'))
+        core.Util.xmlFileToJsonFile(xmlFileName, fileNames[-1])
+    assert _readBytes(fileNames[0]) == _readBytes(fileNames[1])
+
+@pytest.mark.parametrize('fileName, expected', [
+    ('doc.json.gz', ('doc.json', 'gzip')),
+    ('doc.mtlx.XZ', ('doc.mtlx', 'lzma')),
+    ('doc.json', ('doc.json', '')),
+])
+def test_compression_extensions(fileName, expected):
+    assert fileio.splitCompressionExtension(fileName) == expected
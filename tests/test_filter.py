@@ -0,0 +1,74 @@
+'''
+Tests for the element filter and the categories written for inputs and outputs
+'''
+import io
+import json
+import os
+
+import pytest
+
+import materialxjson
+from materialxjson import core
+from materialxjson.core import mx
+
+DATA_FOLDER = os.path.join(os.path.dirname(materialxjson.__file__), 'data')
+DATA_FILES = ['standard_surface_default', 'MaterialsVariantsShoe.gltf_converted']
+
+def _readDocument(name: str) -> mx.Document:
+    doc = mx.createDocument()
+    mx.readFromXmlFile(doc, os.path.join(DATA_FOLDER, name + '.mtlx'))
+    return doc
+
+def _writeJson(doc: mx.Document, writeOptions: core.JsonWriteOptions, streamOutput: bool) -> dict:
+    if not streamOutput:
+        return core.MaterialXJson().documentToJSON(doc, writeOptions)
+    stream = io.StringIO()
+    core.JsonStreamWriter(stream, writeOptions).writeDocument(doc)
+    return json.loads(stream.getvalue())
+
+def _iterElements(node: dict, depth: int = 0):
+    for key in core.CHILD_KEYS:
+        for child in node.get(key, []):
+            yield key, child, depth
+            yield from _iterElements(child, depth + 1)
+
+@pytest.mark.parametrize('streamOutput', [False, True])
+@pytest.mark.parametrize('name', DATA_FILES)
+def test_default_output_matches_data_files(name, streamOutput):
+    with open(os.path.join(DATA_FOLDER, name + '_mtlx.json'), encoding='utf-8') as infile:
+        expected = json.load(infile)
+    assert _writeJson(_readDocument(name), core.JsonWriteOptions(), streamOutput) == expected
+
+@pytest.mark.parametrize('streamOutput', [False, True])
+def test_nested_ports_have_no_category(streamOutput):
+    doc = _readDocument('standard_surface_default')
+    doc.addOutput('out_top', 'color3')
+    jsonDoc = _writeJson(doc, core.JsonWriteOptions(), streamOutput)
+    elements = list(_iterElements(jsonDoc['materialx']))
+    assert any(depth > 0 and key == core.INPUTS_STRING for key, _, depth in elements)
+    for key, child, depth in elements:
+        if key != core.CHILDREN_STRING:
+            assert ('category' in child) == (depth == 0)
+
+@pytest.mark.parametrize('streamOutput', [False, True])
+def test_filter_applies_at_every_depth(streamOutput):
+    doc = _readDocument('MaterialsVariantsShoe.gltf_converted')
+    writeOptions = core.JsonWriteOptions()
+    writeOptions.elementFilter = core.ElementFilter()
+    writeOptions.elementFilter.excludeCategories = { 'input' }
+    writeOptions.elementFilter.excludeNames = ['image_*']
+    writeOptions.stats = core.ConversionStats()
+    jsonDoc = _writeJson(doc, writeOptions, streamOutput)
+    elements = list(_iterElements(jsonDoc['materialx']))
+    assert elements
+    assert all(key != core.INPUTS_STRING and not child['name'].startswith('image_') for key, child, _ in elements)
+    assert writeOptions.stats.skippedElements > 0
+
+    # Include rules select elements with all of their descendants
+    writeOptions = core.JsonWriteOptions()
+    writeOptions.elementFilter = core.ElementFilter()
+    writeOptions.elementFilter.includeCategories = { 'gltf_pbr' }
+    jsonDoc = _writeJson(doc, writeOptions, streamOutput)
+    children = jsonDoc['materialx']['children']
+    assert children and all(child['category'] == 'gltf_pbr' for child in children)
+    assert all(child.get(core.INPUTS_STRING) for child in children)
@@ -0,0 +1,95 @@
+'''
+Tests that the JSON codecs write and read identical JSON
+'''
+import io
+import itertools
+import json
+import math
+import os
+
+import pytest
+
+import materialxjson
+from materialxjson import core, jsoncodec
+from materialxjson.core import mx
+
+DATA_FOLDER = os.path.join(os.path.dirname(materialxjson.__file__), 'data')
+
+EDGE_CASES = [
+    { 'name': 'café   \U0001f600 日本', 'control': '\x00\x1f\x7f', 'escape': '"\\/', 'file1e5': 'e5 1e5' },
+    { 'floats': [0.0, -0.0, 1.0, 0.1, 1e-4, 1e-5, 1.5e-7, 5e-324, 1e15, 1e16, 1.2345678901234568e+16, 1e300, -2.5e-8] },
+    { 'special': [math.inf, -math.inf], 'integers': [0, -1, 2 ** 53 + 1, 2 ** 63, -2 ** 64, 10 ** 30] },
+    { 'empty': [[], {}, ''], 'nested': [[[{}]]], 'booleans': [True, False, None] },
+    [-0.0, [-0.0], { 'value': -0.0 }],
+    'top level string',
+]
+
+INDENTS = [None, 0, 2, 4]
+SEPARATORS = [None, (',', ':'), (',', ': '), (', ', ': ')]
+
+def _loadDocuments() -> list:
+    documents = list(EDGE_CASES)
+    doc = mx.createDocument()
+    mx.readFromXmlFile(doc, os.path.join(DATA_FOLDER, 'MaterialsVariantsShoe.gltf_converted.mtlx'))
+    for typedValues in (False, True):
+        writeOptions = core.JsonWriteOptions()
+        writeOptions.typedValues = typedValues
+        documents.append(core.MaterialXJson().documentToJSON(doc, writeOptions))
+    return documents
+
+DOCUMENTS = _loadDocuments()
+
+@pytest.fixture(scope='module')
+def orjsonCodec():
+    pytest.importorskip('orjson')
+    return jsoncodec.getCodec('orjson')
+
+@pytest.mark.parametrize('indent,separators', list(itertools.product(INDENTS, SEPARATORS)))
+@pytest.mark.parametrize('index', range(len(DOCUMENTS)))
+def test_encode_matches_json(orjsonCodec, index, indent, separators):
+    jsonObject = DOCUMENTS[index]
+    expected = json.dumps(jsonObject, indent=indent, separators=separators)
+    assert orjsonCodec.encode(jsonObject, indent, separators) == expected
+    assert jsoncodec.getCodec('json').encode(jsonObject, indent, separators) == expected
+
+@pytest.mark.parametrize('indent,separators', list(itertools.product(INDENTS, SEPARATORS)))
+@pytest.mark.parametrize('index', range(len(DOCUMENTS)))
+def test_dump_matches_encode(orjsonCodec, index, indent, separators):
+    jsonObject = DOCUMENTS[index]
+    expected = json.dumps(jsonObject, indent=indent, separators=separators)
+    for codec in (orjsonCodec, jsoncodec.getCodec('json')):
+        stream = io.StringIO()
+        codec.dump(jsonObject, stream, indent, separators)
+        assert stream.getvalue() == expected
+
+@pytest.mark.parametrize('index', range(len(DOCUMENTS)))
+def test_decode_matches_json(orjsonCodec, index):
+    text = json.dumps(DOCUMENTS[index], indent=2)
+    expected = json.loads(text)
+    for data in (text, text.encode('utf-8'), bytearray(text.encode('utf-8'))):
+        decoded = orjsonCodec.decode(data)
+        assert decoded == expected
+        # Compare the text as well, to distinguish -0.0 from 0.0 and 1 from 1.0
+        assert json.dumps(decoded) == json.dumps(expected)
+
+def test_file_round_trip(orjsonCodec, tmp_path):
+    doc = mx.createDocument()
+    mx.readFromXmlFile(doc, os.path.join(DATA_FOLDER, 'standard_surface_default.mtlx'))
+    texts = []
+    for codecName, indent in itertools.product(('json', 'orjson'), (None, 2)):
+        writeOptions = core.JsonWriteOptions()
+        writeOptions.codec = codecName
+        writeOptions.indent = indent
+        writeOptions.separators = (',', ':') if indent is None else (',', ': ')
+        fileName = str(tmp_path / ('%s_%s.json' % (codecName, indent)))
+        core.Util.xmlFileToJsonFile(os.path.join(DATA_FOLDER, 'standard_surface_default.mtlx'), fileName, writeOptions)
+        with open(fileName, encoding='utf-8') as infile:
+            text = infile.read()
+        assert text == core.MaterialXJson().documentToJSONString(doc, writeOptions)
+        texts.append((indent, text))
+
+        readOptions = core.JsonReadOptions()
+        readOptions.codec = codecName
+        newDoc = core.Util.jsonFileToXml(fileName, readOptions)
+        assert mx.writeToXmlString(newDoc) == mx.writeToXmlString(doc)
+    assert texts[0] == texts[2] and texts[1] == texts[3]
@@ -0,0 +1,80 @@
+'''
+Tests for the JSON Lines layout and sharded output
+'''
+import json
+import os
+
+import pytest
+
+import materialxjson
+from materialxjson import core, jsonlines
+from materialxjson.core import mx
+
+DATA_FOLDER = os.path.join(os.path.dirname(materialxjson.__file__), 'data')
+
+@pytest.fixture(scope='module')
+def doc():
+    doc = mx.createDocument()
+    mx.readFromXmlFile(doc, os.path.join(DATA_FOLDER, 'MaterialsVariantsShoe.gltf_converted.mtlx'))
+    return doc
+
+def _jsonRoundTrip(doc: mx.Document) -> str:
+    newDoc = mx.createDocument()
+    assert core.MaterialXJson().documentFromJSON(core.MaterialXJson().documentToJSON(doc), newDoc)
+    return mx.writeToXmlString(newDoc)
+
+@pytest.mark.parametrize('extension', ['', '.gz'])
+@pytest.mark.parametrize('shardCount', [1, 3])
+def test_shards_round_trip(doc, tmp_path, shardCount, extension):
+    fileName = str(tmp_path / ('shoe.jsonl' + extension))
+    fileNames = jsonlines.writeFiles(doc, fileName, shardCount=shardCount)
+    assert fileNames == [jsonlines.getShardFileName(fileName, shard, shardCount) for shard in range(shardCount)]
+    assert jsonlines.findShardFiles(fileName) == fileNames
+    if shardCount > 1:
+        assert os.path.basename(fileNames[1]) == 'shoe-00001-of-00003.jsonl' + extension
+
+    newDoc = mx.createDocument()
+    assert jsonlines.readFiles(fileNames, newDoc, jobs=2)
+    assert mx.writeToXmlString(newDoc) == _jsonRoundTrip(doc)
+
+def test_shards_hold_consecutive_elements(doc, tmp_path):
+    fileNames = jsonlines.writeFiles(doc, str(tmp_path / 'shoe.jsonl'), shardCount=3)
+    names = []
+    for shard, fileName in enumerate(fileNames):
+        with open(fileName, encoding='utf-8') as infile:
+            lines = infile.read().splitlines()
+        header = json.loads(lines[0])
+        assert header[jsonlines.SHARD_KEY] == shard and header[jsonlines.SHARD_COUNT_KEY] == 3
+        assert header[core.MATERIALX_DOCUMENT_ROOT] == { 'version': doc.getVersionString() }
+        # Each line holds one element, listed in the header
+        assert lines[1:]
+        assert [[node['name'], node['category']] for node in map(json.loads, lines[1:])] == header[jsonlines.ELEMENTS_KEY]
+        names.extend(name for name, _ in header[jsonlines.ELEMENTS_KEY])
+    assert names == [elem.getName() for elem in doc.getChildren()]
+
+def test_selected_elements_are_read(doc, tmp_path):
+    fileNames = jsonlines.writeFiles(doc, str(tmp_path / 'shoe.jsonl'), shardCount=2)
+    newDoc = mx.createDocument()
+    assert jsonlines.readFiles(fileNames, newDoc, select=lambda name, category: category == 'surfacematerial')
+    materials = [elem.getName() for elem in doc.getChildren() if elem.getCategory() == 'surfacematerial']
+    assert materials and [elem.getName() for elem in newDoc.getChildren()] == materials
+
+    # A single shard can be read on its own
+    header, nodes = jsonlines.readFile(fileNames[1])
+    assert [node['name'] for node in nodes] == [name for name, _ in header[jsonlines.ELEMENTS_KEY]]
+
+def test_invalid_files_are_rejected(doc, tmp_path):
+    with pytest.raises(ValueError):
+        jsonlines.writeFiles(doc, str(tmp_path / 'shoe.jsonl'), shardCount=0)
+
+    fileName = jsonlines.writeFiles(doc, str(tmp_path / 'shoe.jsonl'))[0]
+    with open(fileName, encoding='utf-8') as infile:
+        lines = infile.read().splitlines()
+    with open(fileName, 'w', encoding='utf-8') as outfile:
+        outfile.write('\n'.join(lines[:-1]) + '\n')
+    with pytest.raises(ValueError):
+        jsonlines.readFile(fileName)
+    assert not jsonlines.readFiles([fileName], mx.createDocument())
+
+    with pytest.raises(ValueError):
+        jsonlines.readHeader(json.dumps({ core.JSON_MIMETYPE_KEY: core.JSON_MIMETYPE }))
@@ -0,0 +1,91 @@
+'''
+Tests for incremental conversion with a conversion manifest
+'''
+import os
+import shutil
+
+import pytest
+
+import materialxjson
+from materialxjson import manifest, mtlx2json
+
+DATA_FOLDER = os.path.join(os.path.dirname(materialxjson.__file__), 'data')
+DATA_FILES = ['standard_surface_default', 'MaterialsVariantsShoe.gltf_converted']
+
+@pytest.fixture
+def inputFolder(tmp_path):
+    folder = tmp_path / 'input'
+    folder.mkdir()
+    for name in DATA_FILES:
+        shutil.copy(os.path.join(DATA_FOLDER, name + '.mtlx'), str(folder))
+    return folder
+
+def _convert(folder, capsys, *args) -> int:
+    '''
+    @brief Convert a folder incrementally and return the number of skipped files
+    '''
+    assert mtlx2json.main([str(folder), '--incremental', 'true'] + list(args)) == 0
+    output = capsys.readouterr().out
+    return int(output.split('- Skipped ')[1].split()[0])
+
+def test_unchanged_files_are_skipped(inputFolder, capsys):
+    assert _convert(inputFolder, capsys) == 0
+    manifestFileName = str(inputFolder / manifest.MANIFEST_FILENAME)
+    conversionManifest = manifest.ConversionManifest(manifestFileName)
+    assert conversionManifest.load()
+    assert len(conversionManifest.entries) == len(DATA_FILES)
+    assert _convert(inputFolder, capsys) == len(DATA_FILES)
+
+def test_changes_are_converted_again(inputFolder, capsys):
+    _convert(inputFolder, capsys)
+    jsonFileName = inputFolder / (DATA_FILES[0] + '_mtlx.json')
+
+    # Edited input
+    with open(str(inputFolder / (DATA_FILES[0] + '.mtlx')), 'a') as outfile:
+        outfile.write('<!-- edited -->\n')
+    assert _convert(inputFolder, capsys) == len(DATA_FILES) - 1
+
+    # Edited or removed output
+    jsonFileName.write_text('{}')
+    assert _convert(inputFolder, capsys) == len(DATA_FILES) - 1
+    assert jsonFileName.read_text() != '{}'
+    jsonFileName.unlink()
+    assert _convert(inputFolder, capsys) == len(DATA_FILES) - 1
+    assert jsonFileName.is_file()
+
+    # Changed options which affect the output
+    assert _convert(inputFolder, capsys, '--indent', '4') == 0
+    assert _convert(inputFolder, capsys, '--indent', '4') == len(DATA_FILES)
+
+def test_paths_are_stored_relative_to_the_manifest(tmp_path):
+    inputFile = tmp_path / 'input.mtlx'
+    outputFile = tmp_path / 'output' / 'input_mtlx.json'
+    outputFile.parent.mkdir()
+    inputFile.write_text('input')
+    outputFile.write_text('output')
+    options = { 'indent': 2 }
+    entry = manifest.ConversionManifest.createEntry(manifest.hashFile(str(inputFile)), str(outputFile), options)
+
+    conversionManifest = manifest.ConversionManifest(str(tmp_path / manifest.MANIFEST_FILENAME))
+    conversionManifest.setEntry(str(inputFile), entry)
+    conversionManifest.save()
+
+    # The manifest and files can be moved together
+    movedFolder = tmp_path.parent / (tmp_path.name + '_moved')
+    shutil.copytree(str(tmp_path), str(movedFolder))
+    movedManifest = manifest.ConversionManifest(str(movedFolder / manifest.MANIFEST_FILENAME))
+    assert movedManifest.load()
+    movedEntry = movedManifest.getEntry(str(movedFolder / 'input.mtlx'))
+    movedOutputFile = str(movedFolder / 'output' / 'input_mtlx.json')
+    assert manifest.ConversionManifest.isUpToDate(movedEntry, entry['inputHash'], movedOutputFile, options)
+    assert not manifest.ConversionManifest.isUpToDate(movedEntry, entry['inputHash'], movedOutputFile, { 'indent': 4 })
+
+def test_invalid_manifests_have_no_entries(tmp_path):
+    manifestFileName = tmp_path / manifest.MANIFEST_FILENAME
+    conversionManifest = manifest.ConversionManifest(str(manifestFileName))
+    assert not conversionManifest.load()
+    manifestFileName.write_text('{ "version": 0, "files": {} }')
+    assert not conversionManifest.load()
+    manifestFileName.write_text('not json')
+    assert not conversionManifest.load()
+    assert conversionManifest.entries == {}
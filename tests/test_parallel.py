@@ -0,0 +1,59 @@
+'''
+Tests for reading documents with the parallel module
+'''
+import concurrent.futures
+import copy
+import os
+
+import pytest
+
+import materialxjson
+from materialxjson import core, parallel
+from materialxjson.core import mx
+
+DATA_FOLDER = os.path.join(os.path.dirname(materialxjson.__file__), 'data')
+
+def _createNodes(count: int) -> list:
+    doc = mx.createDocument()
+    mx.readFromXmlFile(doc, os.path.join(DATA_FOLDER, 'standard_surface_default.mtlx'))
+    children = core.MaterialXJson().documentToJSON(doc)['materialx']['children']
+    nodes = []
+    for index in range(count):
+        for child in children:
+            node = copy.deepcopy(child)
+            node['name'] = '%s_%d' % (node['name'], index)
+            nodes.append(node)
+    return nodes
+
+def _createDocument() -> mx.Document:
+    doc = mx.createDocument()
+    doc.setColorSpace('lin_rec709')
+    doc.addNodeGraph('NG_first')
+    return doc
+
+def test_parallel_read_matches_serial():
+    nodes = _createNodes(100)
+    serialDoc = _createDocument()
+    core.MaterialXJson().elementFromJSON({ core.CHILDREN_STRING: nodes }, serialDoc)
+    parallelDoc = _createDocument()
+    with concurrent.futures.ThreadPoolExecutor(2) as executor:
+        parallel.elementsFromJSON(nodes, parallelDoc, None, 2, executor)
+    assert parallelDoc.getVersionString() == serialDoc.getVersionString()
+    assert parallelDoc.getColorSpace() == 'lin_rec709'
+    assert parallelDoc.getChildren()[0].getName() == 'NG_first'
+    assert mx.writeToXmlString(parallelDoc) == mx.writeToXmlString(serialDoc)
+
+def test_name_conflicts_are_rejected():
+    nodes = _createNodes(100)
+    doc = _createDocument()
+    nodes[-1]['name'] = 'NG_first'
+    with concurrent.futures.ThreadPoolExecutor(2) as executor:
+        with pytest.raises(LookupError):
+            parallel.elementsFromJSON(nodes, doc, None, 2, executor)
+    assert len(doc.getChildren()) == 1
+
+def test_jobs_are_limited_to_cpus():
+    cpuCount = os.cpu_count() or 1
+    assert parallel.getJobCount(0) == cpuCount
+    assert parallel.getJobCount(cpuCount + 1) == cpuCount
+    assert parallel.getJobCount(1) == 1
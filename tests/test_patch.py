@@ -0,0 +1,98 @@
+'''
+Tests for computing and applying document patches
+'''
+import os
+
+import pytest
+
+import materialxjson
+from materialxjson import core, patch
+from materialxjson.core import mx
+
+DATA_FOLDER = os.path.join(os.path.dirname(materialxjson.__file__), 'data')
+
+def _createDocument() -> mx.Document:
+    '''
+    Create a document with a node graph whose inputs, nodes and outputs are interleaved
+    '''
+    doc = mx.createDocument()
+    mx.readFromXmlFile(doc, os.path.join(DATA_FOLDER, 'standard_surface_default.mtlx'))
+    graph = doc.addNodeGraph('NG_test')
+    graph.addInput('in1', 'float')
+    graph.addNode('add', 'n1', 'float')
+    graph.addOutput('out1', 'float')
+    graph.addNode('multiply', 'n2', 'float')
+    graph.addInput('in2', 'float')
+    graph.addNode('subtract', 'n3', 'float')
+    return doc
+
+def _copyDocument(doc: mx.Document) -> mx.Document:
+    newDoc = mx.createDocument()
+    newDoc.copyContentFrom(doc)
+    return newDoc
+
+def _childNames(elem: mx.Element) -> list:
+    return [child.getName() for child in elem.getChildren()]
+
+def _applyDiff(oldDoc: mx.Document, newDoc: mx.Document) -> mx.Document:
+    documentPatch = patch.diffDocuments(oldDoc, newDoc)
+    patchedDoc = _copyDocument(oldDoc)
+    assert patch.applyPatch(patchedDoc, documentPatch)
+    return patchedDoc
+
+def _swapChildren(elem: mx.Element, name1: str, name2: str) -> None:
+    index1 = elem.getChildIndex(name1)
+    index2 = elem.getChildIndex(name2)
+    elem.setChildIndex(name1, index2)
+    elem.setChildIndex(name2, index1)
+
+def _edit(doc: mx.Document, edit: str) -> None:
+    graph = doc.getNodeGraph('NG_test')
+    if edit == 'reorder':
+        # JSON holds the order of the inputs, nodes and outputs of an element separately,
+        # so children are only reordered within the positions of their kind
+        _swapChildren(graph, 'in1', 'in2')
+        _swapChildren(graph, 'n1', 'n3')
+        doc.setChildIndex('NG_test', 0)
+    elif edit == 'add':
+        graph.addNode('divide', 'n4', 'float')
+        doc.addNodeGraph('NG_added').addOutput('out', 'color3')
+    elif edit == 'remove':
+        graph.removeChild('n2')
+        graph.removeChild('in1')
+    elif edit == 'set':
+        graph.getNode('n1').setInputValue('in1', 0.5)
+        doc.getChild('SR_default').removeAttribute('type')
+
+@pytest.mark.parametrize('edit', ['reorder', 'add', 'remove', 'set'])
+def test_round_trip(edit):
+    oldDoc = _createDocument()
+    newDoc = _copyDocument(oldDoc)
+    _edit(newDoc, edit)
+    patchedDoc = _applyDiff(oldDoc, newDoc)
+    assert mx.writeToXmlString(patchedDoc) == mx.writeToXmlString(newDoc)
+    assert patch.diffDocuments(patchedDoc, newDoc)[patch.PATCH_OPERATIONS_KEY] == []
+
+def test_reorder_keeps_interleaved_order():
+    oldDoc = _createDocument()
+    newDoc = _copyDocument(oldDoc)
+    newDoc.getNodeGraph('NG_test').setChildIndex('n2', 1)
+    documentPatch = patch.diffDocuments(oldDoc, newDoc)
+    assert documentPatch[patch.PATCH_OPERATIONS_KEY] == [{ 'op': 'order', 'path': 'NG_test', 'children': ['n2', 'n1', 'n3'] }]
+    patchedDoc = _copyDocument(oldDoc)
+    assert patch.applyPatch(patchedDoc, documentPatch)
+    assert _childNames(patchedDoc.getNodeGraph('NG_test')) == ['in1', 'n2', 'out1', 'n1', 'in2', 'n3']
+
+def test_unchanged_documents_have_no_operations():
+    doc = _createDocument()
+    assert patch.diffDocuments(doc, _copyDocument(doc))[patch.PATCH_OPERATIONS_KEY] == []
+
+def test_invalid_operations_are_rejected():
+    doc = _createDocument()
+    for operation in ({ 'op': 'order', 'path': 'NG_test', 'children': ['n1', 'n1'] },
+                      { 'op': 'order', 'path': 'NG_test', 'children': ['n1', 'missing'] },
+                      { 'op': 'remove', 'path': 'NG_test/missing' },
+                      { 'op': 'unknown', 'path': '' }):
+        documentPatch = { core.JSON_MIMETYPE_KEY: patch.PATCH_MIMETYPE, patch.PATCH_OPERATIONS_KEY: [operation] }
+        assert not patch.applyPatch(doc, documentPatch)
+    assert _childNames(doc.getNodeGraph('NG_test')) == ['in1', 'n1', 'out1', 'n2', 'in2', 'n3']
@@ -0,0 +1,141 @@
+'''
+Tests for the local conversion server and its client
+'''
+import http.client
+import os
+import shutil
+import socket
+import threading
+
+import pytest
+
+import materialxjson
+from materialxjson import client, server
+
+DATA_FOLDER = os.path.join(os.path.dirname(materialxjson.__file__), 'data')
+
+def _startServer(options: server.ServerOptions):
+    conversionServer = server.createServer(options)
+    thread = threading.Thread(target=conversionServer.serve_forever, daemon=True)
+    thread.start()
+    return conversionServer, thread
+
+@pytest.fixture(scope='module')
+def tcpServer():
+    options = server.ServerOptions()
+    options.port = 0
+    options.loadLibraries = False
+    conversionServer, thread = _startServer(options)
+    yield conversionServer
+    conversionServer.shutdown()
+    conversionServer.server_close()
+    thread.join()
+
+def _post(conversionServer, headers: dict) -> http.client.HTTPResponse:
+    connection = http.client.HTTPConnection(*conversionServer.server_address[:2], timeout=10)
+    body = b'<?xml version="1.0"?><materialx version="1.39"/>'
+    connection.request('POST', '/m2j', body, dict(headers, **{ 'Content-Length': str(len(body)) }))
+    response = connection.getresponse()
+    response.read()
+    connection.close()
+    return response
+
+def test_client_requests_are_handled(tcpServer):
+    with open(os.path.join(DATA_FOLDER, 'standard_surface_default.mtlx'), encoding='utf-8') as infile:
+        xmlString = infile.read()
+    with client.ConversionClient(*tcpServer.server_address[:2]) as conversionClient:
+        jsonString = conversionClient.xmlToJson(xmlString)
+        assert '"standard_surface"' in jsonString
+        assert '<standard_surface' in conversionClient.jsonToXml(jsonString)
+        assert conversionClient.status()['requests']['/m2j'] == 1
+
+@pytest.mark.parametrize('headers', [
+    {},
+    { client.REQUEST_HEADER: '0' },
+    { client.REQUEST_HEADER: '1', 'Origin': 'https://example.com' },
+    { client.REQUEST_HEADER: '1', 'Origin': 'null' },
+    { client.REQUEST_HEADER: '1', 'Host': 'example.com' },
+    { client.REQUEST_HEADER: '1', 'Host': 'localhost.example.com:8737' },
+])
+def test_web_page_requests_are_rejected(tcpServer, headers):
+    response = _post(tcpServer, headers)
+    assert response.status == 403
+    assert response.getheader('Connection') == 'close'
+
+@pytest.mark.parametrize('host', ['localhost', '127.0.0.1:8737', '[::1]:8737'])
+def test_local_hosts_are_accepted(tcpServer, host):
+    assert _post(tcpServer, { client.REQUEST_HEADER: '1', 'Host': host }).status == 200
+
+@pytest.fixture(scope='module')
+def fileServer(tmp_path_factory):
+    options = server.ServerOptions()
+    options.port = 0
+    options.loadLibraries = False
+    options.fileRoot = str(tmp_path_factory.mktemp('root'))
+    conversionServer, thread = _startServer(options)
+    yield conversionServer
+    conversionServer.shutdown()
+    conversionServer.server_close()
+    thread.join()
+
+def test_files_within_the_file_root(fileServer):
+    fileRoot = fileServer.service.options.fileRoot
+    shutil.copy(os.path.join(DATA_FOLDER, 'standard_surface_default.mtlx'), fileRoot)
+    with client.ConversionClient(*fileServer.server_address[:2]) as conversionClient:
+        conversionClient.convert('m2j', None, None, os.path.join(fileRoot, 'standard_surface_default.mtlx'),
+                                 os.path.join(fileRoot, 'out.json'))
+        # Relative paths are relative to the file root
+        conversionClient.request('POST', '/j2m', { 'input': 'out.json', 'output': 'out.mtlx' })
+    with open(os.path.join(fileRoot, 'out.mtlx'), encoding='utf-8') as infile:
+        assert '<standard_surface' in infile.read()
+
+@pytest.mark.parametrize('name', ['input', 'output'])
+def test_files_outside_the_file_root_are_rejected(fileServer, tmp_path, name):
+    fileRoot = fileServer.service.options.fileRoot
+    outsideFile = str(tmp_path / 'outside.mtlx')
+    shutil.copy(os.path.join(DATA_FOLDER, 'standard_surface_default.mtlx'), outsideFile)
+    link = os.path.join(fileRoot, 'link_%s' % name)
+    os.symlink(str(tmp_path), link)
+    fileNames = [outsideFile, os.path.join('..', os.path.basename(str(tmp_path)), 'outside.mtlx'),
+                 os.path.join(link, 'outside.mtlx')]
+    with client.ConversionClient(*fileServer.server_address[:2]) as conversionClient:
+        for fileName in fileNames:
+            options = { name: fileName }
+            if name == 'output':
+                options['input'] = os.path.join(fileRoot, 'standard_surface_default.mtlx')
+            with pytest.raises(client.ClientError) as error:
+                conversionClient.request('POST', '/m2j', options)
+            assert error.value.status == 403
+    with open(outsideFile, encoding='utf-8') as infile:
+        assert '<standard_surface' in infile.read()
+
+def test_files_are_rejected_without_a_file_root(tcpServer, tmp_path):
+    fileName = str(tmp_path / 'standard_surface_default.mtlx')
+    shutil.copy(os.path.join(DATA_FOLDER, 'standard_surface_default.mtlx'), fileName)
+    with client.ConversionClient(*tcpServer.server_address[:2]) as conversionClient:
+        with pytest.raises(client.ClientError) as error:
+            conversionClient.convert('m2j', None, None, fileName)
+        assert error.value.status == 403
+
+@pytest.mark.parametrize('host', ['0.0.0.0', '::', '192.168.1.10', 'example.com'])
+def test_non_loopback_hosts_are_refused(host):
+    options = server.ServerOptions()
+    options.host = host
+    options.loadLibraries = False
+    with pytest.raises(ValueError):
+        server.createServer(options)
+
+@pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason='Unix sockets are not supported')
+def test_unix_socket(tmp_path):
+    options = server.ServerOptions()
+    options.socketPath = str(tmp_path / 'server.sock')
+    options.loadLibraries = False
+    conversionServer, thread = _startServer(options)
+    try:
+        with client.ConversionClient(socketPath=options.socketPath) as conversionClient:
+            assert conversionClient.status()['requests'] == { '/status': 1 }
+            conversionClient.shutdown()
+        thread.join(10)
+    finally:
+        conversionServer.server_close()
+    assert not os.path.exists(options.socketPath)
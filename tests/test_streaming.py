@@ -0,0 +1,105 @@
+'''
+Tests for the streaming JSON writer and reader
+'''
+import io
+import json
+import os
+
+import pytest
+
+import materialxjson
+from materialxjson import core
+from materialxjson.core import mx
+
+DATA_FOLDER = os.path.join(os.path.dirname(materialxjson.__file__), 'data')
+DATA_FILES = ['standard_surface_default', 'MaterialsVariantsShoe.gltf_converted']
+
+def _readDocument(name: str) -> mx.Document:
+    doc = mx.createDocument()
+    mx.readFromXmlFile(doc, os.path.join(DATA_FOLDER, name + '.mtlx'))
+    return doc
+
+def _createWriteOptions(indent, separators: tuple, typedValues: bool) -> core.JsonWriteOptions:
+    writeOptions = core.JsonWriteOptions()
+    writeOptions.indent = indent
+    writeOptions.separators = separators
+    writeOptions.typedValues = typedValues
+    return writeOptions
+
+@pytest.mark.parametrize('typedValues', [False, True])
+@pytest.mark.parametrize('separators', [(',', ': '), (',', ':')])
+@pytest.mark.parametrize('indent', [None, 0, 2, '\t'])
+@pytest.mark.parametrize('name', DATA_FILES)
+def test_stream_writer_matches_json_dump(name, indent, separators, typedValues):
+    doc = _readDocument(name)
+    writeOptions = _createWriteOptions(indent, separators, typedValues)
+    expected = json.dumps(core.MaterialXJson().documentToJSON(doc, writeOptions), indent=indent, separators=separators)
+    # A small chunk size writes many chunks
+    stream = io.StringIO()
+    core.JsonStreamWriter(stream, writeOptions, chunkSize=64).writeDocument(doc)
+    assert stream.getvalue() == expected
+
+def test_stream_writer_handles_empty_documents():
+    stream = io.StringIO()
+    core.JsonStreamWriter(stream).writeDocument(mx.createDocument())
+    assert json.loads(stream.getvalue()) == core.MaterialXJson().documentToJSON(mx.createDocument())
+
+@pytest.mark.parametrize('name', DATA_FILES)
+def test_streamed_files_match(name, tmp_path):
+    xmlFileName = os.path.join(DATA_FOLDER, name + '.mtlx')
+    writeOptions = core.JsonWriteOptions()
+    writeOptions.indent = 2
+    core.Util.xmlFileToJsonFile(xmlFileName, str(tmp_path / 'dict.json'), writeOptions)
+    writeOptions.streamOutput = True
+    core.Util.xmlFileToJsonFile(xmlFileName, str(tmp_path / 'stream.json'), writeOptions)
+    assert (tmp_path / 'stream.json').read_bytes() == (tmp_path / 'dict.json').read_bytes()
+
+def _readStream(text: str, readOptions: core.JsonReadOptions = None, chunkSize: int = 16) -> mx.Document:
+    doc = mx.createDocument()
+    assert core.JsonStreamReader(io.BytesIO(text.encode('utf-8')), chunkSize).readDocument(doc, readOptions)
+    return doc
+
+def _readJson(jsonDoc: dict, readOptions: core.JsonReadOptions = None) -> mx.Document:
+    doc = mx.createDocument()
+    assert core.MaterialXJson().documentFromJSON(jsonDoc, doc, readOptions)
+    return doc
+
+@pytest.mark.parametrize('stringTable', [False, True])
+@pytest.mark.parametrize('typedValues', [False, True])
+@pytest.mark.parametrize('name', DATA_FILES)
+def test_stream_reader_matches_document_from_json(name, typedValues, stringTable):
+    writeOptions = core.JsonWriteOptions()
+    writeOptions.typedValues = typedValues
+    writeOptions.stringTable = stringTable
+    jsonDoc = core.MaterialXJson().documentToJSON(_readDocument(name), writeOptions)
+    text = json.dumps(jsonDoc, indent=2)
+    assert mx.writeToXmlString(_readStream(text)) == mx.writeToXmlString(_readJson(jsonDoc))
+
+def test_stream_reader_accepts_any_key_order():
+    jsonDoc = core.MaterialXJson().documentToJSON(_readDocument('standard_surface_default'))
+    expected = mx.writeToXmlString(_readJson(jsonDoc))
+    # Document attributes after the children, and the mimetype after the root which is then read last
+    root = jsonDoc[core.MATERIALX_DOCUMENT_ROOT]
+    reordered = { core.CHILDREN_STRING: root[core.CHILDREN_STRING] }
+    reordered.update((key, value) for key, value in root.items() if key != core.CHILDREN_STRING)
+    text = json.dumps({ core.MATERIALX_DOCUMENT_ROOT: reordered, core.JSON_MIMETYPE_KEY: core.JSON_MIMETYPE })
+    assert mx.writeToXmlString(_readStream(text, chunkSize=5)) == expected
+
+def test_stream_reader_reads_files(tmp_path):
+    xmlFileName = os.path.join(DATA_FOLDER, 'MaterialsVariantsShoe.gltf_converted.mtlx')
+    jsonFileName = str(tmp_path / 'shoe.json.gz')
+    core.Util.xmlFileToJsonFile(xmlFileName, jsonFileName)
+    readOptions = core.JsonReadOptions()
+    readOptions.streamInput = True
+    streamedDoc = core.Util.jsonFileToXml(jsonFileName, readOptions)
+    assert mx.writeToXmlString(streamedDoc) == mx.writeToXmlString(core.Util.jsonFileToXml(jsonFileName))
+
+@pytest.mark.parametrize('text', ['{"mimetype": "application/mtlx+json", "materialx": {"children": [{"name": "a"',
+                                  '{"mimetype": "application/mtlx+json", "materialx": {}} extra'])
+def test_stream_reader_rejects_invalid_json(text):
+    with pytest.raises(json.JSONDecodeError):
+        core.JsonStreamReader(io.StringIO(text)).readDocument(mx.createDocument())
+
+def test_stream_reader_checks_mimetype():
+    text = json.dumps({ core.JSON_MIMETYPE_KEY: 'text/plain', core.MATERIALX_DOCUMENT_ROOT: { core.CHILDREN_STRING: [] } })
+    assert not core.JsonStreamReader(io.StringIO(text)).readDocument(mx.createDocument())
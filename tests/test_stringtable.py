@@ -0,0 +1,82 @@
+'''
+Tests for the compact string table layout
+'''
+import copy
+import os
+
+import pytest
+
+import materialxjson
+from materialxjson import core, patch, stringtable, verify
+from materialxjson.core import mx
+
+DATA_FOLDER = os.path.join(os.path.dirname(materialxjson.__file__), 'data')
+
+def _createArrayDocument() -> mx.Document:
+    '''
+    @brief Create a document with scalar, array and single item array values
+    '''
+    doc = mx.createDocument()
+    nodeGraph = doc.addNodeGraph('NG_values')
+    node = nodeGraph.addNode('constant', 'constant_float', 'float')
+    node.setInputValue('value', 0.5, 'float')
+    node = nodeGraph.addNode('constant', 'constant_int', 'integer')
+    node.setInputValue('value', 3, 'integer')
+    node = nodeGraph.addNode('constant', 'constant_bool', 'boolean')
+    node.setInputValue('value', True, 'boolean')
+    node = nodeGraph.addNode('constant', 'constant_color', 'color3')
+    node.setInputValue('value', mx.Color3(0.25, 0.5, 1.0), 'color3')
+    node = nodeGraph.addNode('constant', 'constant_floatarray', 'floatarray')
+    node.setInputValue('value', [0.75], 'floatarray')
+    node = nodeGraph.addNode('constant', 'constant_intarray', 'integerarray')
+    node.setInputValue('value', [2, 4, 6], 'integerarray')
+    return doc
+
+def _loadDocuments() -> list:
+    documents = [_createArrayDocument()]
+    for fileName in ('standard_surface_default.mtlx', 'MaterialsVariantsShoe.gltf_converted.mtlx'):
+        doc = mx.createDocument()
+        mx.readFromXmlFile(doc, os.path.join(DATA_FOLDER, fileName))
+        documents.append(doc)
+    return documents
+
+@pytest.fixture(scope='module')
+def documents():
+    return _loadDocuments()
+
+@pytest.mark.parametrize('typedValues', [False, True])
+def test_expand_is_inverse_of_compact(documents, typedValues):
+    writeOptions = core.JsonWriteOptions()
+    writeOptions.typedValues = typedValues
+    for doc in documents:
+        jsonDoc = core.MaterialXJson().documentToJSON(doc, writeOptions)
+        original = copy.deepcopy(jsonDoc)
+        assert stringtable.expandJson(stringtable.compactJson(jsonDoc)) == original
+
+def test_single_item_values():
+    jsonDoc = { 'mimetype': core.JSON_MIMETYPE, 'materialx': { 'name': 'doc', 'children': [
+        { 'name': 'a', 'category': 'constant', 'value': 0.5, 'scale': 2, 'flag': False,
+          'one': [0.75], 'nested': [[1, 2, 3]], 'many': [1, 2] }] } }
+    compact = stringtable.compactJson(copy.deepcopy(jsonDoc))
+    assert stringtable.expandJson(compact) == jsonDoc
+
+@pytest.mark.parametrize('typedValues', [False, True])
+def test_compact_and_plain_documents_match(documents, typedValues):
+    plainOptions = core.JsonWriteOptions()
+    plainOptions.typedValues = typedValues
+    compactOptions = core.JsonWriteOptions()
+    compactOptions.typedValues = typedValues
+    compactOptions.stringTable = True
+    mtlxjson = core.MaterialXJson()
+    for doc in documents:
+        plain = mtlxjson.documentToJSON(doc, plainOptions)
+        compact = mtlxjson.documentToJSON(doc, compactOptions)
+        assert patch.diffJson(plain, compact)[patch.PATCH_OPERATIONS_KEY] == []
+        assert verify.hashJson(plain) == verify.hashJson(compact)
+
+        # Typed values do not keep the formatting of value strings, so compare to the plain document
+        plainDoc = mx.createDocument()
+        assert mtlxjson.documentFromJSON(plain, plainDoc)
+        compactDoc = mx.createDocument()
+        assert mtlxjson.documentFromJSON(compact, compactDoc)
+        assert mx.writeToXmlString(compactDoc) == mx.writeToXmlString(plainDoc)
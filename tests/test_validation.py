@@ -0,0 +1,89 @@
+'''
+Tests for structural validation of JSON documents
+'''
+import os
+
+import pytest
+
+import materialxjson
+from materialxjson import core, validation
+from materialxjson.core import mx
+
+DATA_FOLDER = os.path.join(os.path.dirname(materialxjson.__file__), 'data')
+DATA_FILES = ['standard_surface_default', 'MaterialsVariantsShoe.gltf_converted']
+
+def _writeJson(name: str, typedValues: bool = False, stringTable: bool = False) -> dict:
+    doc = mx.createDocument()
+    mx.readFromXmlFile(doc, os.path.join(DATA_FOLDER, name + '.mtlx'))
+    writeOptions = core.JsonWriteOptions()
+    writeOptions.typedValues = typedValues
+    writeOptions.stringTable = stringTable
+    return core.MaterialXJson().documentToJSON(doc, writeOptions)
+
+@pytest.mark.parametrize('stringTable', [False, True])
+@pytest.mark.parametrize('typedValues', [False, True])
+@pytest.mark.parametrize('name', DATA_FILES)
+def test_written_documents_are_valid(name, typedValues, stringTable):
+    jsonDoc = _writeJson(name, typedValues, stringTable)
+    assert validation.validateJson(jsonDoc) == []
+    validation.checkJson(jsonDoc)
+
+def test_all_errors_are_reported_with_paths():
+    jsonDoc = _writeJson('MaterialsVariantsShoe.gltf_converted')
+    children = jsonDoc[core.MATERIALX_DOCUMENT_ROOT][core.CHILDREN_STRING]
+    children[0]['name'] = 'invalid name'
+    children[1]['name'] = children[2]['name']
+    del children[2]['category']
+    children[3]['attributes'] = { 'x': 1 }
+    children.append('node')
+    assert validation.validateJson(jsonDoc) == [
+        '$.materialx.children[0].name: Invalid element name "invalid name"',
+        '$.materialx.children[2].name: Name "%s" is not unique among its siblings' % children[2]['name'],
+        '$.materialx.children[2]: Element has no category',
+        '$.materialx.children[3].attributes: Attribute "attributes" is not a value string, number, boolean or array of values',
+        '$.materialx.children[%d]: Element is not a JSON object' % (len(children) - 1),
+    ]
+
+    with pytest.raises(validation.JsonValidationError) as excinfo:
+        validation.checkJson(jsonDoc)
+    assert len(excinfo.value.errors) == 5
+    assert str(excinfo.value).startswith('Invalid MaterialX JSON document. 5 errors: $.materialx.children[0].name')
+    assert validation.validateJson(jsonDoc, maxErrors=2) == excinfo.value.errors[:2]
+
+def test_document_roots_are_checked():
+    assert validation.validateJson([]) == ['$: Document is not a JSON object']
+    assert validation.validateJson({ core.JSON_MIMETYPE_KEY: 'text/plain' }) == [
+        '$.mimetype: Mimetype is not "%s"' % core.JSON_MIMETYPE,
+        '$.materialx: Missing MaterialX root element',
+    ]
+
+def test_native_values_need_typed_values():
+    jsonDoc = _writeJson('standard_surface_default', typedValues=True)
+    readOptions = core.JsonReadOptions()
+    assert validation.validateJson(jsonDoc, readOptions) == []
+    readOptions.typedValues = False
+    errors = validation.validateJson(jsonDoc, readOptions)
+    assert errors and all(' is not a string' in error for error in errors)
+
+    # Arrays of mixed numbers and strings cannot be written as value strings
+    jsonDoc = _writeJson('standard_surface_default')
+    nodeDef = jsonDoc[core.MATERIALX_DOCUMENT_ROOT][core.CHILDREN_STRING][0]
+    nodeDef['doc'] = [1, 'a']
+    assert validation.validateJson(jsonDoc) == [
+        '$.materialx.children[0].doc: Attribute "doc" is not a value string, number, boolean or array of values']
+    nodeDef['doc'] = [[1, 0], [0, 1]]
+    assert validation.validateJson(jsonDoc) == []
+
+def test_string_table_references_are_checked():
+    jsonDoc = _writeJson('standard_surface_default', stringTable=True)
+    strings = jsonDoc['strings']
+    childrenRef = str(strings.index(core.CHILDREN_STRING))
+    typeRef = str(strings.index('type'))
+    child = jsonDoc[core.MATERIALX_DOCUMENT_ROOT][childrenRef][0]
+    child[typeRef] = len(strings)
+    child['unknown'] = 'value'
+    # Paths use the key references of the compact layout
+    assert validation.validateJson(jsonDoc) == [
+        '$.materialx["%s"][0]["%s"]: Invalid string table reference %d' % (childrenRef, typeRef, len(strings)),
+        '$.materialx["%s"][0].unknown: Invalid string table key reference' % childrenRef,
+    ]
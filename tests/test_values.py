@@ -0,0 +1,103 @@
+'''
+Tests for conversion between MaterialX value strings and native JSON values
+'''
+import os
+
+import pytest
+
+import materialxjson
+from materialxjson import core, values
+from materialxjson.core import mx
+
+DATA_FOLDER = os.path.join(os.path.dirname(materialxjson.__file__), 'data')
+
+@pytest.mark.parametrize('valueString, typeName, expected', [
+    ('0.5', 'float', 0.5),
+    ('1', 'float', 1.0),
+    ('.5', 'float', 0.5),
+    ('3', 'integer', 3),
+    ('true', 'boolean', True),
+    ('0.1, 0.2, 0.3', 'color3', [0.1, 0.2, 0.3]),
+    ('1, 0, 0, 0, 1, 0, 0, 0, 1', 'matrix33', [1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0]),
+    ('1, 2, 3', 'integerarray', [1, 2, 3]),
+    ('', 'floatarray', []),
+    # Values which cannot be converted are left as strings
+    ('1, 2', 'vector3', '1, 2'),
+    ('1.5', 'integer', '1.5'),
+    ('abc', 'float', 'abc'),
+    ('yes', 'boolean', 'yes'),
+    ('0.5', 'string', '0.5'),
+])
+def test_value_strings_to_json(valueString, typeName, expected):
+    value = values.valueStringToJson(valueString, typeName)
+    assert value == expected
+    assert type(value) is type(expected)
+    if isinstance(value, list):
+        assert all(type(item) is type(expectedItem) for item, expectedItem in zip(value, expected))
+
+@pytest.mark.parametrize('value, expected', [
+    (0.5, '0.5'),
+    (1.0, '1'),
+    (3, '3'),
+    (False, 'false'),
+    ([1.0, 0.5, 0.25], '1, 0.5, 0.25'),
+    ([[1, 0], [0, 1]], '1, 0, 0, 1'),
+    (['a', 'b'], 'a, b'),
+    ({ 'x': 1 }, None),
+    (None, None),
+])
+def test_json_to_value_strings(value, expected):
+    assert values.jsonToValueString(value) == expected
+
+def _createValueDocument() -> mx.Document:
+    doc = mx.createDocument()
+    nodeGraph = doc.addNodeGraph('NG_values')
+    for typeName, value in (('float', 0.5), ('integer', 3), ('boolean', True), ('color3', mx.Color3(0.25, 0.5, 1.0)),
+                            ('vector2', mx.Vector2(1.0, -2.0)), ('floatarray', [0.75, 1.0]), ('integerarray', [2, 4, 6]),
+                            ('string', 'text')):
+        node = nodeGraph.addNode('constant', 'constant_' + typeName, typeName)
+        node.setInputValue('value', value, typeName)
+    return doc
+
+def _inputValues(doc: mx.Document) -> dict:
+    return { node.getName(): node.getInput('value').getValue() for node in doc.getNodeGraph('NG_values').getNodes() }
+
+def test_typed_values_round_trip():
+    doc = _createValueDocument()
+    writeOptions = core.JsonWriteOptions()
+    writeOptions.typedValues = True
+    jsonDoc = core.MaterialXJson().documentToJSON(doc, writeOptions)
+    nodes = { node['name']: node[core.INPUTS_STRING][0]['value'] for node in jsonDoc['materialx']['children'][0]['children'] }
+    assert nodes == { 'constant_float': 0.5, 'constant_integer': 3, 'constant_boolean': True,
+                      'constant_color3': [0.25, 0.5, 1.0], 'constant_vector2': [1.0, -2.0],
+                      'constant_floatarray': [0.75, 1.0], 'constant_integerarray': [2, 4, 6], 'constant_string': 'text' }
+
+    newDoc = mx.createDocument()
+    assert core.MaterialXJson().documentFromJSON(jsonDoc, newDoc)
+    assert _inputValues(newDoc) == _inputValues(doc)
+
+def _treeValues(doc: mx.Document) -> dict:
+    return { elem.getNamePath(): elem.getValue() for elem in doc.traverseTree()
+             if elem.isA(mx.ValueElement) and elem.hasValueString() }
+
+@pytest.mark.parametrize('name', ['standard_surface_default', 'MaterialsVariantsShoe.gltf_converted'])
+def test_typed_files_read_as_value_strings(name, tmp_path):
+    xmlFileName = os.path.join(DATA_FOLDER, name + '.mtlx')
+    writeOptions = core.JsonWriteOptions()
+    writeOptions.typedValues = True
+    core.Util.xmlFileToJsonFile(xmlFileName, str(tmp_path / 'typed.json'), writeOptions)
+    core.Util.xmlFileToJsonFile(xmlFileName, str(tmp_path / 'plain.json'))
+    typedDoc = core.Util.jsonFileToXml(str(tmp_path / 'typed.json'))
+    plainDoc = core.Util.jsonFileToXml(str(tmp_path / 'plain.json'))
+    # Value strings may be written differently, such as "1" for "1.0", but have the same values
+    typedValues = _treeValues(typedDoc)
+    assert typedValues and typedValues == _treeValues(plainDoc)
+
+def test_native_values_are_skipped_unless_typed():
+    jsonDoc = core.MaterialXJson().documentToJSON(_createValueDocument(), core.JsonWriteOptions())
+    jsonDoc['materialx']['children'][0]['children'][0][core.INPUTS_STRING][0]['value'] = 0.25
+    readOptions = core.JsonReadOptions()
+    readOptions.typedValues = False
+    doc = mx.createDocument()
+    assert core.MaterialXJson().documentFromJSON(jsonDoc, doc, readOptions)
+    assert not doc.getNodeGraph('NG_values').getNode('constant_float').getInput('value').hasValueString()
@@ -0,0 +1,132 @@
+'''
+Tests for the structural verification of MaterialX documents against JSON
+'''
+import copy
+import os
+
+import pytest
+
+import materialxjson
+from materialxjson import core, verify
+from materialxjson.core import mx
+
+DATA_FOLDER = os.path.join(os.path.dirname(materialxjson.__file__), 'data')
+
+@pytest.fixture(scope='module')
+def doc():
+    doc = mx.createDocument()
+    mx.readFromXmlFile(doc, os.path.join(DATA_FOLDER, 'MaterialsVariantsShoe.gltf_converted.mtlx'))
+    return doc
+
+@pytest.mark.parametrize('typedValues', [False, True])
+@pytest.mark.parametrize('stringTable', [False, True])
+def test_converted_documents_match(doc, typedValues, stringTable):
+    writeOptions = core.JsonWriteOptions()
+    writeOptions.typedValues = typedValues
+    writeOptions.stringTable = stringTable
+    jsonDoc = core.MaterialXJson().documentToJSON(doc, writeOptions)
+    assert verify.compareDocumentToJson(doc, jsonDoc) == []
+    assert verify.hashDocument(doc) == verify.hashJson(jsonDoc)
+
+def _findInputs(node: dict, typeName: str) -> list:
+    inputs = [item for item in node.get(core.INPUTS_STRING, []) if item.get('type') == typeName and 'value' in item]
+    for child in node.get(core.CHILDREN_STRING, []):
+        inputs.extend(_findInputs(child, typeName))
+    return inputs
+
+def test_values_are_compared_by_value():
+    doc = mx.createDocument()
+    mx.readFromXmlFile(doc, os.path.join(DATA_FOLDER, 'standard_surface_default.mtlx'))
+    jsonDoc = core.MaterialXJson().documentToJSON(doc)
+    changed = copy.deepcopy(jsonDoc)
+    inputs = _findInputs(changed['materialx'], 'float')
+    assert inputs
+    for item in inputs:
+        value = item['value']
+        item['value'] = value + '0' if '.' in value else value + '.0'
+    assert verify.compareDocumentToJson(doc, changed) == []
+    assert verify.hashJson(changed) == verify.hashJson(jsonDoc)
+
+def test_mismatches_are_reported(doc):
+    jsonDoc = core.MaterialXJson().documentToJSON(doc)
+    children = jsonDoc['materialx']['children']
+    removed = children.pop()
+    children[0]['extra'] = 'x'
+    mismatches = verify.compareDocumentToJson(doc, jsonDoc)
+    assert '(document): missing child "%s"' % removed['name'] in mismatches
+    assert '%s: extra attribute "extra"' % children[0]['name'] in mismatches
+    assert verify.hashDocument(doc) != verify.hashJson(jsonDoc)
+
+@pytest.mark.parametrize('streamOutput', [False, True])
+@pytest.mark.parametrize('typedValues', [False, True])
+def test_elements_are_hashed_as_written(doc, streamOutput, typedValues):
+    writeOptions = core.JsonWriteOptions()
+    writeOptions.streamOutput = streamOutput
+    writeOptions.typedValues = typedValues
+    writeOptions.structureHash = verify.StructureHash(True)
+    core.MaterialXJson().documentToJSONString(doc, writeOptions)
+    assert writeOptions.structureHash.hexdigest() == verify.hashDocument(doc)
+
+@pytest.mark.parametrize('streamInput', [False, True])
+@pytest.mark.parametrize('stringTable', [False, True])
+def test_elements_are_hashed_as_read(doc, streamInput, stringTable, tmp_path):
+    writeOptions = core.JsonWriteOptions()
+    writeOptions.stringTable = stringTable
+    jsonFileName = str(tmp_path / 'shoe.json')
+    core.Util.writeJson(core.MaterialXJson().documentToJSON(doc, writeOptions), jsonFileName)
+    readOptions = core.JsonReadOptions()
+    readOptions.streamInput = streamInput
+    readOptions.structureHash = verify.StructureHash(True)
+    assert core.Util.jsonFileToXml(jsonFileName, readOptions)
+    assert readOptions.structureHash.hexdigest() == verify.hashDocument(doc)
+
+def test_xml_files_are_hashed_without_materialx(doc):
+    assert verify.hashXmlFile(os.path.join(DATA_FOLDER, 'MaterialsVariantsShoe.gltf_converted.mtlx')) == verify.hashDocument(doc)
+
+def _replaceInFile(fileName: str, old: str, new: str) -> None:
+    with open(fileName, encoding='utf-8') as infile:
+        text = infile.read()
+    assert old in text
+    with open(fileName, 'w', encoding='utf-8') as outfile:
+        outfile.write(text.replace(old, new, 1))
+
+@pytest.mark.parametrize('streamOutput', [False, True])
+@pytest.mark.parametrize('typedValues', [False, True])
+def test_written_json_is_checked(doc, streamOutput, typedValues, tmp_path):
+    xmlFileName = os.path.join(DATA_FOLDER, 'MaterialsVariantsShoe.gltf_converted.mtlx')
+    jsonFileName = str(tmp_path / 'shoe.json')
+    writeOptions = core.JsonWriteOptions()
+    writeOptions.streamOutput = streamOutput
+    writeOptions.typedValues = typedValues
+    writeOptions.structureHash = verify.StructureHash(typedValues)
+    convertedDoc = mx.createDocument()
+    core.Util.xmlFileToJsonFile(xmlFileName, jsonFileName, writeOptions, convertedDoc)
+    verify.checkJsonOutput(convertedDoc, jsonFileName, writeOptions)
+
+    _replaceInFile(jsonFileName, '"type": "surfaceshader"', '"type": "volumeshader"')
+    with pytest.raises(verify.VerificationError) as error:
+        verify.checkJsonOutput(convertedDoc, jsonFileName, writeOptions)
+    assert error.value.fileName == jsonFileName
+    assert any('attribute "type" differs: "surfaceshader" != "volumeshader"' in mismatch for mismatch in error.value.mismatches)
+
+@pytest.mark.parametrize('streamInput', [False, True])
+def test_written_xml_is_checked(doc, streamInput, tmp_path):
+    jsonFileName = str(tmp_path / 'shoe.json')
+    xmlFileName = str(tmp_path / 'shoe.mtlx')
+    writeOptions = core.JsonWriteOptions()
+    writeOptions.typedValues = True
+    core.Util.writeJson(core.MaterialXJson().documentToJSON(doc, writeOptions), jsonFileName)
+    readOptions = core.JsonReadOptions()
+    readOptions.streamInput = streamInput
+    readOptions.structureHash = verify.StructureHash()
+    assert core.Util.jsonFileToXmlFile(jsonFileName, xmlFileName, readOptions)
+    verify.checkXmlOutput(jsonFileName, xmlFileName, readOptions)
+
+    # The XML file written is checked, rather than the document in memory
+    removed = doc.getChildren()[0].getName()
+    _replaceInFile(xmlFileName, 'name="%s"' % removed, 'name="%s_renamed"' % removed)
+    with pytest.raises(verify.VerificationError) as error:
+        verify.checkXmlOutput(jsonFileName, xmlFileName, readOptions)
+    assert error.value.fileName == xmlFileName
+    assert '(document): missing child "%s"' % removed in error.value.mismatches
+    assert '(document): extra child "%s_renamed"' % removed in error.value.mismatches